@@ -4,239 +4,445 @@ AI-powered Academic Excellence Engine
 """
 
 import os
+import atexit
+import queue
 import logging
-from flask import Flask, jsonify, request
+from logging.handlers import QueueHandler, QueueListener
+import threading
+import time
+import decimal
+import uuid
+import hashlib
+from datetime import date
+from functools import lru_cache
+from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from dotenv import load_dotenv
+from werkzeug.http import http_date
+from werkzeug.utils import import_string
 
-# Load environment variables
-load_dotenv()
-
-# Import application modules
-from config import Config
+# Import application modules (services and routes are imported lazily)
+from config import Config, get_config
 from database.connection import DatabaseManager
-from models.excellence_engine import ExcellenceEngine
-from services.academic_processor import AcademicProcessor
-from services.scholar_mentorship import ScholarMentorshipService
-from services.prediction_service import PredictionService
-from services.resource_curator import ResourceCurator
-from services.external_tools import ExternalToolsService
-
-# Import API routes
-from routes.excellence_api import excellence_bp
-from routes.mentorship_api import mentorship_bp
-from routes.prediction_api import prediction_bp
-from routes.resources_api import resources_bp
-
-def create_app(config_class=Config):
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FORMATTER = logging.Formatter(LOG_FORMAT)
+
+# File log queues keyed by absolute path, shared by every app in the process
+_file_log_queues = {}
+_file_log_lock = threading.Lock()
+
+def _orjson_default(o):
+    """Serialize the types Flask's default provider handles but orjson does not"""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson with the same output rules as Flask's default"""
+    
+    sort_keys = True
+    mimetype = 'application/json'
+    
+    def _options(self, sort_keys: bool) -> int:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+    
+    def dumps(self, obj, **kwargs) -> str:
+        option = self._options(kwargs.get('sort_keys', self.sort_keys))
+        return orjson.dumps(obj, default=_orjson_default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=self._options(self.sort_keys))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+class PrimaScholarApp(Flask):
+    """Flask application that constructs services on first access"""
+    
+    json_provider_class = OrjsonProvider
+    
+    def __getattr__(self, name):
+        factories = self.__dict__.get('service_factories')
+        if not factories or name not in factories:
+            raise AttributeError(name)
+        
+        with self.__dict__['service_locks'][name]:
+            if name not in self.__dict__:
+                try:
+                    self.__dict__[name] = factories[name](self)
+                except Exception as e:
+                    self.logger.error(f'Failed to initialize service {name}: {str(e)}')
+                    raise
+        
+        return self.__dict__[name]
+    
+    def run_async(self, coro, timeout=None):
+        """Run a coroutine on the shared background event loop and wait for it"""
+        return self.async_runner.run(coro, timeout)
+
+def create_app(config_class=None):
     """Application factory pattern"""
-    app = Flask(__name__)
+    # Validate configuration at boot so misconfiguration fails fast
+    config_class = config_class or get_config()
+    
+    app = PrimaScholarApp(__name__)
     app.config.from_object(config_class)
     
     # Configure CORS
-    CORS(app, origins=app.config['CORS_ORIGINS'].split(','))
+    CORS(app, origins=app.config['CORS_ORIGINS_TUPLE'])
     
     # Setup logging
     setup_logging(app)
     
+    # Point JIT/model caches at the shared directory before services import them
+    configure_jit_caches(app)
+    
     # Initialize database
-    db_manager = DatabaseManager(app.config['TIDB_CONNECTION_STRING'])
+    db_manager = DatabaseManager.get_instance(
+        app.config['TIDB_CONNECTION_STRING'],
+        pool_size=app.config['TIDB_POOL_SIZE'],
+        max_overflow=app.config['TIDB_MAX_OVERFLOW'],
+        pool_recycle=app.config['TIDB_POOL_RECYCLE'],
+        pool_pre_ping=app.config['TIDB_POOL_PRE_PING'],
+        pool_use_lifo=app.config['TIDB_POOL_USE_LIFO'],
+        pool_reset_on_return=app.config['TIDB_POOL_RESET_ON_RETURN']
+    )
     app.db_manager = db_manager
     
     # Initialize services
     init_services(app)
     
     # Register blueprints
-    app.register_blueprint(excellence_bp, url_prefix='/api')
-    app.register_blueprint(mentorship_bp, url_prefix='/api')
-    app.register_blueprint(prediction_bp, url_prefix='/api')
-    app.register_blueprint(resources_bp, url_prefix='/api')
+    register_blueprints(app)
     
     # Register error handlers
     register_error_handlers(app)
     
-    # Health check endpoint
+    # Optional warm-up so the first request does not pay service init costs
+    if os.environ.get('PRIMA_WARMUP') == '1':
+        warm_up_services(app)
+    
+    # Health check endpoints
+    health_lock = threading.Lock()
+    health_cache = {'checked_at': 0.0, 'result': None}
+    
+    @app.route('/healthz')
+    def liveness_check():
+        """Liveness probe - never touches the database or cache"""
+        return '', 204
+    
     @app.route('/health')
+    @app.route('/health/ready')
     def health_check():
-        """Health check endpoint for monitoring"""
-        try:
-            # Test database connection
-            db_status = app.db_manager.test_connection()
-            
-            # Test Redis connection
-            redis_status = app.prediction_service.test_cache()
-            
-            return jsonify({
-                'status': 'healthy',
-                'service': 'prima-scholar-api',
-                'version': '1.0.0',
-                'database': 'connected' if db_status else 'disconnected',
-                'cache': 'connected' if redis_status else 'disconnected'
-            }), 200
-        except Exception as e:
-            return jsonify({
-                'status': 'unhealthy',
-                'error': str(e)
-            }), 500
+        """Readiness check for monitoring, cached for HEALTH_CACHE_TTL seconds"""
+        with health_lock:
+            now = time.monotonic()
+            if (health_cache['result'] is None or
+                    now - health_cache['checked_at'] >= app.config['HEALTH_CACHE_TTL']):
+                health_cache['result'] = check_dependencies(app)
+                health_cache['checked_at'] = now
+            payload, status = health_cache['result']
+        
+        return jsonify(payload), status
     
     @app.route('/')
     def index():
         """Root endpoint with API information"""
-        return jsonify({
-            'service': 'Prima Scholar API',
-            'version': '1.0.0',
-            'description': 'AI-powered Academic Excellence Engine',
-            'endpoints': {
-                'health': '/health',
-                'excellence': '/api/excellence-profile/{student_id}',
-                'predictions': '/api/distinction-predictions/{student_id}',
-                'mentorship': '/api/scholar-mentorship',
-                'resources': '/api/elite-resources/{student_id}',
-                'roadmap': '/api/excellence-roadmap/{student_id}'
-            },
-            'documentation': '/docs'
-        })
+        return conditional_json_response(INDEX_JSON, INDEX_ETAG)
     
     @app.route('/docs')
     def api_docs():
         """API documentation endpoint"""
-        return jsonify({
-            'title': 'Prima Scholar API Documentation',
-            'version': '1.0.0',
-            'description': 'Complete API reference for Prima Scholar Academic Excellence Engine',
-            'base_url': request.host_url + 'api',
-            'authentication': 'Bearer Token (Optional)',
-            'rate_limits': {
-                'predictions': '60 requests per minute',
-                'mentorship': '30 requests per minute',
-                'uploads': '10 requests per minute'
-            },
-            'endpoints': get_api_endpoints_documentation()
-        })
+        return conditional_json_response(*render_api_docs(request.host_url))
     
     return app
 
+def check_dependencies(app):
+    """Probe database and cache connectivity, returning (payload, status)"""
+    try:
+        # Test database connection
+        db_status = app.db_manager.test_connection()
+        
+        # Test Redis connection
+        redis_status = app.prediction_service.test_cache()
+        
+        return {
+            'status': 'healthy',
+            'service': 'prima-scholar-api',
+            'version': '1.0.0',
+            'database': 'connected' if db_status else 'disconnected',
+            'cache': 'connected' if redis_status else 'disconnected'
+        }, 200
+    except Exception as e:
+        return {
+            'status': 'unhealthy',
+            'error': str(e)
+        }, 500
+
 def setup_logging(app):
-    """Configure application logging"""
-    log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO').upper())
+    """Configure application logging (safe to call for every create_app)"""
+    log_level = _resolve_log_level(app.config.get('LOG_LEVEL', 'INFO'))
     
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    # Configure root logger once per process
+    if not logging.getLogger().hasHandlers():
+        logging.basicConfig(
+            level=log_level,
+            format=LOG_FORMAT
+        )
     
-    # File logging if enabled
-    if app.config.get('ENABLE_FILE_LOGGING'):
+    # File logging if enabled; disk writes happen on a background listener
+    # thread so request threads only enqueue records
+    if app.config.get('ENABLE_FILE_LOGGING') and not app.config.get('TESTING'):
         log_file = app.config.get('LOG_FILE', 'logs/prima_scholar.log')
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        log_queue = _get_file_log_queue(log_file, log_level)
         
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(log_level)
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        )
-        app.logger.addHandler(file_handler)
+        if not any(isinstance(h, QueueHandler) and h.queue is log_queue
+                   for h in app.logger.handlers):
+            app.logger.addHandler(QueueHandler(log_queue))
     
     app.logger.info('Prima Scholar API starting up...')
 
+@lru_cache(maxsize=8)
+def _resolve_log_level(name: str) -> int:
+    """Map a level name such as 'debug' to its logging constant"""
+    return getattr(logging, name.upper(), logging.INFO)
+
+def _get_file_log_queue(log_file: str, log_level: int) -> queue.Queue:
+    """Return the queue feeding the file handler for log_file, starting it once"""
+    abs_log_file = os.path.abspath(log_file)
+    
+    with _file_log_lock:
+        log_queue = _file_log_queues.get(abs_log_file)
+        if log_queue is None:
+            log_dir = os.path.dirname(abs_log_file)
+            if not os.path.isdir(log_dir):
+                os.makedirs(log_dir, exist_ok=True)
+            
+            file_handler = logging.FileHandler(abs_log_file)
+            file_handler.setLevel(log_level)
+            file_handler.setFormatter(LOG_FORMATTER)
+            
+            log_queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            
+            _file_log_queues[abs_log_file] = log_queue
+    
+    return log_queue
+
+def configure_jit_caches(app):
+    """Share compiled kernels and model downloads across workers and restarts"""
+    cache_dir = app.config['JIT_CACHE_DIR']
+    
+    os.environ.setdefault('NUMBA_CACHE_DIR', os.path.join(cache_dir, 'numba'))
+    os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', os.path.join(cache_dir, 'torchinductor'))
+    os.environ.setdefault('TRITON_CACHE_DIR', os.path.join(cache_dir, 'triton'))
+    os.environ.setdefault('HF_HOME', os.path.join(cache_dir, 'huggingface'))
+
+# Service construction order for eager initialization
+SERVICE_INIT_WAVES = (
+    ('excellence_engine', 'academic_processor', 'resource_curator', 'async_runner'),
+    ('mentorship_service', 'prediction_service', 'external_tools')
+)
+
+# Services holding sockets that must not be shared across a fork; they are
+# dropped after fork and rebuilt lazily in each worker. All other services
+# are safe to build in the gunicorn master and share copy-on-write.
+CHILD_ONLY_SERVICES = frozenset({'prediction_service', 'async_runner', 'external_tools'})
+
 def init_services(app):
-    """Initialize all application services"""
-    try:
-        # Initialize Excellence Engine
-        app.excellence_engine = ExcellenceEngine(
-            app.db_manager,
-            app.config['OPENAI_API_KEY']
-        )
-        
-        # Initialize Academic Processor
-        app.academic_processor = AcademicProcessor(
-            app.config['OPENAI_API_KEY'],
-            app.db_manager
-        )
-        
-        # Initialize Scholar Mentorship Service
-        app.mentorship_service = ScholarMentorshipService(
-            app.config['OPENAI_API_KEY'],
-            app.excellence_engine,
-            app.db_manager
-        )
-        
-        # Initialize Prediction Service
-        app.prediction_service = PredictionService(
-            app.excellence_engine,
-            app.db_manager,
-            app.config.get('REDIS_URL')
-        )
-        
-        # Initialize Resource Curator
-        app.resource_curator = ResourceCurator(
-            app.db_manager,
-            app.config['OPENAI_API_KEY']
-        )
-        
-        # Initialize External Tools Service
-        app.external_tools = ExternalToolsService(
-            sendgrid_key=app.config.get('SENDGRID_API_KEY'),
-            google_calendar_key=app.config.get('GOOGLE_CALENDAR_API_KEY'),
-            linkedin_key=app.config.get('LINKEDIN_API_KEY'),
-            slack_token=app.config.get('SLACK_BOT_TOKEN')
-        )
-        
-        app.logger.info('All services initialized successfully')
-        
-    except Exception as e:
-        app.logger.error(f'Failed to initialize services: {str(e)}')
-        raise
+    """Register lazy factories for all application services
+    
+    Service modules are only imported when a service is first accessed as
+    an attribute of the application (e.g. ``current_app.excellence_engine``),
+    so workers that never touch a service never pay for its import.
+    """
+    app.service_factories = {
+        'excellence_engine': _create_excellence_engine,
+        'academic_processor': _create_academic_processor,
+        'mentorship_service': _create_mentorship_service,
+        'prediction_service': _create_prediction_service,
+        'resource_curator': _create_resource_curator,
+        'external_tools': _create_external_tools,
+        'async_runner': _create_async_runner,
+        'redis_pool': _create_redis_pool
+    }
+    app.service_locks = {name: threading.Lock() for name in app.service_factories}
+    
+    app.logger.info('All services registered for lazy initialization')
+
+def preload_services(app):
+    """Construct all services eagerly, running independent constructors in parallel
+    
+    Services in the same wave do not depend on each other; the second wave
+    needs the excellence engine and async runner built by the first.
+    """
+    with ThreadPoolExecutor(max_workers=app.config['MAX_WORKERS']) as executor:
+        for wave in SERVICE_INIT_WAVES:
+            futures = {executor.submit(getattr, app, name): name for name in wave}
+            for future in as_completed(futures):
+                future.result()
+    
+    app.logger.info('All services initialized successfully')
+
+def _create_excellence_engine(app):
+    from models.excellence_engine import ExcellenceEngine
+    return ExcellenceEngine(
+        app.db_manager,
+        app.config['OPENAI_API_KEY'],
+        redis_pool=app.redis_pool
+    )
+
+def _create_academic_processor(app):
+    from services.academic_processor import AcademicProcessor
+    return AcademicProcessor(
+        app.config['OPENAI_API_KEY'],
+        app.db_manager
+    )
+
+def _create_mentorship_service(app):
+    from services.scholar_mentorship import ScholarMentorshipService
+    return ScholarMentorshipService(
+        app.config['OPENAI_API_KEY'],
+        app.excellence_engine,
+        app.db_manager,
+        academic_processor=app.academic_processor
+    )
+
+def _create_prediction_service(app):
+    from services.prediction_service import PredictionService
+    return PredictionService(
+        app.excellence_engine,
+        app.db_manager,
+        redis_pool=app.redis_pool
+    )
+
+def _create_redis_pool(app):
+    """Shared Redis connection pool, or None when Redis is not configured
+    
+    redis-py pools detect a fork and drop inherited connections, so one pool
+    built in the gunicorn master is safe to share with workers. When every
+    connection is checked out, callers wait up to REDIS_POOL_TIMEOUT for one
+    instead of failing. A loopback URL switches to REDIS_SOCKET_PATH when
+    that unix socket exists.
+    """
+    if not app.config.get('REDIS_URL'):
+        return None
+    
+    from services.prediction_service import create_redis_pool
+    return create_redis_pool(
+        app.config['REDIS_URL'],
+        socket_path=app.config['REDIS_SOCKET_PATH'],
+        max_connections=app.config['REDIS_POOL_MAX'],
+        timeout=app.config['REDIS_POOL_TIMEOUT'],
+        socket_keepalive=app.config['REDIS_SOCKET_KEEPALIVE'],
+        health_check_interval=app.config['REDIS_HEALTH_CHECK_INTERVAL']
+    )
+
+def _create_resource_curator(app):
+    from services.resource_curator import ResourceCurator
+    return ResourceCurator(
+        app.db_manager,
+        app.config['OPENAI_API_KEY']
+    )
+
+def _create_external_tools(app):
+    from services.external_tools import ExternalToolsService
+    return ExternalToolsService(
+        sendgrid_key=app.config.get('SENDGRID_API_KEY'),
+        google_calendar_key=app.config.get('GOOGLE_CALENDAR_API_KEY'),
+        linkedin_key=app.config.get('LINKEDIN_API_KEY'),
+        slack_token=app.config.get('SLACK_BOT_TOKEN'),
+        async_runner=app.async_runner
+    )
+
+def _create_async_runner(app):
+    from services.async_runner import AsyncRunner
+    runner = AsyncRunner(
+        max_connections=app.config['ASYNC_HTTP_MAX_CONNECTIONS'],
+        max_keepalive_connections=app.config['ASYNC_HTTP_MAX_KEEPALIVE']
+    )
+    atexit.register(runner.close)
+    return runner
+
+def warm_up_services(app):
+    """Initialize services and prime their caches before accepting traffic"""
+    preload_services(app)
+    
+    with app.app_context():
+        app.prediction_service.test_cache()
+        app.excellence_engine.warmup()
+    
+    app.logger.info('Services warmed up')
+
+def reset_after_fork(app):
+    """Recreate per-process connection state in a freshly forked worker"""
+    app.db_manager.reset_after_fork()
+    
+    for name in CHILD_ONLY_SERVICES:
+        app.__dict__.pop(name, None)
+
+def register_blueprints(app):
+    """Resolve and register API blueprints from their import strings
+    
+    Only the blueprints listed in API_BLUEPRINTS are imported, so workers
+    dedicated to a subset of endpoints never load the other route modules.
+    Flask does not allow blueprints to be registered once requests are being
+    served, so resolution happens here rather than on first request.
+    """
+    for import_path in app.config['API_BLUEPRINTS']:
+        blueprint = import_string(import_path)
+        app.register_blueprint(blueprint, url_prefix='/api')
 
 def register_error_handlers(app):
     """Register global error handlers"""
     
     @app.errorhandler(400)
     def bad_request(error):
-        return jsonify({
-            'error': 'Bad Request',
-            'message': 'Invalid request data'
-        }), 400
+        return error_response(400)
     
     @app.errorhandler(401)
     def unauthorized(error):
-        return jsonify({
-            'error': 'Unauthorized',
-            'message': 'Authentication required'
-        }), 401
+        return error_response(401)
     
     @app.errorhandler(403)
     def forbidden(error):
-        return jsonify({
-            'error': 'Forbidden',
-            'message': 'Insufficient permissions'
-        }), 403
+        return error_response(403)
     
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({
-            'error': 'Not Found',
-            'message': 'Resource not found'
-        }), 404
+        return error_response(404)
     
     @app.errorhandler(429)
     def rate_limit_exceeded(error):
-        return jsonify({
-            'error': 'Rate Limit Exceeded',
-            'message': 'Too many requests. Please try again later.'
-        }), 429
+        return error_response(429)
     
     @app.errorhandler(500)
     def internal_error(error):
         app.logger.error(f'Internal server error: {str(error)}')
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'An unexpected error occurred'
-        }), 500
+        return error_response(500)
+
+def error_response(status: int) -> Response:
+    """Build an error response from its pre-serialized body"""
+    return Response(ERROR_BODIES[status], status=status, mimetype='application/json')
 
+@lru_cache(maxsize=1)
 def get_api_endpoints_documentation():
-    """Return API endpoints documentation"""
+    """Return API endpoints documentation (cached; treat as read-only)"""
     return {
         'excellence_profile': {
             'endpoint': '/excellence-profile/{student_id}',
@@ -298,16 +504,90 @@ def get_api_endpoints_documentation():
         }
     }
 
+def content_etag(body: bytes) -> str:
+    """Short content hash used as an ETag for static JSON payloads"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def conditional_json_response(body: bytes, etag: str) -> Response:
+    """JSON response carrying a weak ETag; answers 304 when the client has it"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+@lru_cache(maxsize=32)
+def render_api_docs(host_url: str) -> Tuple[bytes, str]:
+    """Serialize the API documentation for a given host, cached per host"""
+    body = orjson.dumps({
+        'title': 'Prima Scholar API Documentation',
+        'version': '1.0.0',
+        'description': 'Complete API reference for Prima Scholar Academic Excellence Engine',
+        'base_url': host_url + 'api',
+        'authentication': 'Bearer Token (Optional)',
+        'rate_limits': {
+            'predictions': '60 requests per minute',
+            'mentorship': '30 requests per minute',
+            'uploads': '10 requests per minute'
+        },
+        'endpoints': get_api_endpoints_documentation()
+    }, option=orjson.OPT_SORT_KEYS)
+    return body, content_etag(body)
+
+# Static error bodies for the global error handlers
+ERROR_BODIES = {
+    status: orjson.dumps({'error': error, 'message': message}, option=orjson.OPT_SORT_KEYS)
+    for status, error, message in (
+        (400, 'Bad Request', 'Invalid request data'),
+        (401, 'Unauthorized', 'Authentication required'),
+        (403, 'Forbidden', 'Insufficient permissions'),
+        (404, 'Not Found', 'Resource not found'),
+        (429, 'Rate Limit Exceeded', 'Too many requests. Please try again later.'),
+        (500, 'Internal Server Error', 'An unexpected error occurred')
+    )
+}
+
+# Static API information served by the root endpoint
+INDEX_JSON = orjson.dumps({
+    'service': 'Prima Scholar API',
+    'version': '1.0.0',
+    'description': 'AI-powered Academic Excellence Engine',
+    'endpoints': {
+        'health': '/health',
+        'liveness': '/healthz',
+        'excellence': '/api/excellence-profile/{student_id}',
+        'predictions': '/api/distinction-predictions/{student_id}',
+        'mentorship': '/api/scholar-mentorship',
+        'resources': '/api/elite-resources/{student_id}',
+        'roadmap': '/api/excellence-roadmap/{student_id}'
+    },
+    'documentation': '/docs'
+}, option=orjson.OPT_SORT_KEYS)
+INDEX_ETAG = content_etag(INDEX_JSON)
+
 # Create the application instance
 app = create_app()
 
 if __name__ == '__main__':
-    # Development server
     port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
-    app.run(
-        host='0.0.0.0',
-        port=port,
-        debug=debug
-    )
\ No newline at end of file
+    if os.environ.get('USE_DEV_SERVER') == '1':
+        # Development server (reloader only runs in debug mode)
+        debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+        
+        app.run(
+            host='0.0.0.0',
+            port=port,
+            debug=debug,
+            use_reloader=debug
+        )
+    else:
+        # Production server with threaded gunicorn workers
+        os.execvp('gunicorn', [
+            'gunicorn',
+            '--config', 'gunicorn_conf.py',
+            '--bind', f'0.0.0.0:{port}',
+            '--workers', str(Config.GUNICORN_WORKERS),
+            '--threads', str(Config.GUNICORN_THREADS),
+            '--worker-class', 'gthread',
+            '--preload',
+            'app:app'
+        ])
@@ -5,98 +5,153 @@ Centralized configuration management for all environments
 
 import os
 from datetime import timedelta
+from functools import lru_cache
+from types import MappingProxyType
+
+def _load_dotenv_once():
+    """Load .env outside production, once per process tree"""
+    if (os.environ.get('FLASK_ENV', 'development') == 'production'
+            or os.environ.get('PRIMA_ENV_LOADED')):
+        return
+    
+    from dotenv import load_dotenv
+    load_dotenv()
+    os.environ['PRIMA_ENV_LOADED'] = '1'
+
+# Single snapshot of the environment used to build the configuration classes;
+# .env has to be loaded before it is taken
+_load_dotenv_once()
+_ENV = dict(os.environ)
+
+def _split_csv(value: str) -> tuple:
+    """Split a comma-separated setting into a tuple of non-empty, stripped items"""
+    return tuple(item.strip() for item in value.split(',') if item.strip())
 
 class Config:
     """Base configuration class"""
     
     # Basic Flask Configuration
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'prima-scholar-secret-key-change-in-production'
+    SECRET_KEY = _ENV.get('SECRET_KEY') or 'prima-scholar-secret-key-change-in-production'
     
     # Database Configuration
-    TIDB_CONNECTION_STRING = os.environ.get('TIDB_CONNECTION_STRING')
-    TIDB_HOST = os.environ.get('TIDB_HOST', 'localhost')
-    TIDB_PORT = int(os.environ.get('TIDB_PORT', 4000))
-    TIDB_DATABASE = os.environ.get('TIDB_DATABASE', 'prima_scholar')
-    TIDB_USERNAME = os.environ.get('TIDB_USERNAME', 'root')
-    TIDB_PASSWORD = os.environ.get('TIDB_PASSWORD', '')
+    TIDB_CONNECTION_STRING = _ENV.get('TIDB_CONNECTION_STRING')
+    TIDB_HOST = _ENV.get('TIDB_HOST', 'localhost')
+    TIDB_PORT = int(_ENV.get('TIDB_PORT', 4000))
+    TIDB_DATABASE = _ENV.get('TIDB_DATABASE', 'prima_scholar')
+    TIDB_USERNAME = _ENV.get('TIDB_USERNAME', 'root')
+    TIDB_PASSWORD = _ENV.get('TIDB_PASSWORD', '')
+    
+    # Database Connection Pool Configuration
+    TIDB_POOL_SIZE = int(_ENV.get('TIDB_POOL_SIZE', 25))
+    TIDB_MAX_OVERFLOW = int(_ENV.get('TIDB_MAX_OVERFLOW', 20))
+    TIDB_POOL_RECYCLE = int(_ENV.get('TIDB_POOL_RECYCLE', 540))  # Below Serverless ~10 min idle cutoff
+    TIDB_POOL_PRE_PING = _ENV.get('TIDB_POOL_PRE_PING', 'False').lower() == 'true'
+    TIDB_POOL_USE_LIFO = _ENV.get('TIDB_POOL_USE_LIFO', 'True').lower() == 'true'
+    TIDB_POOL_RESET_ON_RETURN = _ENV.get('TIDB_POOL_RESET_ON_RETURN') or None  # 'rollback' to restore
     
     # AI Configuration
-    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
-    OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4')
-    OPENAI_EMBEDDING_MODEL = os.environ.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+    OPENAI_API_KEY = _ENV.get('OPENAI_API_KEY')
+    OPENAI_MODEL = _ENV.get('OPENAI_MODEL', 'gpt-4')
+    OPENAI_EMBEDDING_MODEL = _ENV.get('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
     
     # Redis Configuration
-    REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
-    REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', '')
-    REDIS_DB = int(os.environ.get('REDIS_DB', 0))
+    REDIS_URL = _ENV.get('REDIS_URL', 'redis://localhost:6379')
+    REDIS_PASSWORD = _ENV.get('REDIS_PASSWORD', '')
+    REDIS_DB = int(_ENV.get('REDIS_DB', 0))
+    REDIS_POOL_MAX = int(_ENV.get('REDIS_POOL_MAX', 50))
+    REDIS_POOL_TIMEOUT = float(_ENV.get('REDIS_POOL_TIMEOUT', 2))  # seconds to wait for a free connection
+    REDIS_SOCKET_PATH = _ENV.get('REDIS_SOCKET_PATH', '/var/run/redis/redis.sock')  # preferred for loopback URLs
+    REDIS_SOCKET_KEEPALIVE = _ENV.get('REDIS_SOCKET_KEEPALIVE', 'True').lower() == 'true'
+    REDIS_HEALTH_CHECK_INTERVAL = int(_ENV.get('REDIS_HEALTH_CHECK_INTERVAL', 30))  # seconds
     
     # Application Settings
-    MAX_UPLOAD_SIZE = os.environ.get('MAX_UPLOAD_SIZE', '50MB')
-    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', './uploads')
-    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'md', 'doc', 'pptx'}
+    MAX_UPLOAD_SIZE = _ENV.get('MAX_UPLOAD_SIZE', '50MB')
+    UPLOAD_FOLDER = _ENV.get('UPLOAD_FOLDER', './uploads')
+    ALLOWED_EXTENSIONS = frozenset(
+        ext.lower().lstrip('.')
+        for ext in _split_csv(_ENV.get('ALLOWED_EXTENSIONS', 'pdf,docx,txt,md,doc,pptx'))
+    )
+    
+    # Shared on-disk cache for JIT-compiled kernels and downloaded models
+    JIT_CACHE_DIR = _ENV.get('JIT_CACHE_DIR', '/var/cache/prima_scholar')
+    
+    # API blueprints as import strings; set API_BLUEPRINTS to serve a subset
+    API_BLUEPRINTS = tuple(_ENV.get(
+        'API_BLUEPRINTS',
+        'routes.excellence_api:excellence_bp,'
+        'routes.mentorship_api:mentorship_bp,'
+        'routes.prediction_api:prediction_bp,'
+        'routes.resources_api:resources_bp'
+    ).split(','))
     
     # External API Configuration
-    SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
-    GOOGLE_CALENDAR_API_KEY = os.environ.get('GOOGLE_CALENDAR_API_KEY')
-    LINKEDIN_API_KEY = os.environ.get('LINKEDIN_API_KEY')
-    SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
+    SENDGRID_API_KEY = _ENV.get('SENDGRID_API_KEY')
+    GOOGLE_CALENDAR_API_KEY = _ENV.get('GOOGLE_CALENDAR_API_KEY')
+    LINKEDIN_API_KEY = _ENV.get('LINKEDIN_API_KEY')
+    SLACK_BOT_TOKEN = _ENV.get('SLACK_BOT_TOKEN')
     
     # Caching Configuration
-    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))  # 5 minutes
-    PREDICTION_CACHE_TTL = int(os.environ.get('PREDICTION_CACHE_TTL', 600))  # 10 minutes
-    ENABLE_CACHING = os.environ.get('ENABLE_CACHING', 'True').lower() == 'true'
+    CACHE_TTL = int(_ENV.get('CACHE_TTL', 300))  # 5 minutes
+    PREDICTION_CACHE_TTL = int(_ENV.get('PREDICTION_CACHE_TTL', 600))  # 10 minutes
+    ENABLE_CACHING = _ENV.get('ENABLE_CACHING', 'True').lower() == 'true'
+    HEALTH_CACHE_TTL = int(_ENV.get('HEALTH_CACHE_TTL', 10))  # seconds
     
     # Performance Settings
-    MAX_WORKERS = int(os.environ.get('MAX_WORKERS', 4))
-    GUNICORN_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 3))
-    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 2))
+    MAX_WORKERS = int(_ENV.get('MAX_WORKERS', 4))
+    GUNICORN_WORKERS = int(_ENV.get('GUNICORN_WORKERS', 3))
+    GUNICORN_THREADS = int(_ENV.get('GUNICORN_THREADS', 2))
+    
+    # Outbound async HTTP client limits (OpenAI, SendGrid, LinkedIn, Slack)
+    ASYNC_HTTP_MAX_CONNECTIONS = int(_ENV.get('ASYNC_HTTP_MAX_CONNECTIONS', 100))
+    ASYNC_HTTP_MAX_KEEPALIVE = int(_ENV.get('ASYNC_HTTP_MAX_KEEPALIVE', 20))
     
     # Security Settings
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000')
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', SECRET_KEY)
+    CORS_ORIGINS = _ENV.get('CORS_ORIGINS', 'http://localhost:3000')
+    CORS_ORIGINS_TUPLE = _split_csv(CORS_ORIGINS)
+    JWT_SECRET_KEY = _ENV.get('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
-    SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
+    SESSION_COOKIE_SECURE = _ENV.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
     # Logging Configuration
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.environ.get('LOG_FILE', './logs/prima_scholar.log')
-    ENABLE_FILE_LOGGING = os.environ.get('ENABLE_FILE_LOGGING', 'True').lower() == 'true'
-    
-    # Excellence Engine Configuration
-    EXCELLENCE_THRESHOLDS = {
-        'Dean_List': {'gpa_min': 3.5, 'excellence_score_min': 75},
-        'Magna_Cum_Laude': {'gpa_min': 3.7, 'excellence_score_min': 85},
-        'Summa_Cum_Laude': {'gpa_min': 3.9, 'excellence_score_min': 95},
-        'Phi_Beta_Kappa': {'gpa_min': 3.8, 'excellence_score_min': 90},
-        'Rhodes_Scholar': {'gpa_min': 3.9, 'excellence_score_min': 98},
-        'Fulbright_Scholar': {'gpa_min': 3.8, 'excellence_score_min': 92}
-    }
+    LOG_LEVEL = _ENV.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = _ENV.get('LOG_FILE', './logs/prima_scholar.log')
+    ENABLE_FILE_LOGGING = _ENV.get('ENABLE_FILE_LOGGING', 'True').lower() == 'true'
+    
+    # Excellence Engine Configuration (read-only, shared across worker forks)
+    EXCELLENCE_THRESHOLDS = MappingProxyType({
+        'Dean_List': MappingProxyType({'gpa_min': 3.5, 'excellence_score_min': 75}),
+        'Magna_Cum_Laude': MappingProxyType({'gpa_min': 3.7, 'excellence_score_min': 85}),
+        'Summa_Cum_Laude': MappingProxyType({'gpa_min': 3.9, 'excellence_score_min': 95}),
+        'Phi_Beta_Kappa': MappingProxyType({'gpa_min': 3.8, 'excellence_score_min': 90}),
+        'Rhodes_Scholar': MappingProxyType({'gpa_min': 3.9, 'excellence_score_min': 98}),
+        'Fulbright_Scholar': MappingProxyType({'gpa_min': 3.8, 'excellence_score_min': 92})
+    })
     
     # Academic Level Classifications
-    ACADEMIC_LEVELS = {
-        'undergraduate': {'weight': 1.0, 'complexity_multiplier': 1.0},
-        'graduate': {'weight': 1.2, 'complexity_multiplier': 1.3},
-        'doctoral': {'weight': 1.5, 'complexity_multiplier': 1.6},
-        'postdoc': {'weight': 1.8, 'complexity_multiplier': 2.0}
-    }
+    ACADEMIC_LEVELS = MappingProxyType({
+        'undergraduate': MappingProxyType({'weight': 1.0, 'complexity_multiplier': 1.0}),
+        'graduate': MappingProxyType({'weight': 1.2, 'complexity_multiplier': 1.3}),
+        'doctoral': MappingProxyType({'weight': 1.5, 'complexity_multiplier': 1.6}),
+        'postdoc': MappingProxyType({'weight': 1.8, 'complexity_multiplier': 2.0})
+    })
     
     # Excellence Tier Keywords
-    EXCELLENCE_KEYWORDS = {
-        'elite': ['seminal', 'groundbreaking', 'paradigm', 'revolutionary', 'fundamental theorem'],
-        'scholar': ['theoretical framework', 'methodology', 'empirical analysis', 'systematic approach'],
-        'advanced': ['complex', 'sophisticated', 'comprehensive', 'in-depth analysis'],
-        'basic': ['introduction', 'overview', 'basic concepts', 'fundamentals']
-    }
+    EXCELLENCE_KEYWORDS = MappingProxyType({
+        'elite': ('seminal', 'groundbreaking', 'paradigm', 'revolutionary', 'fundamental theorem'),
+        'scholar': ('theoretical framework', 'methodology', 'empirical analysis', 'systematic approach'),
+        'advanced': ('complex', 'sophisticated', 'comprehensive', 'in-depth analysis'),
+        'basic': ('introduction', 'overview', 'basic concepts', 'fundamentals')
+    })
     
     # Rate Limiting
-    RATE_LIMITS = {
+    RATE_LIMITS = MappingProxyType({
         'predictions': '60 per minute',
         'mentorship': '30 per minute',
         'uploads': '10 per minute',
         'general': '100 per minute'
-    }
+    })
     
     @staticmethod
     def validate_config():
@@ -128,8 +183,8 @@ class DevelopmentConfig(Config):
     ENABLE_FILE_LOGGING = True
     
     # Mock external APIs in development
-    MOCK_EXTERNAL_APIS = os.environ.get('MOCK_EXTERNAL_APIS', 'False').lower() == 'true'
-    DEBUG_PREDICTIONS = os.environ.get('DEBUG_PREDICTIONS', 'False').lower() == 'true'
+    MOCK_EXTERNAL_APIS = _ENV.get('MOCK_EXTERNAL_APIS', 'False').lower() == 'true'
+    DEBUG_PREDICTIONS = _ENV.get('DEBUG_PREDICTIONS', 'False').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production environment configuration"""
@@ -160,6 +215,7 @@ class TestingConfig(Config):
     # Fast testing
     CACHE_TTL = 0
     PREDICTION_CACHE_TTL = 0
+    HEALTH_CACHE_TTL = 0
 
 # Configuration mapping
 config = {
@@ -169,8 +225,9 @@ config = {
     'default': DevelopmentConfig
 }
 
+@lru_cache(maxsize=1)
 def get_config():
-    """Get configuration based on environment"""
+    """Get validated configuration based on environment (resolved once per process)"""
     env = os.environ.get('FLASK_ENV', 'development')
     config_class = config.get(env, config['default'])
     
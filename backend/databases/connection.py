@@ -4,29 +4,220 @@ Handles TiDB Serverless connections and database operations
 """
 
 import pymysql
+from pymysql.constants import CLIENT
+import atexit
 import logging
-import json
+import queue
+import random
+import threading
+import time
+import numpy as np
+import orjson
 from contextlib import contextmanager
-from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
+from itertools import chain
+from typing import AsyncIterator, Dict, Iterator, List, Any, Mapping, Optional, Set, Tuple, Union
+from cachetools import LRUCache
 import sqlalchemy
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+def _json_serializer(value: Any) -> str:
+    """orjson-backed encoder for JSON columns and JSON-literal parameters"""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+@lru_cache(maxsize=256)
+def _prepare(sql: str, expanding: Tuple[str, ...] = ()):
+    """Parse SQL into a TextClause once per distinct statement string
+    
+    Parameters named in ``expanding`` take a list and render as ``IN (...)``,
+    keeping one cached statement for every list length.
+    """
+    statement = text(sql)
+    if expanding:
+        statement = statement.bindparams(*[bindparam(name, expanding=True) for name in expanding])
+    return statement
+
+# Hot statements, defined once so every call hits the same _prepare entry
+STUDENT_PROFILE_QUERY = """
+    SELECT sp.*,
+           (SELECT COUNT(*) FROM mentorship_sessions ms
+            WHERE ms.student_id = sp.student_id) as total_sessions,
+           (SELECT COUNT(*) FROM achievement_records ar
+            WHERE ar.student_id = sp.student_id) as total_achievements,
+           (SELECT AVG(ms.session_quality_score) FROM mentorship_sessions ms
+            WHERE ms.student_id = sp.student_id) as avg_session_quality
+    FROM scholar_profiles sp
+    WHERE sp.student_id = :student_id
+"""
+
+UPDATE_EXCELLENCE_SCORE_QUERY = """
+    UPDATE scholar_profiles 
+    SET excellence_score = :score, 
+        last_updated = CURRENT_TIMESTAMP
+    WHERE student_id = :student_id
+"""
+
+# Bulk form of the score update. Only run for student_ids locked by
+# LOCK_EXISTING_STUDENTS_QUERY in the same transaction, so the insert never
+# creates a profile and always takes the update branch.
+LOCK_EXISTING_STUDENTS_QUERY = """
+    SELECT student_id FROM scholar_profiles
+    WHERE student_id IN :student_ids
+    FOR UPDATE
+"""
+UPSERT_EXCELLENCE_SCORES_QUERY = """
+    INSERT INTO scholar_profiles (student_id, excellence_score)
+    VALUES (:student_id, :score)
+    ON DUPLICATE KEY UPDATE
+    excellence_score = VALUES(excellence_score),
+    last_updated = CURRENT_TIMESTAMP
+"""
+
+# VALUES() in the update clause so PyMySQL can fold batches into one statement
+LOG_TRAJECTORY_QUERY = """
+    INSERT INTO excellence_trajectory 
+    (student_id, excellence_score, trajectory_date, factors_breakdown)
+    VALUES (:student_id, :score, CURDATE(), :factors)
+    ON DUPLICATE KEY UPDATE
+    excellence_score = VALUES(excellence_score),
+    factors_breakdown = VALUES(factors_breakdown)
+"""
+
+# Identifiers search methods may interpolate into SQL, per table
+SEARCHABLE_COLUMNS = {
+    'academic_documents': frozenset({
+        'id', 'title', 'content', 'document_type', 'academic_level', 'excellence_tier',
+        'embedding', 'excellence_embedding', 'citation_count', 'impact_factor',
+        'complexity_score', 'student_id'
+    })
+}
+
+_LIST_TYPES = (list, tuple, set, frozenset)
+
+def _check_identifiers(table: str, columns) -> None:
+    """Reject table/column names outside SEARCHABLE_COLUMNS before they reach SQL"""
+    allowed = SEARCHABLE_COLUMNS.get(table)
+    if allowed is None:
+        raise ValueError(f"Unsupported search table: {table}")
+    
+    unknown = set(columns) - allowed
+    if unknown:
+        raise ValueError(f"Unsupported search columns for {table}: {sorted(unknown)}")
+
+@lru_cache(maxsize=128)
+def _build_vector_query(table: str, embedding_column: str, filter_keys: Tuple[str, ...]) -> str:
+    """Cosine-distance top-k SQL for one (table, column, filters) shape"""
+    query = f"""
+            SELECT *,
+                   VEC_COSINE_DISTANCE({embedding_column}, :query_vector) as similarity_score
+            FROM {table}
+            WHERE {embedding_column} IS NOT NULL
+            """
+    for key in filter_keys:
+        query += f" AND {key} = :{key}"
+    
+    return query + " ORDER BY similarity_score ASC LIMIT :limit"
+
+@lru_cache(maxsize=128)
+def _build_hybrid_query(table: str, text_columns: Tuple[str, ...], embedding_column: str,
+                        filter_keys: Tuple[str, ...], list_keys: Tuple[str, ...]) -> str:
+    """Full-text + vector SQL for one (table, columns, filters) shape"""
+    text_scores = [f"fts_match_word(:query_text, {column})" for column in text_columns]
+    text_relevance = " + ".join(text_scores)
+    text_condition = " OR ".join(text_scores)
+    
+    query = f"""
+            SELECT *,
+                   {text_relevance} as text_relevance,
+                   VEC_COSINE_DISTANCE({embedding_column}, :query_vector) as vector_distance
+            FROM {table}
+            WHERE (({text_condition}) OR {embedding_column} IS NOT NULL)
+            """
+    for key in filter_keys:
+        if key in list_keys:
+            query += f" AND {key} IN :filter_{key}"
+        else:
+            query += f" AND {key} = :filter_{key}"
+    
+    return query + " ORDER BY (text_relevance - IFNULL(vector_distance, 1)) DESC LIMIT :limit"
+
+# Queued after the pending trajectory snapshots to stop the writer thread
+_TRAJECTORY_STOP = object()
 
 class DatabaseManager:
     """Manages TiDB Serverless database connections and operations"""
     
-    def __init__(self, connection_string: str, pool_size: int = 10, max_overflow: int = 20):
+    # Connection strings whose schema was already initialized in this process
+    _initialized_schemas = set()
+    
+    # One manager (and pool) per connection string, see get_instance
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    # Result sizes above this are streamed from a server-side cursor
+    STREAM_THRESHOLD = 100
+    
+    # Deadlock (1213), TiDB write conflict (9007) and retryable txn (8022) errors
+    RETRYABLE_WRITE_ERRORS = frozenset({1213, 8022, 9007})
+    WRITE_RETRY_ATTEMPTS = 5
+    
+    # Write-behind trajectory snapshots: flush every interval or batch, whichever first
+    TRAJECTORY_FLUSH_INTERVAL = 1.0
+    TRAJECTORY_BATCH_SIZE = 500
+    TRAJECTORY_SHUTDOWN_TIMEOUT = 10.0
+    
+    # Bytes of normalized embedding matrices kept for the in-process search fallback
+    EMBEDDING_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    
+    # int8 copies of embedding columns: (table, column) -> (blob, scale, zero)
+    QUANTIZED_EMBEDDINGS = {
+        ('academic_documents', 'embedding'): ('embedding_q', 'emb_scale', 'emb_zero')
+    }
+    
+    def __init__(self, connection_string: str, pool_size: int = 25, max_overflow: int = 20,
+                 pool_recycle: int = 540, pool_pre_ping: bool = False,
+                 pool_use_lifo: bool = True, pool_reset_on_return: Optional[str] = None):
         self.connection_string = connection_string
         self.logger = logging.getLogger(__name__)
         
+        self._pool_options = {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_recycle': pool_recycle,  # Retire connections before server-side idle timeouts
+            'pool_pre_ping': pool_pre_ping,  # Off by default; recycle keeps connections fresh
+            'pool_use_lifo': pool_use_lifo,  # Reuse warm connections, let overflow idle out
+            'pool_reset_on_return': pool_reset_on_return  # Connection.close() already ends transactions
+        }
+        
+        # Async (aiomysql) engine, created on first async query
+        self._async_engine = None
+        
+        # Trajectory snapshots queued by update_excellence_score, written by a
+        # background thread started on first use. Best-effort: snapshots still
+        # queued when the process is killed (SIGKILL, worker timeout) are lost.
+        self._trajectory_queue = queue.Queue()
+        self._trajectory_thread = None
+        self._trajectory_lock = threading.Lock()
+        self._trajectory_atexit = False
+        
+        # Normalized embedding matrices for in-process similarity search,
+        # keyed by (table, column, filters) -> (watermark, ids, matrix) and
+        # bounded by matrix size, least recently used first out
+        self._embedding_cache = LRUCache(maxsize=self.EMBEDDING_CACHE_MAX_BYTES,
+                                         getsizeof=lambda entry: max(1, entry[2].nbytes))
+        self._embedding_cache_lock = threading.Lock()
+        
         # Create SQLAlchemy engine with connection pooling
         self.engine = create_engine(
             connection_string,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-            pool_pre_ping=True,  # Validate connections
+            **self._pool_options,
             echo=False,  # Set to True for SQL debugging
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
             connect_args={
                 'charset': 'utf8mb4',
                 'use_unicode': True,
@@ -46,24 +237,77 @@ class DatabaseManager:
         
         self.logger.info("Database connection manager initialized")
     
-    def _initialize_schema(self):
-        """Initialize database schema if not exists"""
+    @classmethod
+    def get_instance(cls, connection_string: str, **kwargs) -> 'DatabaseManager':
+        """Return the process-wide manager for a connection string, creating it once"""
+        instance = cls._instances.get(connection_string)
+        if instance is None:
+            with cls._instances_lock:
+                instance = cls._instances.get(connection_string)
+                if instance is None:
+                    instance = cls(connection_string, **kwargs)
+                    cls._instances[connection_string] = instance
+        return instance
+    
+    def _schema_exists(self) -> bool:
+        """Probe for the last object the schema script creates on a pooled connection"""
+        probe_query = """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'academic_documents'
+        AND index_name = 'idx_ingest_batch'
+        """
+        
         try:
             with self.get_connection() as conn:
-                # Create tables using raw SQL
-                schema_sql = self._get_schema_sql()
-                
-                for statement in schema_sql.split(';'):
-                    statement = statement.strip()
-                    if statement:
-                        conn.execute(text(statement))
+                return conn.execute(_prepare(probe_query)).scalar() > 0
+        except Exception as e:
+            self.logger.warning(f"Schema probe failed, running DDL: {str(e)}")
+            return False
+    
+    def _initialize_schema(self):
+        """Initialize database schema if not exists, sending all DDL in one batch"""
+        if self.connection_string in DatabaseManager._initialized_schemas:
+            return
+        
+        # Another process already created every table; skip the DDL round-trip
+        if self._schema_exists():
+            DatabaseManager._initialized_schemas.add(self.connection_string)
+            return
+        
+        # Multi-statement support is enabled only on this short-lived DDL
+        # connection, never on the pooled connections used by queries
+        ddl_engine = create_engine(
+            self.connection_string,
+            poolclass=NullPool,
+            connect_args={
+                'charset': 'utf8mb4',
+                'use_unicode': True,
+                'client_flag': CLIENT.MULTI_STATEMENTS
+            }
+        )
+        
+        try:
+            raw_connection = ddl_engine.raw_connection()
+            try:
+                cursor = raw_connection.cursor()
+                cursor.execute(self._get_schema_sql())
                 
-                conn.commit()
-                self.logger.info("Database schema initialized successfully")
+                # Drain the result of every statement in the batch
+                while cursor.nextset():
+                    pass
                 
+                raw_connection.commit()
+            finally:
+                raw_connection.close()
+            
+            DatabaseManager._initialized_schemas.add(self.connection_string)
+            self.logger.info("Database schema initialized successfully")
+            
         except Exception as e:
             self.logger.error(f"Failed to initialize database schema: {str(e)}")
             raise
+        finally:
+            ddl_engine.dispose()
     
     def _get_schema_sql(self) -> str:
         """Get database schema SQL"""
@@ -92,18 +336,27 @@ class DatabaseManager:
             document_type ENUM('research_paper', 'course_material', 'thesis', 'journal_article', 'book', 'presentation') DEFAULT 'course_material',
             academic_level ENUM('undergraduate', 'graduate', 'doctoral', 'postdoc') DEFAULT 'undergraduate',
             excellence_tier ENUM('basic', 'advanced', 'scholar', 'elite') DEFAULT 'basic',
-            embedding TEXT,  -- JSON string of embedding vector
-            excellence_embedding TEXT,  -- JSON string of excellence-optimized embedding
+            embedding VECTOR(512),  -- Native float32 vector (text-embedding-3-small at 512 dimensions)
+            excellence_embedding VECTOR(512),  -- Excellence-optimized embedding
+            embedding_q VARBINARY(512),  -- int8-quantized copy of embedding
+            emb_scale FLOAT,  -- embedding ~= embedding_q * emb_scale + emb_zero
+            emb_zero FLOAT,
             citation_count INT DEFAULT 0,
             impact_factor DECIMAL(5,2) DEFAULT 0.00,
             complexity_score INT DEFAULT 50,
             scholarly_connections TEXT,  -- JSON array of scholarly connections
             student_id VARCHAR(100) NOT NULL,
+            ingest_batch CHAR(32),  -- Token shared by the chunks of one ingest
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             INDEX idx_student_documents (student_id),
+            INDEX idx_ingest_batch (ingest_batch),
             INDEX idx_excellence_tier (excellence_tier),
             INDEX idx_academic_level (academic_level),
             INDEX idx_document_type (document_type),
+            FULLTEXT INDEX ft_title (title) WITH PARSER MULTILINGUAL,
+            FULLTEXT INDEX ft_content (content) WITH PARSER MULTILINGUAL,
+            VECTOR INDEX idx_embedding ((VEC_COSINE_DISTANCE(embedding))) USING HNSW,
+            VECTOR INDEX idx_excellence_embedding ((VEC_COSINE_DISTANCE(excellence_embedding))) USING HNSW,
             FOREIGN KEY (student_id) REFERENCES scholar_profiles(student_id) ON DELETE CASCADE
         );
         
@@ -132,14 +385,18 @@ class DatabaseManager:
             query TEXT NOT NULL,
             query_sophistication ENUM('basic', 'intermediate', 'advanced', 'scholar') DEFAULT 'basic',
             excellence_gap_analysis LONGTEXT,
-            scholar_response LONGTEXT NOT NULL,
+            scholar_response JSON NOT NULL,  -- Reply fields not stored in their own columns
+            response_preview VARCHAR(203) AS (IF(CHAR_LENGTH(scholar_response->>'$.response') > 200,
+                CONCAT(LEFT(scholar_response->>'$.response', 200), '...'),
+                scholar_response->>'$.response')) STORED,  -- History preview, truncated once at write
             thinking_frameworks JSON,
             probability_updates JSON,
             recommended_actions JSON,
             session_quality_score DECIMAL(3,2) DEFAULT 0.00,
             response_time_ms INT DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            INDEX idx_student_sessions (student_id),
+            INDEX idx_student_quality (student_id, session_quality_score, query_sophistication),  -- Covers profile and session analytics aggregates
+            INDEX idx_student_created (student_id, created_at),  -- Latest sessions per student (history, mentorship context)
             INDEX idx_session_quality (session_quality_score),
             INDEX idx_query_sophistication (query_sophistication),
             FOREIGN KEY (student_id) REFERENCES scholar_profiles(student_id) ON DELETE CASCADE
@@ -209,7 +466,40 @@ class DatabaseManager:
             INDEX idx_student_tools (student_id),
             INDEX idx_tool_success (tool_name, success),
             FOREIGN KEY (student_id) REFERENCES scholar_profiles(student_id) ON DELETE CASCADE
-        )"""
+        );
+        
+        -- Embeddings keyed by SHA-256 of model, dimensions and input text, as float16 bytes
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            hash BINARY(32) PRIMARY KEY,
+            vec VARBINARY(1024) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        -- Running mentorship session aggregates, updated in the same transaction as each session insert
+        CREATE TABLE IF NOT EXISTS student_mentorship_stats (
+            student_id VARCHAR(100) PRIMARY KEY,
+            total_sessions INT NOT NULL DEFAULT 0,
+            sum_quality DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+            max_quality DECIMAL(3,2) NOT NULL DEFAULT 0.00,
+            scholar_queries INT NOT NULL DEFAULT 0,
+            advanced_queries INT NOT NULL DEFAULT 0,
+            high_quality_sessions INT NOT NULL DEFAULT 0,
+            FOREIGN KEY (student_id) REFERENCES scholar_profiles(student_id) ON DELETE CASCADE
+        );
+        
+        -- Seed the rollup from sessions stored before it existed
+        INSERT IGNORE INTO student_mentorship_stats
+            (student_id, total_sessions, sum_quality, max_quality,
+             scholar_queries, advanced_queries, high_quality_sessions)
+        SELECT student_id, COUNT(*), SUM(session_quality_score), MAX(session_quality_score),
+               SUM(query_sophistication = 'scholar'), SUM(query_sophistication = 'advanced'),
+               SUM(session_quality_score > 4.0)
+        FROM mentorship_sessions
+        GROUP BY student_id;
+        
+        -- Columns added to tables that may predate them
+        ALTER TABLE academic_documents ADD COLUMN IF NOT EXISTS ingest_batch CHAR(32);
+        ALTER TABLE academic_documents ADD INDEX IF NOT EXISTS idx_ingest_batch (ingest_batch)"""
     
     @contextmanager
     def get_connection(self):
@@ -242,7 +532,7 @@ class DatabaseManager:
             session.close()
     
     def test_connection(self) -> bool:
-        """Test database connection"""
+        """Test database connection using a pooled checkout"""
         try:
             with self.get_connection() as conn:
                 result = conn.execute(text("SELECT 1"))
@@ -251,76 +541,310 @@ class DatabaseManager:
             self.logger.error(f"Connection test failed: {str(e)}")
             return False
     
-    def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
-        """Execute SELECT query and return results as list of dictionaries"""
+    def execute_query(self, query: str, params: Optional[Dict] = None,
+                      expanding: Tuple[str, ...] = ()) -> List[Mapping]:
+        """Execute SELECT query and return results as read-only dict-like rows
+        
+        Rows are SQLAlchemy RowMappings (support ``row[key]``, ``row.get`` and
+        ``dict(row)``); copy with ``dict(row)`` before mutating or serializing.
+        """
         try:
             with self.get_connection() as conn:
-                result = conn.execute(text(query), params or {})
-                columns = result.keys()
-                return [dict(zip(columns, row)) for row in result.fetchall()]
+                result = conn.execute(_prepare(query, expanding), params or {})
+                return result.mappings().all()
         except Exception as e:
             self.logger.error(f"Query execution failed: {query[:100]}... Error: {str(e)}")
             raise
     
+    def execute_query_stream(self, query: str, params: Optional[Dict] = None,
+                             batch: int = 100,
+                             expanding: Tuple[str, ...] = ()) -> Iterator[List[Mapping]]:
+        """Execute SELECT query on a server-side cursor, yielding rows in batches
+        
+        Only ``batch`` rows are held client-side at a time; the connection stays
+        checked out until the generator is exhausted or closed.
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execution_options(yield_per=batch)
+                result = conn.execute(_prepare(query, expanding), params or {})
+                for partition in result.mappings().partitions():
+                    yield partition
+        except Exception as e:
+            self.logger.error(f"Streaming query failed: {query[:100]}... Error: {str(e)}")
+            raise
+    
+    def _execute_write(self, work):
+        """Run work(conn) in a transaction, retrying transient write conflicts
+        
+        Backoff is exponential with jitter; reads are never routed through here.
+        """
+        for attempt in range(self.WRITE_RETRY_ATTEMPTS):
+            try:
+                with self.engine.begin() as conn:
+                    return work(conn)
+            except DBAPIError as e:
+                error_code = e.orig.args[0] if e.orig is not None and e.orig.args else None
+                if error_code not in self.RETRYABLE_WRITE_ERRORS or attempt == self.WRITE_RETRY_ATTEMPTS - 1:
+                    raise
+                
+                self.logger.warning(f"Write conflict {error_code}, retrying (attempt {attempt + 1})")
+                time.sleep(0.01 * (2 ** attempt) + random.random() * 0.01)
+    
     def execute_insert(self, query: str, params: Optional[Dict] = None) -> int:
         """Execute INSERT query and return last insert ID"""
         try:
-            with self.get_connection() as conn:
-                result = conn.execute(text(query), params or {})
-                conn.commit()
-                return result.lastrowid
+            return self._execute_write(
+                lambda conn: conn.execute(_prepare(query), params or {}).lastrowid
+            )
         except Exception as e:
             self.logger.error(f"Insert execution failed: {query[:100]}... Error: {str(e)}")
             raise
     
+    def execute_insert_many(self, query: str, rows: List[Dict], batch_size: int = 1000) -> int:
+        """Execute one INSERT for many parameter dicts and return affected rows
+        
+        PyMySQL folds each batch into a single multi-row ``INSERT ... VALUES``;
+        all batches commit together in one transaction.
+        """
+        if not rows:
+            return 0
+        
+        def insert_batches(conn):
+            affected = 0
+            for start in range(0, len(rows), batch_size):
+                result = conn.execute(_prepare(query), rows[start:start + batch_size])
+                affected += result.rowcount
+            return affected
+        
+        try:
+            return self._execute_write(insert_batches)
+        except Exception as e:
+            self.logger.error(f"Bulk insert execution failed: {query[:100]}... Error: {str(e)}")
+            raise
+    
+    def execute_writes(self, statements: List[Tuple[str, Dict]]) -> List[int]:
+        """Execute several writes in one transaction and return each one's lastrowid"""
+        try:
+            return self._execute_write(
+                lambda conn: [conn.execute(_prepare(query), params).lastrowid
+                              for query, params in statements]
+            )
+        except Exception as e:
+            self.logger.error(f"Transaction of {len(statements)} writes failed: {str(e)}")
+            raise
+    
     def execute_update(self, query: str, params: Optional[Dict] = None) -> int:
         """Execute UPDATE/DELETE query and return affected rows"""
         try:
-            with self.get_connection() as conn:
-                result = conn.execute(text(query), params or {})
-                conn.commit()
-                return result.rowcount
+            return self._execute_write(
+                lambda conn: conn.execute(_prepare(query), params or {}).rowcount
+            )
         except Exception as e:
             self.logger.error(f"Update execution failed: {query[:100]}... Error: {str(e)}")
             raise
     
+    @property
+    def async_engine(self):
+        """Async engine on the aiomysql driver sharing the sync pool settings"""
+        if self._async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            
+            async_url = make_url(self.connection_string).set(drivername='mysql+aiomysql')
+            self._async_engine = create_async_engine(
+                async_url,
+                **self._pool_options,
+                json_serializer=_json_serializer,
+                json_deserializer=orjson.loads,
+                connect_args={'charset': 'utf8mb4'}
+            )
+        
+        return self._async_engine
+    
+    async def execute_query_async(self, query: str, params: Optional[Dict] = None) -> List[Mapping]:
+        """Async variant of execute_query for overlapping independent reads"""
+        try:
+            async with self.async_engine.connect() as conn:
+                result = await conn.execute(_prepare(query), params or {})
+                return result.mappings().all()
+        except Exception as e:
+            self.logger.error(f"Async query execution failed: {query[:100]}... Error: {str(e)}")
+            raise
+    
+    async def execute_query_stream_async(self, query: str, params: Optional[Dict] = None,
+                                         batch: int = 100) -> AsyncIterator[List[Mapping]]:
+        """Async variant of execute_query_stream on an aiomysql server-side cursor"""
+        try:
+            async with self.async_engine.connect() as conn:
+                result = await conn.stream(_prepare(query), params or {})
+                async for partition in result.mappings().partitions(batch):
+                    yield partition
+        except Exception as e:
+            self.logger.error(f"Async streaming query failed: {query[:100]}... Error: {str(e)}")
+            raise
+    
+    async def execute_update_async(self, query: str, params: Optional[Dict] = None) -> int:
+        """Async variant of execute_update; the statement commits on success"""
+        try:
+            async with self.async_engine.begin() as conn:
+                result = await conn.execute(_prepare(query), params or {})
+                return result.rowcount
+        except Exception as e:
+            self.logger.error(f"Async update execution failed: {query[:100]}... Error: {str(e)}")
+            raise
+    
+    def _stream_rows(self, query: str, params: Dict,
+                     expanding: Tuple[str, ...] = ()) -> Iterator[Mapping]:
+        """Lazy rows from a server-side cursor, with the first batch fetched eagerly
+        
+        The query runs before this returns, so connection and SQL errors reach
+        the search fallback; a failure after the first batch propagates to the consumer.
+        """
+        partitions = self.execute_query_stream(query, params, batch=self.STREAM_THRESHOLD,
+                                               expanding=expanding)
+        first = next(partitions, None)
+        if first is None:
+            return iter(())
+        return chain.from_iterable(chain((first,), partitions))
+    
     def vector_search(self, query_embedding: List[float], table: str, 
                      embedding_column: str = 'embedding', limit: int = 5,
-                     filters: Optional[Dict] = None) -> List[Dict]:
+                     filters: Optional[Dict] = None) -> Union[List[Mapping], Iterator[Mapping]]:
         """Perform vector similarity search using TiDB vector functions"""
+        filters = filters or {}
+        _check_identifiers(table, (embedding_column, *filters))
+        
         try:
-            # Convert embedding to string format for TiDB
-            embedding_str = json.dumps(query_embedding)
-            
-            # Build base query
-            base_query = f"""
-            SELECT *, 
-                   JSON_EXTRACT({embedding_column}, ') as embedding_data,
-                   SQRT(POWER(JSON_EXTRACT({embedding_column}, '$[0]') - :embed_0, 2) + 
-                        POWER(JSON_EXTRACT({embedding_column}, '$[1]') - :embed_1, 2)) as similarity_score
-            FROM {table}
-            WHERE {embedding_column} IS NOT NULL
-            """
-            
-            # Add filters if provided
-            params = {}
-            if filters:
-                for key, value in filters.items():
-                    base_query += f" AND {key} = :{key}"
-                    params[key] = value
+            # TiDB parses '[0.1, 0.2, ...]' literals into VECTOR values
+            params = {'query_vector': self.encode_vector(query_embedding), 'limit': limit, **filters}
             
-            # Add embedding parameters (simplified for first two dimensions)
-            params['embed_0'] = query_embedding[0] if query_embedding else 0
-            params['embed_1'] = query_embedding[1] if len(query_embedding) > 1 else 0
+            # Cosine distance ordered by the HNSW vector index
+            base_query = _build_vector_query(table, embedding_column, tuple(filters))
             
-            base_query += " ORDER BY similarity_score ASC LIMIT :limit"
-            params['limit'] = limit
+            if limit > self.STREAM_THRESHOLD:
+                return self._stream_rows(base_query, params)
             
             return self.execute_query(base_query, params)
             
         except Exception as e:
             self.logger.error(f"Vector search failed: {str(e)}")
-            # Fallback to regular search
+            # Fallback to in-process similarity over cached embeddings
+            return self._local_vector_search(query_embedding, table, embedding_column, limit, filters)
+    
+    def _get_embedding_matrix(self, table: str, embedding_column: str,
+                              filters: Optional[Dict] = None) -> Tuple[List[int], np.ndarray]:
+        """Load (ids, unit-normalized float32 matrix) for a table, cached by row watermark
+        
+        Embeddings are written once at ingest and never updated in place; a
+        re-embedded document is deleted and re-inserted, which moves the watermark.
+        """
+        where = f"WHERE {embedding_column} IS NOT NULL"
+        params = {}
+        if filters:
+            for key, value in filters.items():
+                where += f" AND {key} = :{key}"
+                params[key] = value
+        
+        # COUNT + MAX(id) changes on insert/delete, invalidating the cached matrix;
+        # an in-place UPDATE of an embedding would not be seen
+        watermark_rows = self.execute_query(
+            f"SELECT COUNT(*) AS row_count, MAX(id) AS max_id FROM {table} {where}", params
+        )
+        watermark = tuple(watermark_rows[0].values()) if watermark_rows else (0, None)
+        
+        cache_key = (table, embedding_column, tuple(sorted((filters or {}).items())))
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(cache_key)
+        if cached and cached[0] == watermark:
+            return cached[1], cached[2]
+        
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(cache_key)
+            if cached and cached[0] == watermark:
+                return cached[1], cached[2]
+            
+            quantized = self.QUANTIZED_EMBEDDINGS.get((table, embedding_column))
+            if quantized:
+                # Only rows written before quantization ship the full-precision vector
+                blob_column, scale_column, zero_column = quantized
+                select = (f"{blob_column} AS embedding_q, {scale_column} AS emb_scale, "
+                          f"{zero_column} AS emb_zero, "
+                          f"CASE WHEN {blob_column} IS NULL THEN {embedding_column} END AS embedding")
+            else:
+                select = f"{embedding_column} AS embedding"
+            
+            rows = self.execute_query(f"SELECT id, {select} FROM {table} {where}", params)
+            ids = [row['id'] for row in rows]
+            
+            if rows:
+                matrix = np.array([self._decode_embedding(row) for row in rows], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.where(norms == 0, 1, norms)
+            else:
+                matrix = np.empty((0, 0), dtype=np.float32)
+            
+            # A matrix larger than the whole budget is used once and not cached
+            if matrix.nbytes <= self.EMBEDDING_CACHE_MAX_BYTES:
+                self._embedding_cache[cache_key] = (watermark, ids, matrix)
+            return ids, matrix
+    
+    @staticmethod
+    def quantize_embedding(values: List[float]) -> Tuple[bytes, float, float]:
+        """Pack an embedding as int8 bytes plus its (scale, zero) dequantization terms"""
+        vector = np.asarray(values, dtype=np.float32)
+        low, high = float(vector.min()), float(vector.max())
+        scale = (high - low) / 255 or 1.0
+        zero = low + 128 * scale
+        packed = np.clip(np.round((vector - zero) / scale), -128, 127).astype(np.int8)
+        return packed.tobytes(), scale, zero
+    
+    @staticmethod
+    def encode_vector(values: List[float]) -> str:
+        """TiDB VECTOR literal at float32 precision, the type the column stores"""
+        return orjson.dumps(np.asarray(values, dtype=np.float32), option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    @staticmethod
+    def _decode_embedding(row: Mapping) -> np.ndarray:
+        """Float32 vector from a quantized blob, or from its JSON/VECTOR text form"""
+        if row.get('embedding_q') is not None:
+            packed = np.frombuffer(row['embedding_q'], dtype=np.int8).astype(np.float32)
+            return packed * row['emb_scale'] + row['emb_zero']
+        return np.asarray(orjson.loads(row['embedding']), dtype=np.float32)
+    
+    def _local_vector_search(self, query_embedding: List[float], table: str,
+                             embedding_column: str, limit: int,
+                             filters: Optional[Dict] = None) -> List[Dict]:
+        """Cosine top-k with NumPy when the database cannot rank vectors itself"""
+        try:
+            ids, matrix = self._get_embedding_matrix(table, embedding_column, filters)
+            if not ids or limit <= 0:
+                return []
+            
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_vector /= np.linalg.norm(query_vector) or 1
+            
+            # Cosine distance, matching VEC_COSINE_DISTANCE ordering
+            distances = 1 - matrix @ query_vector
+            k = min(limit, len(ids))
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top])]
+            
+            rows = {
+                row['id']: row
+                for row in self.execute_query(
+                    f"SELECT * FROM {table} WHERE id IN :ids",
+                    {'ids': [ids[idx] for idx in top]},
+                    expanding=('ids',)
+                )
+            }
+            
+            return [
+                {**rows[ids[idx]], 'similarity_score': float(distances[idx])}
+                for idx in top if ids[idx] in rows
+            ]
+            
+        except Exception as e:
+            self.logger.error(f"Local vector search failed: {str(e)}")
             fallback_query = f"SELECT * FROM {table} LIMIT :limit"
             return self.execute_query(fallback_query, {'limit': limit})
     
@@ -328,43 +852,37 @@ class DatabaseManager:
                      table: str, text_columns: List[str],
                      embedding_column: str = 'embedding',
                      excellence_filters: Optional[Dict] = None,
-                     limit: int = 5) -> List[Dict]:
-        """Perform hybrid search combining full-text and vector search"""
+                     limit: int = 5) -> Union[List[Mapping], Iterator[Mapping]]:
+        """Perform hybrid search combining full-text and vector search
+        
+        Limits above STREAM_THRESHOLD return a lazy row iterator backed by a
+        server-side cursor instead of a fully buffered list.
+        """
+        excellence_filters = excellence_filters or {}
+        _check_identifiers(table, (embedding_column, *text_columns, *excellence_filters))
+        
         try:
-            # Build text search conditions
-            text_conditions = []
-            params = {'query_text': f"%{query_text}%"}
-            
-            for column in text_columns:
-                text_conditions.append(f"{column} LIKE :query_text")
-            
-            text_condition = " OR ".join(text_conditions)
+            params = {
+                'query_text': query_text,
+                'query_vector': self.encode_vector(query_embedding),
+                'limit': limit
+            }
             
-            # Build query with both text and vector similarity
-            query = f"""
-            SELECT *,
-                   CASE WHEN ({text_condition}) THEN 1.0 ELSE 0.0 END as text_relevance,
-                   0.5 as vector_relevance
-            FROM {table}
-            WHERE ({text_condition}) OR {embedding_column} IS NOT NULL
-            """
+            # Excellence filters; list values bind as one expanding IN
+            list_keys = tuple(key for key, value in excellence_filters.items()
+                              if isinstance(value, _LIST_TYPES))
+            for key, value in excellence_filters.items():
+                params[f"filter_{key}"] = list(value) if key in list_keys else value
+            expanding = tuple(f"filter_{key}" for key in list_keys)
             
-            # Add excellence filters
-            if excellence_filters:
-                for key, value in excellence_filters.items():
-                    if isinstance(value, list):
-                        placeholders = ','.join([f":filter_{key}_{i}" for i in range(len(value))])
-                        query += f" AND {key} IN ({placeholders})"
-                        for i, v in enumerate(value):
-                            params[f"filter_{key}_{i}"] = v
-                    else:
-                        query += f" AND {key} = :filter_{key}"
-                        params[f"filter_{key}"] = value
+            # BM25 relevance from each column's FULLTEXT index plus vector distance
+            query = _build_hybrid_query(table, tuple(text_columns), embedding_column,
+                                        tuple(excellence_filters), list_keys)
             
-            query += " ORDER BY (text_relevance + vector_relevance) DESC LIMIT :limit"
-            params['limit'] = limit
+            if limit > self.STREAM_THRESHOLD:
+                return self._stream_rows(query, params, expanding)
             
-            return self.execute_query(query, params)
+            return self.execute_query(query, params, expanding=expanding)
             
         except Exception as e:
             self.logger.error(f"Hybrid search failed: {str(e)}")
@@ -379,53 +897,28 @@ class DatabaseManager:
     
     def get_student_profile(self, student_id: str) -> Optional[Dict]:
         """Get student profile with latest data"""
-        query = """
-        SELECT sp.*, 
-               COUNT(DISTINCT ms.id) as total_sessions,
-               COUNT(DISTINCT ar.id) as total_achievements,
-               AVG(ms.session_quality_score) as avg_session_quality
-        FROM scholar_profiles sp
-        LEFT JOIN mentorship_sessions ms ON sp.student_id = ms.student_id
-        LEFT JOIN achievement_records ar ON sp.student_id = ar.student_id
-        WHERE sp.student_id = :student_id
-        GROUP BY sp.id
-        """
-        
-        results = self.execute_query(query, {'student_id': student_id})
+        results = self.execute_query(STUDENT_PROFILE_QUERY, {'student_id': student_id})
         return results[0] if results else None
     
     def update_excellence_score(self, student_id: str, new_score: float,
                                factors: Dict) -> bool:
-        """Update student excellence score and log trajectory"""
+        """Update student excellence score; the trajectory snapshot is written behind"""
         try:
             # Update profile
-            update_query = """
-            UPDATE scholar_profiles 
-            SET excellence_score = :score, 
-                last_updated = CURRENT_TIMESTAMP
-            WHERE student_id = :student_id
-            """
-            
-            self.execute_update(update_query, {
+            updated = self.execute_update(UPDATE_EXCELLENCE_SCORE_QUERY, {
                 'score': new_score,
                 'student_id': student_id
             })
             
-            # Log trajectory
-            trajectory_query = """
-            INSERT INTO excellence_trajectory 
-            (student_id, excellence_score, trajectory_date, factors_breakdown)
-            VALUES (:student_id, :score, CURDATE(), :factors)
-            ON DUPLICATE KEY UPDATE
-            excellence_score = :score,
-            factors_breakdown = :factors
-            """
-            
-            self.execute_insert(trajectory_query, {
-                'student_id': student_id,
-                'score': new_score,
-                'factors': json.dumps(factors)
-            })
+            # Log trajectory off the request path; an unknown student would fail
+            # the foreign key and with it the whole snapshot batch
+            if updated > 0:
+                self._ensure_trajectory_writer()
+                self._trajectory_queue.put_nowait({
+                    'student_id': student_id,
+                    'score': new_score,
+                    'factors': _json_serializer(factors)
+                })
             
             return True
             
@@ -433,46 +926,190 @@ class DatabaseManager:
             self.logger.error(f"Failed to update excellence score: {str(e)}")
             return False
     
-    def cleanup_old_data(self, days: int = 90):
-        """Clean up old data to maintain performance"""
+    def update_excellence_scores(self, rows: List[Tuple[str, float, Dict]]) -> Set[str]:
+        """Write many (student_id, score, factors) updates in one multi-row upsert
+        
+        Like the single-student UPDATE, unknown student_ids are skipped rather
+        than inserted. Returns the student_ids that were updated.
+        """
+        if not rows:
+            return set()
+        
+        # Last score wins for a student listed twice
+        scores = {student_id: score for student_id, score, _ in rows}
+        
+        def update_existing(conn):
+            existing = {row[0] for row in conn.execute(
+                _prepare(LOCK_EXISTING_STUDENTS_QUERY, ('student_ids',)),
+                {'student_ids': list(scores)}
+            )}
+            if existing:
+                conn.execute(_prepare(UPSERT_EXCELLENCE_SCORES_QUERY), [
+                    {'student_id': student_id, 'score': scores[student_id]}
+                    for student_id in existing
+                ])
+            return existing
+        
+        try:
+            existing = self._execute_write(update_existing)
+        except Exception as e:
+            self.logger.error(f"Bulk score update failed for {len(scores)} students: {str(e)}")
+            raise
+        
+        self._ensure_trajectory_writer()
+        for student_id, score, factors in rows:
+            if student_id not in existing:
+                continue
+            self._trajectory_queue.put_nowait({
+                'student_id': student_id,
+                'score': score,
+                'factors': _json_serializer(factors)
+            })
+        
+        return existing
+    
+    def _ensure_trajectory_writer(self):
+        """Start the trajectory writer thread in this process if it is not running"""
+        if self._trajectory_thread is not None and self._trajectory_thread.is_alive():
+            return
+        
+        with self._trajectory_lock:
+            if self._trajectory_thread is None or not self._trajectory_thread.is_alive():
+                self._trajectory_thread = threading.Thread(
+                    target=self._drain_trajectory,
+                    name='prima-trajectory-writer',
+                    daemon=True
+                )
+                self._trajectory_thread.start()
+                if not self._trajectory_atexit:
+                    atexit.register(self.flush_trajectory)
+                    self._trajectory_atexit = True
+    
+    def _drain_trajectory(self):
+        """Collect queued snapshots and write each batch with one multi-row upsert
+        
+        Exits after writing everything queued ahead of _TRAJECTORY_STOP.
+        """
+        while True:
+            snapshot = self._trajectory_queue.get()
+            if snapshot is _TRAJECTORY_STOP:
+                return
+            
+            batch = [snapshot]
+            stopping = False
+            deadline = time.monotonic() + self.TRAJECTORY_FLUSH_INTERVAL
+            
+            while len(batch) < self.TRAJECTORY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    snapshot = self._trajectory_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if snapshot is _TRAJECTORY_STOP:
+                    stopping = True
+                    break
+                batch.append(snapshot)
+            
+            self._write_trajectory(batch)
+            if stopping:
+                return
+    
+    def _write_trajectory(self, batch: List[Dict]):
+        """Upsert a batch of snapshots; failures are logged and the batch dropped"""
+        try:
+            self.execute_insert_many(LOG_TRAJECTORY_QUERY, batch)
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(batch)} trajectory snapshots: {str(e)}")
+    
+    def flush_trajectory(self, timeout: Optional[float] = None):
+        """Write every pending snapshot, including a batch the writer is holding
+        
+        Stops the writer behind the queued snapshots and waits for it, then
+        writes anything left over here; the next snapshot restarts the writer.
+        Runs at exit and from gunicorn's worker_exit hook.
+        """
+        timeout = self.TRAJECTORY_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        
+        with self._trajectory_lock:
+            thread = self._trajectory_thread
+            if thread is not None and thread.is_alive():
+                self._trajectory_queue.put(_TRAJECTORY_STOP)
+                thread.join(timeout)
+                if thread.is_alive():
+                    self.logger.warning("Trajectory writer did not finish before shutdown timeout")
+                    return
+            
+            batch = []
+            while True:
+                try:
+                    snapshot = self._trajectory_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if snapshot is not _TRAJECTORY_STOP:
+                    batch.append(snapshot)
+        
+        if batch:
+            self._write_trajectory(batch)
+    
+    def cleanup_old_data(self, days: int = 90, batch_size: int = 10000):
+        """Clean up old data to maintain performance
+        
+        Rows are deleted in LIMITed batches, each committed on its own, so no
+        single transaction carries a large write set.
+        """
         try:
             cleanup_queries = [
-                f"DELETE FROM external_tool_logs WHERE created_at < DATE_SUB(NOW(), INTERVAL {days} DAY)",
-                f"DELETE FROM excellence_trajectory WHERE created_at < DATE_SUB(NOW(), INTERVAL {days * 2} DAY)",
+                ("DELETE FROM external_tool_logs "
+                 "WHERE created_at < DATE_SUB(NOW(), INTERVAL :days DAY) LIMIT :batch", days),
+                ("DELETE FROM excellence_trajectory "
+                 "WHERE created_at < DATE_SUB(NOW(), INTERVAL :days DAY) LIMIT :batch", days * 2),
             ]
             
-            for query in cleanup_queries:
-                affected = self.execute_update(query)
+            for query, retention_days in cleanup_queries:
+                params = {'days': retention_days, 'batch': batch_size}
+                affected = 0
+                
+                while True:
+                    deleted = self.execute_update(query, params)
+                    affected += deleted
+                    if deleted < batch_size:
+                        break
+                
                 self.logger.info(f"Cleaned up {affected} old records")
                 
         except Exception as e:
             self.logger.error(f"Data cleanup failed: {str(e)}")
     
     def get_database_stats(self) -> Dict:
-        """Get database statistics for monitoring"""
+        """Get database statistics for monitoring in a single round-trip
+        
+        Row counts are TiDB's cached table statistics rather than exact scans.
+        """
         try:
-            stats = {}
-            
-            tables = [
+            tables = (
                 'scholar_profiles', 'academic_documents', 'distinction_predictions',
                 'mentorship_sessions', 'scholar_resources', 'achievement_records'
-            ]
-            
-            for table in tables:
-                count_query = f"SELECT COUNT(*) as count FROM {table}"
-                result = self.execute_query(count_query)
-                stats[table] = result[0]['count'] if result else 0
+            )
             
-            # Add storage info
-            storage_query = """
-            SELECT 
-                ROUND(SUM(data_length + index_length) / 1024 / 1024, 2) AS total_size_mb
-            FROM information_schema.tables 
+            stats_query = """
+            SELECT table_name AS table_name,
+                   table_rows AS table_rows,
+                   data_length + index_length AS size_bytes
+            FROM information_schema.tables
             WHERE table_schema = DATABASE()
             """
             
-            storage_result = self.execute_query(storage_query)
-            stats['total_size_mb'] = storage_result[0]['total_size_mb'] if storage_result else 0
+            stats = {table: 0 for table in tables}
+            total_bytes = 0
+            
+            for row in self.execute_query(stats_query):
+                total_bytes += row['size_bytes'] or 0
+                if row['table_name'] in stats:
+                    stats[row['table_name']] = row['table_rows'] or 0
+            
+            stats['total_size_mb'] = round(total_bytes / 1024 / 1024, 2)
             
             return stats
             
@@ -480,9 +1117,23 @@ class DatabaseManager:
             self.logger.error(f"Failed to get database stats: {str(e)}")
             return {}
     
+    def reset_after_fork(self):
+        """Discard pooled connections inherited from a parent process
+        
+        The parent keeps using its own sockets, so they are dropped from this
+        process's pool without being closed.
+        """
+        self.engine.dispose(close=False)
+        self._async_engine = None
+        
+        # Threads do not survive fork; the child starts its own writer on demand
+        self._trajectory_queue = queue.Queue()
+        self._trajectory_thread = None
+    
     def close(self):
         """Close all database connections"""
         try:
+            self.flush_trajectory()
             self.engine.dispose()
             self.logger.info("Database connections closed")
         except Exception as e:
@@ -0,0 +1,38 @@
+"""
+Prima Scholar Gunicorn Configuration
+Worker settings, fork safety and per-worker warm-up hooks
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+worker_class = 'gthread'
+timeout = 120
+
+# Load the app once in the master so workers share it copy-on-write;
+# post_fork drops the connection state that must not cross the fork
+preload_app = True
+
+def post_fork(server, worker):
+    """Reset inherited database and cache connections in the new worker"""
+    from app import app, reset_after_fork
+    
+    reset_after_fork(app)
+
+def post_worker_init(worker):
+    """Warm services in each worker before it starts accepting requests"""
+    from app import warm_up_services
+    
+    try:
+        warm_up_services(worker.wsgi)
+    except Exception as e:
+        worker.log.warning(f"Worker warm-up failed: {str(e)}")
+
+def worker_exit(server, worker):
+    """Write the worker's pending trajectory snapshots before it exits"""
+    try:
+        worker.wsgi.db_manager.flush_trajectory()
+    except Exception as e:
+        worker.log.warning(f"Trajectory flush on exit failed: {str(e)}")
@@ -6,10 +6,29 @@ Core algorithm for calculating excellence scores and predicting academic distinc
 import numpy as np
 import logging
 import json
-from typing import Dict, List, Tuple, Optional
+import threading
+from cachetools import TTLCache
+from typing import Dict, List, NamedTuple, Set, Tuple, Optional
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass
+from functools import cached_property
 import openai
+import redis
+from sqlalchemy.exc import SQLAlchemyError
+
+from services.openai_clients import get_openai_client
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Pure-Python stand-in when numba is not installed"""
+        def decorate(func):
+            return func
+        return decorate
 
 @dataclass
 class DistinctionRequirement:
@@ -19,23 +38,186 @@ class DistinctionRequirement:
     additional_requirements: List[str]
     weight_factors: Dict[str, float]
 
-@dataclass
-class ExcellenceFactors:
+class ExcellenceFactors(NamedTuple):
     """Factors contributing to academic excellence"""
     academic_performance: float  # 40%
     research_engagement: float   # 25%
     critical_thinking: float     # 20%
     leadership_service: float    # 10%
     innovation_creativity: float # 5%
+    
+    def as_array(self) -> np.ndarray:
+        """Factor scores in FACTOR_ORDER as a float64 vector"""
+        return np.asarray(self, dtype=np.float64)
+
+# Canonical factor order shared by ExcellenceFactors and the weight vector
+FACTOR_ORDER = ExcellenceFactors._fields
+
+# Points per mentorship query sophistication level
+SOPHISTICATION_SCORES = {
+    'basic': 10,
+    'intermediate': 25,
+    'advanced': 40,
+    'scholar': 60
+}
+
+# Last ten trajectory points, newest first; one string so the DB layer's
+# statement cache parses it once per process
+RECENT_TRAJECTORY_QUERY = """
+    SELECT excellence_score, trajectory_date
+    FROM excellence_trajectory
+    WHERE student_id = :student_id
+    ORDER BY trajectory_date DESC
+    LIMIT 10
+"""
+
+# Recent trajectory scores mirrored in Redis, newest first, so the slope needs no SQL read
+TRAJECTORY_WINDOW = 10
+TRAJECTORY_WINDOW_TTL = 3600
+
+# Appends only to an existing window; a missing window is seeded from SQL on the next read
+PUSH_TRAJECTORY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('LPUSH', KEYS[1], ARGV[1])
+    redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 0
+"""
+
+# gpa_trend encoded for the compiled kernel
+GPA_TREND_CODES = {'improving': 1, 'declining': -1}
+
+@njit(cache=True, fastmath=True)
+def _score_kernel(gpa, honors, trend_code, n_achievements, research_projects, publications,
+                  presentations, n_sessions, avg_session_quality, avg_sophistication, frameworks,
+                  complex_docs, n_leadership, service_hours, leadership_impact, original_projects,
+                  creative_works, innovative_solutions, level_multiplier, weights):
+    """Scalar excellence kernel: returns (final_score, five factor scores)
+    
+    Single-student form of _score_factor_columns, compiled to machine code;
+    the two must change together.
+    """
+    # Academic performance
+    academic = min(gpa / 4.0 * 100.0, 100.0)
+    bonus = 0.0
+    if honors > 0:
+        bonus += min(honors * 2.0, 10.0)
+    if trend_code == 1:
+        bonus += 5.0
+    elif trend_code == -1:
+        bonus -= 5.0
+    bonus += min(n_achievements * 3.0, 15.0)
+    academic = min(academic + bonus, 100.0)
+    
+    # Research engagement
+    research = 20.0 + min(research_projects * 15.0, 40.0)
+    research += min(publications * 20.0 + presentations * 10.0, 30.0)
+    if n_sessions > 0:
+        research += min(avg_session_quality * 10.0, 10.0)
+    research = min(research, 100.0)
+    
+    # Critical thinking
+    thinking = 40.0
+    if n_sessions > 0:
+        thinking = max(thinking, avg_sophistication)
+    thinking += min(frameworks * 3.0, 20.0) + min(complex_docs * 5.0, 15.0)
+    thinking = min(thinking, 100.0)
+    
+    # Leadership and service
+    leadership = 10.0 + min(n_leadership * 15.0, 45.0)
+    leadership += min(service_hours / 10.0, 25.0) + min(leadership_impact, 20.0)
+    leadership = min(leadership, 100.0)
+    
+    # Innovation and creativity
+    innovation = 30.0 + min(original_projects * 10.0, 30.0)
+    innovation += min(creative_works * 15.0, 25.0) + min(innovative_solutions * 2.0, 15.0)
+    innovation = min(innovation, 100.0)
+    
+    w0, w1, w2, w3, w4 = weights
+    total = (academic * w0 + research * w1 + thinking * w2
+             + leadership * w3 + innovation * w4)
+    final_score = min(total * level_multiplier, 100.0)
+    
+    return final_score, academic, research, thinking, leadership, innovation
+
+def _session_means(sessions: List[Dict]) -> Tuple[float, float]:
+    """Mean session quality and query sophistication from a single pass over the sessions"""
+    if not sessions:
+        return 0.0, 0.0
+    values = np.array(
+        [(s.get('session_quality_score', 0),
+          SOPHISTICATION_SCORES.get(s.get('query_sophistication', 'basic'), 10)) for s in sessions],
+        dtype=np.float64
+    )
+    avg_quality, avg_sophistication = values.mean(axis=0).tolist()
+    return avg_quality, avg_sophistication
+
+def _score_factor_columns(cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized factor scores for N students held as column arrays, shape (N, 5)
+    
+    Mirrors _score_kernel term for term.
+    """
+    has_sessions = cols['session_count'] > 0
+    
+    trend = cols['gpa_trend']
+    academic = np.minimum(
+        np.minimum(cols['current_gpa'] / 4.0 * 100, 100)
+        + np.where(cols['honors_courses'] > 0, np.minimum(cols['honors_courses'] * 2, 10), 0)
+        + np.where(trend == 'improving', 5, np.where(trend == 'declining', -5, 0))
+        + np.minimum(cols['achievement_count'] * 3, 15),
+        100
+    )
+    
+    research = np.minimum(
+        20
+        + np.minimum(cols['research_projects'] * 15, 40)
+        + np.minimum(cols['publications'] * 20 + cols['presentations'] * 10, 30)
+        + np.where(has_sessions, np.minimum(cols['avg_session_quality'] * 10, 10), 0),
+        100
+    )
+    
+    thinking = np.minimum(
+        np.where(has_sessions, np.maximum(40, cols['avg_sophistication']), 40)
+        + np.minimum(cols['theoretical_frameworks_engaged'] * 3, 20)
+        + np.minimum(cols['elite_tier_documents'] * 5, 15),
+        100
+    )
+    
+    leadership = np.minimum(
+        10
+        + np.minimum(cols['leadership_role_count'] * 15, 45)
+        + np.minimum(cols['service_hours'] / 10, 25)
+        + np.minimum(cols['leadership_impact_score'], 20),
+        100
+    )
+    
+    innovation = np.minimum(
+        30
+        + np.minimum(cols['original_projects'] * 10, 30)
+        + np.minimum(cols['creative_works'] * 15, 25)
+        + np.minimum(cols['innovative_approaches_suggested'] * 2, 15),
+        100
+    )
+    
+    return np.column_stack([academic, research, thinking, leadership, innovation])
 
 class ExcellenceEngine:
     """Core engine for calculating excellence scores and predicting academic honors"""
     
-    def __init__(self, db_manager, openai_api_key: str):
+    def __init__(self, db_manager, openai_api_key: str,
+                 redis_pool: Optional[redis.ConnectionPool] = None):
         self.db = db_manager
-        self.client = openai.OpenAI(api_key=openai_api_key)
+        self._openai_api_key = openai_api_key
         self.logger = logging.getLogger(__name__)
         
+        # Optional Redis mirror of each student's recent trajectory window
+        self.redis_client = None
+        self._push_trajectory = None
+        if redis_pool is not None:
+            self.redis_client = redis.Redis(connection_pool=redis_pool)
+            self._push_trajectory = self.redis_client.register_script(PUSH_TRAJECTORY_SCRIPT)
+        
         # Excellence thresholds for different distinctions
         self.distinction_requirements = {
             'Dean_List': DistinctionRequirement(
@@ -76,6 +258,15 @@ class ExcellenceEngine:
             )
         }
         
+        # Struct-of-arrays view of the requirements for vectorized probabilities
+        self._dist_names = tuple(self.distinction_requirements)
+        self._dist_index = {name: i for i, name in enumerate(self._dist_names)}
+        requirements = [self.distinction_requirements[name] for name in self._dist_names]
+        self._dist_gpa_min = np.array([r.gpa_min for r in requirements], dtype=np.float64)
+        self._dist_score_min = np.array([r.excellence_score_min for r in requirements], dtype=np.float64)
+        self._dist_w_gpa = np.array([r.weight_factors['gpa'] for r in requirements], dtype=np.float64)
+        self._dist_w_exc = np.array([r.weight_factors['excellence'] for r in requirements], dtype=np.float64)
+        
         # Excellence calculation weights
         self.factor_weights = {
             'academic_performance': 0.40,
@@ -84,291 +275,432 @@ class ExcellenceEngine:
             'leadership_service': 0.10,
             'innovation_creativity': 0.05
         }
+        self._weights = np.array([self.factor_weights[name] for name in FACTOR_ORDER], dtype=np.float64)
+        # Plain floats for the scalar kernel; indexing a tuple avoids NumPy scalar boxing
+        # when the kernel runs uncompiled
+        self._weights_tuple = tuple(self._weights.tolist())
+        
+        # Short-lived per-student data cache shared by scoring and predictions
+        self._student_cache = TTLCache(maxsize=10_000, ttl=60)
+        self._student_cache_lock = threading.Lock()
+        
+        # Predictions keyed by (student_id, distinction, _prediction_version)
+        self._prediction_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._prediction_cache_lock = threading.Lock()
+        
+        # Profile fields that count towards prediction confidence
+        self._conf_fields = (
+            'current_gpa', 'mentorship_sessions', 'academic_achievements',
+            'research_projects', 'leadership_roles'
+        )
+        self._conf_len = len(self._conf_fields)
+        
+        # Trajectory factor per student; dropped whenever a new score is written
+        self._trajectory_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._trajectory_cache_lock = threading.Lock()
         
         self.logger.info("Excellence Engine initialized")
     
-    def calculate_excellence_score(self, student_id: str, student_data: Optional[Dict] = None) -> Dict:
-        """Calculate comprehensive excellence score for a student"""
+    @cached_property
+    def client(self) -> openai.OpenAI:
+        """OpenAI client, built lazily and shared across engines"""
+        return get_openai_client(self._openai_api_key)
+    
+    def warmup(self) -> None:
+        """Run a synthetic score computation so the first request hits warm code paths"""
+        sample_data = {
+            'current_gpa': 3.5,
+            'academic_level': 'undergraduate',
+            'honors_courses': 1,
+            'academic_achievements': ['warmup'],
+            'mentorship_sessions': [
+                {'session_quality_score': 3.0, 'query_sophistication': 'advanced'}
+            ],
+            'leadership_roles': ['warmup'],
+            'service_hours': 10
+        }
+        
+        _score_kernel(*self._kernel_inputs(sample_data), 1.0, self._weights_tuple)  # Triggers JIT compile
+        _score_factor_columns(self._factor_columns([sample_data]))
+        
+        self.logger.info("Excellence Engine warmed up")
+    
+    def calculate_excellence_score(self, student_id: str, student_data: Optional[Dict] = None,
+                                   persist: bool = True) -> Dict:
+        """Calculate comprehensive excellence score for a student
+        
+        With ``persist=False`` the score is only computed, not written back.
+        """
         try:
             if not student_data:
-                student_data = self._get_comprehensive_student_data(student_id)
+                student_data = self._get_student_data_cached(student_id)
             
             if not student_data:
                 return {'error': 'Student data not found', 'score': 0}
             
-            # Calculate individual factor scores
-            factors = self._calculate_excellence_factors(student_data)
-            
-            # Weighted total score
-            total_score = (
-                factors.academic_performance * self.factor_weights['academic_performance'] +
-                factors.research_engagement * self.factor_weights['research_engagement'] +
-                factors.critical_thinking * self.factor_weights['critical_thinking'] +
-                factors.leadership_service * self.factor_weights['leadership_service'] +
-                factors.innovation_creativity * self.factor_weights['innovation_creativity']
-            )
-            
-            # Apply academic level multiplier
-            level_multiplier = self._get_level_multiplier(student_data.get('academic_level', 'undergraduate'))
-            final_score = min(total_score * level_multiplier, 100)
-            
-            # Update database
-            self._update_excellence_score_in_db(student_id, final_score, factors)
-            
-            return {
-                'excellence_score': round(final_score, 2),
-                'factors': {
-                    'academic_performance': round(factors.academic_performance, 2),
-                    'research_engagement': round(factors.research_engagement, 2),
-                    'critical_thinking': round(factors.critical_thinking, 2),
-                    'leadership_service': round(factors.leadership_service, 2),
-                    'innovation_creativity': round(factors.innovation_creativity, 2)
-                },
-                'level_multiplier': level_multiplier,
-                'calculated_at': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
+            final_score, factors, level_multiplier = self._compute_excellence_unchecked(student_data)
+        except (KeyError, ValueError, TypeError, SQLAlchemyError) as e:
             self.logger.error(f"Excellence score calculation failed for {student_id}: {str(e)}")
             return {'error': str(e), 'score': 0}
-    
-    def _calculate_excellence_factors(self, student_data: Dict) -> ExcellenceFactors:
-        """Calculate individual excellence factors"""
-        
-        # Academic Performance (40%) - GPA, course difficulty, grade trends
-        academic_score = self._calculate_academic_performance(student_data)
-        
-        # Research Engagement (25%) - Research activities, publications, presentations
-        research_score = self._calculate_research_engagement(student_data)
-        
-        # Critical Thinking (20%) - Quality of questions, analysis depth, theoretical connections
-        thinking_score = self._calculate_critical_thinking_score(student_data)
         
-        # Leadership & Service (10%) - Leadership roles, community service, impact
-        leadership_score = self._calculate_leadership_score(student_data)
-        
-        # Innovation & Creativity (5%) - Original thinking, creative solutions, novel approaches
-        innovation_score = self._calculate_innovation_score(student_data)
-        
-        return ExcellenceFactors(
-            academic_performance=academic_score,
-            research_engagement=research_score,
-            critical_thinking=thinking_score,
-            leadership_service=leadership_score,
-            innovation_creativity=innovation_score
+        # Update database separately so write failures are reported as such
+        if persist:
+            try:
+                self._update_excellence_score_in_db(student_id, final_score, factors._asdict())
+            except SQLAlchemyError as e:
+                self.logger.error(f"Excellence score update failed for {student_id}: {str(e)}")
+                return {'error': str(e), 'score': 0}
+            self._record_trajectory_points([(student_id, final_score)])
+            self.invalidate_student(student_id)
+        
+        return {
+            'excellence_score': round(final_score, 2),
+            'factors': {
+                'academic_performance': round(factors.academic_performance, 2),
+                'research_engagement': round(factors.research_engagement, 2),
+                'critical_thinking': round(factors.critical_thinking, 2),
+                'leadership_service': round(factors.leadership_service, 2),
+                'innovation_creativity': round(factors.innovation_creativity, 2)
+            },
+            'level_multiplier': level_multiplier,
+            'calculated_at': datetime.now().isoformat()
+        }
+    
+    def _compute_excellence_unchecked(self, student_data: Dict) -> Tuple[float, ExcellenceFactors, float]:
+        """Score one student's data with no error handling: (final_score, factors, level_multiplier)"""
+        # Factor scores, weighted total and level multiplier in one compiled call
+        level_multiplier = self._get_level_multiplier(student_data.get('academic_level', 'undergraduate'))
+        final_score, *factor_scores = _score_kernel(
+            *self._kernel_inputs(student_data), float(level_multiplier), self._weights_tuple
         )
+        return final_score, ExcellenceFactors(*factor_scores), level_multiplier
     
-    def _calculate_academic_performance(self, student_data: Dict) -> float:
-        """Calculate academic performance factor (0-100)"""
-        gpa = student_data.get('current_gpa', 0.0)
-        base_score = min((gpa / 4.0) * 100, 100)
-        
-        # Bonus factors
-        bonus = 0
-        
-        # Course difficulty bonus
-        if student_data.get('honors_courses', 0) > 0:
-            bonus += min(student_data['honors_courses'] * 2, 10)
-        
-        # Grade trend bonus
-        if student_data.get('gpa_trend', 'stable') == 'improving':
-            bonus += 5
-        elif student_data.get('gpa_trend', 'stable') == 'declining':
-            bonus -= 5
-        
-        # Academic achievements
-        achievements = student_data.get('academic_achievements', [])
-        bonus += min(len(achievements) * 3, 15)
-        
-        return min(base_score + bonus, 100)
+    @staticmethod
+    def _kernel_inputs(student_data: Dict) -> Tuple[float, ...]:
+        """Unpack student data into the float scalars _score_kernel takes"""
+        sessions = student_data.get('mentorship_sessions', [])
+        n_sessions = len(sessions)
+        avg_quality, avg_sophistication = _session_means(sessions)
+        
+        return (
+            float(student_data.get('current_gpa', 0.0)),
+            float(student_data.get('honors_courses', 0)),
+            GPA_TREND_CODES.get(student_data.get('gpa_trend', 'stable'), 0),
+            float(len(student_data.get('academic_achievements', []))),
+            float(student_data.get('research_projects', 0)),
+            float(student_data.get('publications', 0)),
+            float(student_data.get('presentations', 0)),
+            n_sessions,
+            avg_quality,
+            avg_sophistication,
+            float(student_data.get('theoretical_frameworks_engaged', 0)),
+            float(student_data.get('elite_tier_documents', 0)),
+            float(len(student_data.get('leadership_roles', []))),
+            float(student_data.get('service_hours', 0)),
+            float(student_data.get('leadership_impact_score', 0)),
+            float(student_data.get('original_projects', 0)),
+            float(student_data.get('creative_works', 0)),
+            float(student_data.get('innovative_approaches_suggested', 0))
+        )
     
-    def _calculate_research_engagement(self, student_data: Dict) -> float:
-        """Calculate research engagement factor (0-100)"""
-        base_score = 20  # Starting point for undergrads
-        
-        # Research activities
-        research_projects = student_data.get('research_projects', 0)
-        base_score += min(research_projects * 15, 40)
+    def _get_student_data_cached(self, student_id: str) -> Optional[Dict]:
+        """_get_comprehensive_student_data behind a 60s TTL cache"""
+        with self._student_cache_lock:
+            student_data = self._student_cache.get(student_id)
+        if student_data is not None:
+            return student_data
+        
+        student_data = self._get_comprehensive_student_data(student_id)
+        if student_data:
+            with self._student_cache_lock:
+                self._student_cache[student_id] = student_data
+        return student_data
+    
+    def invalidate_student(self, student_id: str) -> None:
+        """Drop cached data for a student after their profile changes"""
+        with self._student_cache_lock:
+            self._student_cache.pop(student_id, None)
+        with self._trajectory_cache_lock:
+            self._trajectory_cache.pop(student_id, None)
+    
+    @staticmethod
+    def _factor_columns(rows: List[Dict]) -> Dict[str, np.ndarray]:
+        """Struct-of-arrays view of many students' data, as _score_factor_columns takes"""
+        n = len(rows)
+        
+        def column(key, default=0.0):
+            return np.fromiter((float(row.get(key) or default) for row in rows), dtype=np.float64, count=n)
+        
+        cols = {
+            key: column(key) for key in (
+                'current_gpa', 'honors_courses', 'research_projects', 'publications',
+                'presentations', 'theoretical_frameworks_engaged', 'elite_tier_documents',
+                'service_hours', 'leadership_impact_score', 'original_projects',
+                'creative_works', 'innovative_approaches_suggested'
+            )
+        }
+        cols['gpa_trend'] = np.array([row.get('gpa_trend', 'stable') for row in rows])
+        cols['achievement_count'] = np.fromiter(
+            (len(row.get('academic_achievements') or []) for row in rows), dtype=np.float64, count=n)
+        cols['leadership_role_count'] = np.fromiter(
+            (len(row.get('leadership_roles') or []) for row in rows), dtype=np.float64, count=n)
+        cols['session_count'] = np.fromiter(
+            (len(row.get('mentorship_sessions') or []) for row in rows), dtype=np.float64, count=n)
+        session_means = np.array(
+            [_session_means(row.get('mentorship_sessions') or []) for row in rows], dtype=np.float64
+        ).reshape(n, 2)
+        cols['avg_session_quality'] = session_means[:, 0]
+        cols['avg_sophistication'] = session_means[:, 1]
+        return cols
+    
+    def calculate_excellence_scores_batch(self, student_ids: List[str],
+                                          students_data: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """Score many students at once over column arrays instead of per-student Python
+        
+        ``students_data`` maps student_id to the same dict calculate_excellence_score
+        takes; missing entries are fetched. Returns results keyed by student_id.
+        """
+        students_data = dict(students_data or {})
+        for student_id in student_ids:
+            if not students_data.get(student_id):
+                students_data[student_id] = self._get_student_data_cached(student_id)
+        
+        found_ids = [sid for sid in student_ids if students_data.get(sid)]
+        results = {sid: {'error': 'Student data not found', 'score': 0}
+                   for sid in student_ids if sid not in found_ids}
+        if not found_ids:
+            return results
+        
+        rows = [students_data[sid] for sid in found_ids]
+        n = len(rows)
+        
+        factor_matrix = _score_factor_columns(self._factor_columns(rows))
+        level_multipliers = np.fromiter(
+            (self._get_level_multiplier(row.get('academic_level', 'undergraduate')) for row in rows),
+            dtype=np.float64, count=n)
+        final_scores = np.minimum(factor_matrix @ self._weights * level_multipliers, 100)
+        
+        calculated_at = datetime.now().isoformat()
+        score_rows = []
+        for i, student_id in enumerate(found_ids):
+            factor_values = dict(zip(FACTOR_ORDER, factor_matrix[i].tolist()))
+            final_score = float(final_scores[i])
+            score_rows.append((student_id, final_score, factor_values))
+            
+            results[student_id] = {
+                'excellence_score': round(final_score, 2),
+                'factors': {name: round(value, 2) for name, value in factor_values.items()},
+                'level_multiplier': float(level_multipliers[i]),
+                'calculated_at': calculated_at
+            }
         
-        # Publications and presentations
-        publications = student_data.get('publications', 0)
-        presentations = student_data.get('presentations', 0)
-        base_score += min(publications * 20 + presentations * 10, 30)
+        # Scores that were not written are reported as errors, as in the single-student path
+        saved, error = self._update_excellence_scores_in_db(score_rows)
+        for student_id in found_ids:
+            if student_id not in saved:
+                results[student_id] = {'error': error or 'Student profile not found', 'score': 0}
         
-        # Research mentorship sessions quality
-        sessions_data = student_data.get('mentorship_sessions', [])
-        if sessions_data:
-            avg_quality = sum(s.get('session_quality_score', 0) for s in sessions_data) / len(sessions_data)
-            base_score += min(avg_quality * 10, 10)
+        return results
+    
+    def _update_excellence_scores_in_db(self, rows: List[Tuple[str, float, Dict]]) -> Tuple[Set[str], Optional[str]]:
+        """Persist a batch of (student_id, score, factors) in one round-trip
         
-        return min(base_score, 100)
+        Returns the student_ids written and the write error, if any.
+        """
+        try:
+            saved = self.db.update_excellence_scores(rows)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Batch excellence score update failed: {str(e)}")
+            return set(), str(e)
+        finally:
+            for student_id, _, _ in rows:
+                self.invalidate_student(student_id)
+        
+        self._record_trajectory_points([(student_id, score) for student_id, score, _ in rows
+                                        if student_id in saved])
+        return saved, None
     
-    def _calculate_critical_thinking_score(self, student_data: Dict) -> float:
-        """Calculate critical thinking quality based on interactions"""
-        base_score = 40  # Base critical thinking assumption
+    def predict_distinction_probability(self, student_id: str, distinction: str) -> Dict:
+        """Predict probability of achieving specific academic distinction"""
+        if distinction not in self.distinction_requirements:
+            return {'error': f'Unknown distinction: {distinction}'}
         
-        # Analyze query sophistication from mentorship sessions
-        sessions = student_data.get('mentorship_sessions', [])
-        if sessions:
-            sophistication_scores = {
-                'basic': 10,
-                'intermediate': 25,
-                'advanced': 40,
-                'scholar': 60
-            }
+        try:
+            # Get current student data
+            student_data = self._get_student_data_cached(student_id)
+            if not student_data:
+                return {'error': 'Student data not found'}
             
-            avg_sophistication = 0
-            for session in sessions:
-                sophistication_level = session.get('query_sophistication', 'basic')
-                avg_sophistication += sophistication_scores.get(sophistication_level, 10)
+            cache_key = (student_id, distinction, self._prediction_version(student_data))
+            with self._prediction_cache_lock:
+                cached = self._prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            avg_sophistication /= len(sessions)
-            base_score = max(base_score, avg_sophistication)
-        
-        # Bonus for theoretical framework usage
-        frameworks_used = student_data.get('theoretical_frameworks_engaged', 0)
-        base_score += min(frameworks_used * 3, 20)
+            prediction_result = self._predict_unchecked(student_id, distinction, student_data)
+        except (KeyError, ValueError, TypeError, SQLAlchemyError) as e:
+            self.logger.error(f"Prediction failed for {student_id}, {distinction}: {str(e)}")
+            return {'error': str(e)}
         
-        # Document complexity engagement
-        complex_docs = student_data.get('elite_tier_documents', 0)
-        base_score += min(complex_docs * 5, 15)
+        with self._prediction_cache_lock:
+            self._prediction_cache[cache_key] = prediction_result
         
-        return min(base_score, 100)
+        return prediction_result
     
-    def _calculate_leadership_score(self, student_data: Dict) -> float:
-        """Calculate leadership and service factor"""
-        base_score = 10  # Base assumption
-        
-        # Leadership positions
-        leadership_roles = student_data.get('leadership_roles', [])
-        base_score += min(len(leadership_roles) * 15, 45)
-        
-        # Community service hours
-        service_hours = student_data.get('service_hours', 0)
-        base_score += min(service_hours / 10, 25)  # 1 point per 10 hours, max 25
-        
-        # Impact assessment
-        leadership_impact = student_data.get('leadership_impact_score', 0)
-        base_score += min(leadership_impact, 20)
-        
-        return min(base_score, 100)
+    @staticmethod
+    def _prediction_version(student_data: Dict) -> Tuple:
+        """Memo key part that changes whenever a prediction input does
+        
+        New sessions and achievements do not touch the profile's last_updated.
+        """
+        return (
+            student_data.get('last_updated'),
+            len(student_data.get('mentorship_sessions') or ()),
+            len(student_data.get('academic_achievements') or ())
+        )
     
-    def _calculate_innovation_score(self, student_data: Dict) -> float:
-        """Calculate innovation and creativity factor"""
-        base_score = 30  # Base creativity assumption
-        
-        # Original research or projects
-        original_projects = student_data.get('original_projects', 0)
-        base_score += min(original_projects * 10, 30)
+    def _predict_unchecked(self, student_id: str, distinction: str, student_data: Dict) -> Dict:
+        """Build one distinction's prediction with no error handling"""
+        # Calculate current excellence score
+        final_score, _, _ = self._compute_excellence_unchecked(student_data)
+        current_excellence = round(final_score, 2)
         
-        # Patents, publications, or creative works
-        creative_works = student_data.get('creative_works', 0)
-        base_score += min(creative_works * 15, 25)
+        # Trajectory analysis
+        trajectory_factor = self._analyze_improvement_trajectory(student_id)
         
-        # Innovation in mentorship responses
-        innovative_solutions = student_data.get('innovative_approaches_suggested', 0)
-        base_score += min(innovative_solutions * 2, 15)
-        
-        return min(base_score, 100)
+        probabilities = self._distinction_probabilities(
+            student_data.get('current_gpa', 0.0), current_excellence, trajectory_factor
+        )
+        return self._build_prediction(
+            student_id, distinction, student_data, current_excellence, trajectory_factor,
+            float(probabilities[self._dist_index[distinction]])
+        )
     
-    def predict_distinction_probability(self, student_id: str, distinction: str) -> Dict:
-        """Predict probability of achieving specific academic distinction"""
+    def predict_all_distinctions(self, student_id: str) -> Dict:
+        """Predict every distinction from one score and one trajectory computation"""
         try:
-            if distinction not in self.distinction_requirements:
-                return {'error': f'Unknown distinction: {distinction}'}
-            
-            # Get current student data
-            student_data = self._get_comprehensive_student_data(student_id)
+            student_data = self._get_student_data_cached(student_id)
             if not student_data:
                 return {'error': 'Student data not found'}
             
-            requirement = self.distinction_requirements[distinction]
-            
-            # Calculate current excellence score
-            excellence_data = self.calculate_excellence_score(student_id, student_data)
-            current_excellence = excellence_data.get('excellence_score', 0)
-            current_gpa = student_data.get('current_gpa', 0.0)
+            data_version = self._prediction_version(student_data)
+            with self._prediction_cache_lock:
+                cached = {
+                    distinction: self._prediction_cache.get((student_id, distinction, data_version))
+                    for distinction in self.distinction_requirements
+                }
+            if all(prediction is not None for prediction in cached.values()):
+                return cached
             
-            # Calculate base probability from current metrics
-            gpa_factor = min(current_gpa / requirement.gpa_min, 1.0) if requirement.gpa_min > 0 else 1.0
-            excellence_factor = min(current_excellence / requirement.excellence_score_min, 1.0)
-            
-            # Weighted probability calculation
-            base_probability = (
-                gpa_factor * requirement.weight_factors['gpa'] +
-                excellence_factor * requirement.weight_factors['excellence']
-            ) * 100
-            
-            # Trajectory analysis
+            final_score, _, _ = self._compute_excellence_unchecked(student_data)
+            current_excellence = round(final_score, 2)
             trajectory_factor = self._analyze_improvement_trajectory(student_id)
             
-            # Apply trajectory adjustment
-            trajectory_adjusted = base_probability * (0.7 + trajectory_factor * 0.3)
-            
-            # Confidence calculation
-            confidence = self._calculate_prediction_confidence(student_data, distinction)
-            
-            # Final probability (capped at 95% for realism)
-            final_probability = min(trajectory_adjusted, 95)
-            
-            # Generate improvement factors
-            improvement_factors = self._identify_improvement_factors(student_data, distinction)
-            
-            # Estimated timeline
-            estimated_date = self._estimate_achievement_timeline(
-                student_id, distinction, current_excellence, requirement.excellence_score_min
+            # All distinction probabilities in one vectorized expression
+            probabilities = self._distinction_probabilities(
+                student_data.get('current_gpa', 0.0), current_excellence, trajectory_factor
             )
             
-            prediction_result = {
-                'distinction': distinction,
-                'probability': round(final_probability, 1),
-                'confidence': round(confidence, 1),
-                'current_excellence_score': current_excellence,
-                'required_excellence_score': requirement.excellence_score_min,
-                'current_gpa': current_gpa,
-                'required_gpa': requirement.gpa_min,
-                'gap': max(0, requirement.excellence_score_min - current_excellence),
-                'improvement_factors': improvement_factors,
-                'estimated_achievement_date': estimated_date.isoformat() if estimated_date else None,
-                'trajectory_factor': round(trajectory_factor, 2),
-                'key_factors': self._get_key_success_factors(distinction),
-                'calculated_at': datetime.now().isoformat()
-            }
-            
-            # Store prediction in database
-            self._store_prediction_in_db(student_id, prediction_result)
+            predictions = {}
+            for distinction, probability in zip(self._dist_names, probabilities.tolist()):
+                prediction = self._build_prediction(
+                    student_id, distinction, student_data, current_excellence, trajectory_factor,
+                    probability
+                )
+                predictions[distinction] = prediction
+                with self._prediction_cache_lock:
+                    self._prediction_cache[(student_id, distinction, data_version)] = prediction
             
-            return prediction_result
+            return predictions
             
-        except Exception as e:
-            self.logger.error(f"Prediction failed for {student_id}, {distinction}: {str(e)}")
+        except (KeyError, ValueError, TypeError, SQLAlchemyError) as e:
+            self.logger.error(f"Prediction failed for {student_id}: {str(e)}")
             return {'error': str(e)}
     
+    def _distinction_probabilities(self, current_gpa: float, current_excellence: float,
+                                   trajectory_factor: float) -> np.ndarray:
+        """Capped probability (0-95) for every distinction, in _dist_names order"""
+        gpa_factor = np.where(
+            self._dist_gpa_min > 0,
+            np.minimum(current_gpa / np.where(self._dist_gpa_min > 0, self._dist_gpa_min, 1), 1.0),
+            1.0
+        )
+        excellence_factor = np.minimum(current_excellence / self._dist_score_min, 1.0)
+        
+        # Weighted probability with trajectory adjustment, capped at 95% for realism
+        base_probability = (gpa_factor * self._dist_w_gpa + excellence_factor * self._dist_w_exc) * 100
+        return np.minimum(base_probability * (0.7 + trajectory_factor * 0.3), 95)
+    
+    def _build_prediction(self, student_id: str, distinction: str, student_data: Dict,
+                          current_excellence: float, trajectory_factor: float,
+                          final_probability: float) -> Dict:
+        """Assemble one distinction's prediction around its precomputed probability"""
+        requirement = self.distinction_requirements[distinction]
+        current_gpa = student_data.get('current_gpa', 0.0)
+        
+        # Confidence calculation
+        confidence = self._calculate_prediction_confidence(student_data, distinction)
+        
+        # Generate improvement factors
+        improvement_factors = self._identify_improvement_factors(student_data, distinction)
+        
+        # Estimated timeline
+        estimated_date = self._estimate_achievement_timeline(
+            student_id, distinction, current_excellence, requirement.excellence_score_min
+        )
+        
+        prediction_result = {
+            'distinction': distinction,
+            'probability': round(final_probability, 1),
+            'confidence': round(confidence, 1),
+            'current_excellence_score': current_excellence,
+            'required_excellence_score': requirement.excellence_score_min,
+            'current_gpa': current_gpa,
+            'required_gpa': requirement.gpa_min,
+            'gap': max(0, requirement.excellence_score_min - current_excellence),
+            'improvement_factors': improvement_factors,
+            'estimated_achievement_date': estimated_date.isoformat() if estimated_date else None,
+            'trajectory_factor': round(trajectory_factor, 2),
+            'key_factors': self._get_key_success_factors(distinction),
+            'calculated_at': datetime.now().isoformat()
+        }
+        
+        # Store prediction in database
+        self._store_prediction_in_db(student_id, prediction_result)
+        
+        return prediction_result
+    
     def _analyze_improvement_trajectory(self, student_id: str) -> float:
-        """Analyze student's improvement trajectory (0-1 scale)"""
+        """Analyze student's improvement trajectory (0-1 scale), cached per student"""
+        with self._trajectory_cache_lock:
+            trajectory_factor = self._trajectory_cache.get(student_id)
+        if trajectory_factor is not None:
+            return trajectory_factor
+        
+        trajectory_factor = self._compute_improvement_trajectory(student_id)
+        with self._trajectory_cache_lock:
+            self._trajectory_cache[student_id] = trajectory_factor
+        return trajectory_factor
+    
+    def _compute_improvement_trajectory(self, student_id: str) -> float:
+        """Fit the slope of the student's recent excellence scores"""
         try:
-            # Get historical excellence scores
-            query = """
-            SELECT excellence_score, trajectory_date
-            FROM excellence_trajectory
-            WHERE student_id = :student_id
-            ORDER BY trajectory_date DESC
-            LIMIT 10
-            """
+            # Newest-first scores from the Redis window, else from SQL
+            scores = self._get_trajectory_window(student_id)
+            if scores is None:
+                trajectory_data = self.db.execute_query(RECENT_TRAJECTORY_QUERY, {'student_id': student_id})
+                scores = [float(row['excellence_score']) for row in trajectory_data]
+                self._seed_trajectory_window(student_id, scores)
             
-            trajectory_data = self.db.execute_query(query, {'student_id': student_id})
-            
-            if len(trajectory_data) < 2:
+            if len(scores) < 2:
                 return 0.5  # Neutral trajectory for insufficient data
             
-            # Calculate trend
-            scores = [float(row['excellence_score']) for row in trajectory_data]
-            scores.reverse()  # Chronological order
-            
-            # Linear regression slope
-            x = np.arange(len(scores))
-            coeffs = np.polyfit(x, scores, 1)
-            slope = coeffs[0]
+            # Closed-form least-squares slope over x = 0..n-1 in chronological order;
+            # sum((x - mean(x))**2) for that x is n(n^2 - 1)/12
+            n = len(scores)
+            y = np.asarray(scores[::-1], dtype=np.float64)
+            x = np.arange(n, dtype=np.float64)
+            slope = float(((x - (n - 1) / 2.0) * (y - y.mean())).sum() / (n * (n * n - 1) / 12.0))
             
             # Convert slope to 0-1 trajectory factor
             # Positive slope = improving trajectory
@@ -380,21 +712,65 @@ class ExcellenceEngine:
             self.logger.error(f"Trajectory analysis failed: {str(e)}")
             return 0.5  # Neutral trajectory on error
     
+    @staticmethod
+    def _trajectory_key(student_id: str) -> str:
+        return f"trajectory:{student_id}"
+    
+    def _get_trajectory_window(self, student_id: str) -> Optional[List[float]]:
+        """Newest-first scores from Redis, or None when there is no window to use"""
+        if self.redis_client is None:
+            return None
+        try:
+            values = self.redis_client.lrange(self._trajectory_key(student_id), 0, TRAJECTORY_WINDOW - 1)
+        except redis.RedisError as e:
+            self.logger.warning(f"Trajectory window read failed: {str(e)}")
+            return None
+        return [float(value) for value in values] if values else None
+    
+    def _seed_trajectory_window(self, student_id: str, scores: List[float]) -> None:
+        """Replace the Redis window with newest-first scores read from SQL"""
+        if self.redis_client is None or not scores:
+            return
+        key = self._trajectory_key(student_id)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(key)
+            pipe.rpush(key, *scores)
+            pipe.expire(key, TRAJECTORY_WINDOW_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            self.logger.warning(f"Trajectory window seed failed: {str(e)}")
+    
+    def _record_trajectory_points(self, points: List[Tuple[str, float]]) -> None:
+        """Push newly written scores onto existing Redis windows in one round-trip
+        
+        Snapshots reach SQL through the write-behind queue, so a window seeded
+        just before a flush can miss a point; the short TTL bounds that drift.
+        """
+        if self.redis_client is None or not points:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for student_id, score in points:
+                self._push_trajectory(
+                    keys=[self._trajectory_key(student_id)],
+                    args=[score, TRAJECTORY_WINDOW, TRAJECTORY_WINDOW_TTL],
+                    client=pipe
+                )
+            pipe.execute()
+        except redis.RedisError as e:
+            self.logger.warning(f"Trajectory window update failed: {str(e)}")
+    
     def _calculate_prediction_confidence(self, student_data: Dict, distinction: str) -> float:
         """Calculate confidence level for prediction (0-100)"""
         base_confidence = 70
         
-        # Data completeness factor
-        data_fields = [
-            'current_gpa', 'mentorship_sessions', 'academic_achievements',
-            'research_projects', 'leadership_roles'
-        ]
-        
-        completeness = sum(1 for field in data_fields if student_data.get(field)) / len(data_fields)
+        # Data completeness factor (fields must be present and non-empty)
+        completeness = sum(map(bool, map(student_data.get, self._conf_fields))) / self._conf_len
         base_confidence += completeness * 20
         
         # Session history factor
-        sessions_count = len(student_data.get('mentorship_sessions', []))
+        sessions_count = len(student_data.get('mentorship_sessions') or ())
         if sessions_count >= 10:
             base_confidence += 10
         elif sessions_count >= 5:
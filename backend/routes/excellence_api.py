@@ -2,12 +2,31 @@
 Excellence API endpoints
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, current_app
+import numpy as np
+import orjson
 import logging
 
 excellence_bp = Blueprint('excellence', __name__)
 logger = logging.getLogger(__name__)
 
+# Full trajectory for charts, defined once so the DB layer's statement cache reuses it
+TRAJECTORY_HISTORY_QUERY = """
+    SELECT CAST(excellence_score AS DOUBLE) AS excellence_score,
+           CAST(trajectory_date AS DATE) AS trajectory_date
+    FROM excellence_trajectory
+    WHERE student_id = :student_id
+    ORDER BY trajectory_date ASC
+"""
+
+def _json_response(obj, status=200):
+    """Serialize straight to bytes with orjson, skipping the provider's key sorting"""
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
 @excellence_bp.route('/excellence-profile/<student_id>', methods=['GET'])
 def get_excellence_profile(student_id):
     """Get student excellence profile"""
@@ -18,27 +37,23 @@ def get_excellence_profile(student_id):
         excellence_data = excellence_engine.calculate_excellence_score(student_id)
         
         if 'error' in excellence_data:
-            return jsonify(excellence_data), 400
+            return _json_response(excellence_data, 400)
         
         # Get trajectory data
-        trajectory_query = """
-        SELECT excellence_score, trajectory_date
-        FROM excellence_trajectory
-        WHERE student_id = :student_id
-        ORDER BY trajectory_date ASC
-        """
-        
         trajectory = current_app.db_manager.execute_query(
-            trajectory_query, {'student_id': student_id}
+            TRAJECTORY_HISTORY_QUERY, {'student_id': student_id}
         )
         
-        # Format trajectory for charts
+        # Format trajectory for charts; dates and scores are converted column-wise
+        dates = np.datetime_as_string(
+            np.array([row['trajectory_date'] for row in trajectory], dtype='datetime64[D]')
+        ).tolist()
+        scores = np.fromiter(
+            (row['excellence_score'] for row in trajectory), dtype=np.float64, count=len(trajectory)
+        ).tolist()
         trajectory_data = [
-            {
-                'date': row['trajectory_date'].strftime('%Y-%m-%d'),
-                'excellence_score': float(row['excellence_score'])
-            }
-            for row in trajectory
+            {'date': date, 'excellence_score': score}
+            for date, score in zip(dates, scores)
         ]
         
         result = {
@@ -47,11 +62,11 @@ def get_excellence_profile(student_id):
             'student_id': student_id
         }
         
-        return jsonify(result)
+        return _json_response(result)
         
     except Exception as e:
         logger.error(f"Excellence profile retrieval failed: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, 500)
 
 @excellence_bp.route('/update-excellence-profile', methods=['POST'])
 def update_excellence_profile():
@@ -61,18 +76,19 @@ def update_excellence_profile():
         student_id = data.get('student_id')
         
         if not student_id:
-            return jsonify({'error': 'student_id is required'}), 400
+            return _json_response({'error': 'student_id is required'}, 400)
         
         excellence_engine = current_app.excellence_engine
         
-        # Recalculate excellence score
+        # Recalculate excellence score from fresh data
+        excellence_engine.invalidate_student(student_id)
         excellence_data = excellence_engine.calculate_excellence_score(student_id)
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'updated_profile': excellence_data
         })
         
     except Exception as e:
         logger.error(f"Profile update failed: {str(e)}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return _json_response({'error': str(e)}, 500)
\ No newline at end of file
@@ -3,26 +3,223 @@ Prima Scholar Academic Document Processor
 Processes academic documents with excellence-level classification and embeddings
 """
 
+import asyncio
+import atexit
+import hashlib
 import fitz  # PyMuPDF
 import openai
 import logging
 import json
 import re
 import os
+import multiprocessing
+import threading
+import time
+import uuid
+import zipfile
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
 from docx import Document
+from lxml import etree
 import textract
 import numpy as np
+import ahocorasick
+from cachetools import LRUCache
+from collections import Counter
+from itertools import repeat
+
+from services.openai_clients import get_openai_client
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Pure-Python stand-in when numba is not installed"""
+        def decorate(func):
+            return func
+        return decorate
+
+# text-embedding-3 models truncate natively to the requested dimensions
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+# Inputs per embeddings request; ~2000-char chunks keep a batch well under the token cap
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_MAX_RETRIES = 6
+
+# Persistent embedding cache, keyed by sha256(model + dimensions + text); vectors
+# are kept as float16 bytes since they only feed cosine similarity
+EMBEDDING_CACHE_LOOKUP_QUERY = "SELECT hash, vec FROM embedding_cache WHERE hash IN :hashes"
+EMBEDDING_CACHE_INSERT_QUERY = """
+    INSERT INTO embedding_cache (hash, vec) VALUES (:hash, :vec)
+    ON DUPLICATE KEY UPDATE vec = VALUES(vec)
+"""
+
+# Chunk insert; executemany folds a batch into one multi-row INSERT
+STORE_CHUNK_QUERY = """
+    INSERT INTO academic_documents
+    (title, content, document_type, academic_level, excellence_tier,
+     embedding, excellence_embedding, embedding_q, emb_scale, emb_zero,
+     scholarly_connections, complexity_score, chunk_index, student_id,
+     citation_count, impact_factor, processed_at, ingest_batch)
+    VALUES (:title, :content, :document_type, :academic_level, :excellence_tier,
+            :embedding, :excellence_embedding, :embedding_q, :emb_scale, :emb_zero,
+            :scholarly_connections, :complexity_score, :chunk_index, :student_id,
+            :citation_count, :impact_factor, :processed_at, :ingest_batch)
+"""
+# AUTO_INCREMENT ids are neither contiguous nor time-ordered across TiDB nodes,
+# so each ingest tags its rows with a token and reads them back by it
+STORED_CHUNK_IDS_QUERY = """
+    SELECT id FROM academic_documents
+    WHERE ingest_batch = :ingest_batch
+    ORDER BY chunk_index
+"""
+
+# PDFs with more pages than this are split into page ranges and extracted in
+# worker processes; PyMuPDF documents must not be shared between threads
+PDF_PARALLEL_MIN_PAGES = 16
+PDF_EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> str:
+    """Text of pages [start, stop) of a PDF, opened independently in a worker process"""
+    with fitz.open(file_path) as doc:
+        return "".join(doc.load_page(n).get_text("text") for n in range(start, stop))
+
+# WordprocessingML elements read when streaming document.xml out of a DOCX
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_TEXT_TAGS = (_W_NS + 't', _W_NS + 'tab', _W_NS + 'br', _W_NS + 'p')
+
+# Both aggregates come from a single derived-table scan joined onto the profile
+DOCUMENT_STATS_UPDATE_QUERY = """
+    UPDATE scholar_profiles sp
+    JOIN (
+        SELECT COUNT(DISTINCT title) AS document_count,
+               AVG(complexity_score) AS avg_complexity
+        FROM academic_documents
+        WHERE student_id = :student_id
+    ) agg
+    SET sp.document_count = agg.document_count,
+        sp.avg_document_complexity = agg.avg_complexity,
+        sp.last_document_processed = :processed_at
+    WHERE sp.student_id = :student_id
+"""
+
+# Academic section headers, fused into one alternation so chunking splits in a single pass
+SECTION_HEADER_RE = re.compile(
+    r'\n\s*(?:Abstract|Introduction|Methodology|Results|Discussion|Conclusion|References)\s*\n',
+    re.IGNORECASE
+)
+
+# Scholarly connection patterns, compiled once
+CITATION_RES = (
+    re.compile(r'\([A-Z][a-zA-Z\s]+,\s+\d{4}\)'),  # (Author, 2023)
+    re.compile(r'\[[0-9,\s-]+\]'),  # [1, 2, 3-5]
+    re.compile(r'[A-Z][a-zA-Z\s]+\s+et\s+al\.')   # Author et al.
+)
+THEORY_RES = tuple(
+    re.compile(rf'\b\w+\s+{keyword}\b', re.IGNORECASE)
+    for keyword in ('theory', 'framework', 'model', 'paradigm', 'approach')
+)
+METHOD_RES = tuple(
+    re.compile(rf'\b\w+\s+{keyword}\b', re.IGNORECASE)
+    for keyword in ('analysis', 'method', 'technique', 'approach', 'procedure')
+)
+CONCEPT_RE = re.compile(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b')
+
+# Nearest chunks by cosine distance; ascending order lets TiDB use the HNSW index
+SIMILAR_DOCUMENTS_QUERY = """
+    SELECT title, content, document_type, academic_level, excellence_tier,
+           complexity_score, citation_count, impact_factor,
+           VEC_COSINE_DISTANCE(embedding, :query_vector) as similarity_score
+    FROM academic_documents
+    {where}
+    ORDER BY similarity_score ASC
+    LIMIT :limit
+"""
+SIMILAR_DOCUMENTS_ALL_QUERY = SIMILAR_DOCUMENTS_QUERY.format(where="")
+SIMILAR_DOCUMENTS_FOR_STUDENT_QUERY = SIMILAR_DOCUMENTS_QUERY.format(where="WHERE student_id = :student_id")
+
+# Byte values of '.', '!' and '?'; none occur inside multi-byte UTF-8 sequences
+_SENTENCE_TERMINATORS = np.array([0x2E, 0x21, 0x3F], dtype=np.uint8)
+
+def _count_sentences(text: str) -> int:
+    """Segments re.split(r'[.!?]+', text) would return, without building the list
+    
+    That is one more than the number of runs of terminator characters.
+    """
+    buf = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    if not buf.size:
+        return 1
+    mask = np.isin(buf, _SENTENCE_TERMINATORS)
+    runs = int(mask[0]) + int(np.count_nonzero(mask[1:] & ~mask[:-1]))
+    return runs + 1
+
+# Bit flags for whole-word vocabularies, combined per word in _word_classes
+WORD_ACADEMIC = 1
+WORD_QUALITY = 2
+WORD_RESEARCH = 4
+
+@njit(cache=True)
+def _token_stats_kernel(word_lengths, word_classes):
+    """One pass over a chunk's tokens: (total length, words over 8 chars,
+    academic, quality and research word counts)"""
+    total_length = 0
+    long_words = 0
+    for length in word_lengths:
+        total_length += length
+        if length > 8:
+            long_words += 1
+    
+    academic = 0
+    quality = 0
+    research = 0
+    for flags in word_classes:
+        if flags & 1:
+            academic += 1
+        if flags & 2:
+            quality += 1
+        if flags & 4:
+            research += 1
+    
+    return total_length, long_words, academic, quality, research
+
+# Batch API job states that mean the job is still running
+BATCH_PENDING_STATES = frozenset({'validating', 'in_progress', 'finalizing'})
 
 class AcademicProcessor:
     """Processes academic documents with excellence-aware analysis"""
     
+    # Context prepended to chunks for excellence-optimized embeddings
+    TIER_CONTEXTS = {
+        'elite': "This content represents groundbreaking research and seminal work. ",
+        'scholar': "This content demonstrates advanced scholarly analysis. ",
+        'advanced': "This content shows sophisticated academic understanding. ",
+        'basic': "This content covers fundamental academic concepts. "
+    }
+    
     def __init__(self, openai_api_key: str, db_manager):
-        self.client = openai.OpenAI(api_key=openai_api_key)
+        self.client = get_openai_client(openai_api_key)
+        self._openai_api_key = openai_api_key
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
         
+        # In-process tier of the embedding cache in front of the embedding_cache table
+        self._embedding_cache = LRUCache(maxsize=1024)
+        self._embedding_cache_lock = threading.Lock()
+        
+        # Threads for blocking extraction and classification in async ingestion;
+        # none are started until the first document is submitted
+        self._extract_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='doc-extract')
+        
+        # Process pool for large PDFs; extraction threads race to create it
+        self._pdf_pool_executor = None
+        self._pdf_pool_lock = threading.Lock()
+        
         # Excellence tier classification keywords
         self.excellence_keywords = {
             'elite': [
@@ -62,8 +259,117 @@ class AcademicProcessor:
             ]
         }
         
+        # Substring indicators checked in lowercased text; every family is
+        # compiled into one automaton below so a text is scanned only once
+        self.sophistication_indicators = frozenset([
+            'theoretical framework', 'empirical validation', 'meta-analysis',
+            'statistical significance', 'peer review', 'systematic review'
+        ])
+        self.document_type_indicators = {
+            'research': ['abstract', 'methodology', 'results', 'conclusion', 'references'],
+            'journal': ['volume'],
+            'course': ['syllabus', 'lecture', 'homework', 'assignment'],
+            'book': ['chapter', 'isbn', 'publisher']
+        }
+        self.title_type_indicators = {
+            'thesis': ['thesis', 'dissertation'],
+            'journal': ['journal'],
+            'presentation': ['presentation', 'slides', 'ppt']
+        }
+        self.citation_indicators = ['et al', 'ibid', 'op cit', 'cf.', 'viz.']
+        
+        # Whole-word vocabularies
+        self.academic_terms = frozenset([
+            'analysis', 'methodology', 'framework', 'hypothesis', 'empirical',
+            'theoretical', 'systematic', 'comprehensive', 'significant', 'correlation'
+        ])
+        self.innovation_keywords = frozenset([
+            'novel', 'new', 'innovative', 'groundbreaking', 'first',
+            'unique', 'original', 'unprecedented'
+        ])
+        self.quality_indicators = frozenset([
+            'novel', 'significant', 'important', 'crucial', 'essential',
+            'groundbreaking', 'innovative', 'comprehensive', 'systematic'
+        ])
+        self.research_indicators = frozenset([
+            'study', 'research', 'investigation', 'experiment', 'analysis'
+        ])
+        self._automaton = self._build_keyword_automaton()
+        
+        # Vocabulary flags per lowercased word, fed to the compiled token kernel
+        self._word_classes: Dict[str, int] = {}
+        for flag, vocabulary in ((WORD_ACADEMIC, self.academic_terms),
+                                 (WORD_QUALITY, self.quality_indicators),
+                                 (WORD_RESEARCH, self.research_indicators)):
+            for word in vocabulary:
+                self._word_classes[word] = self._word_classes.get(word, 0) | flag
+        
+        # Full excellence-embedding prefix per tier, built once
+        self.tier_contexts = self.TIER_CONTEXTS
+        self._tier_prefix = {
+            tier: f"Academic excellence level: {tier}. {context}"
+            for tier, context in self.TIER_CONTEXTS.items()
+        }
+        
         self.logger.info("Academic Processor initialized")
     
+    def _build_keyword_automaton(self) -> ahocorasick.Automaton:
+        """Compile every indicator phrase into an Aho-Corasick automaton
+        
+        Each phrase maps to the tags of the families it belongs to, e.g.
+        'tier:elite' or 'sophistication'; a phrase may be in several families.
+        """
+        families = [('sophistication', self.sophistication_indicators),
+                    ('citation', self.citation_indicators),
+                    ('innovation', self.innovation_keywords)]
+        families += [(f'tier:{tier}', keywords) for tier, keywords in self.excellence_keywords.items()]
+        families += [(f'level:{level}', indicators) for level, indicators in self.level_indicators.items()]
+        families += [(f'doctype:{bucket}', indicators)
+                     for bucket, indicators in self.document_type_indicators.items()]
+        families += [(f'title:{bucket}', indicators)
+                     for bucket, indicators in self.title_type_indicators.items()]
+        
+        phrase_tags: Dict[str, List[str]] = {}
+        for tag, phrases in families:
+            for phrase in phrases:
+                phrase_tags.setdefault(phrase, []).append(tag)
+        
+        automaton = ahocorasick.Automaton()
+        for phrase, tags in phrase_tags.items():
+            automaton.add_word(phrase, (phrase, tuple(tags)))
+        automaton.make_automaton()
+        return automaton
+    
+    def _scan(self, text_lower: str) -> Counter:
+        """Count, per tag, how many distinct indicator phrases occur in lowercased text"""
+        counts = Counter()
+        seen = set()
+        for _, (phrase, tags) in self._automaton.iter(text_lower):
+            if phrase not in seen:
+                seen.add(phrase)
+                counts.update(tags)
+        return counts
+    
+    @property
+    def _pdf_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for large PDFs, spawned once on first use and shut down at exit"""
+        pool = self._pdf_pool_executor
+        if pool is None:
+            with self._pdf_pool_lock:
+                pool = self._pdf_pool_executor
+                if pool is None:
+                    pool = self._pdf_pool_executor = ProcessPoolExecutor(
+                        max_workers=PDF_EXTRACT_WORKERS,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+        return pool
+    
+    @cached_property
+    def aclient(self) -> openai.AsyncOpenAI:
+        """Async OpenAI client for concurrent ingestion, created on first use"""
+        return openai.AsyncOpenAI(api_key=self._openai_api_key, max_retries=EMBEDDING_MAX_RETRIES)
+    
     def process_document(self, file_path: str, title: str, student_id: str) -> Dict:
         """Process academic document with excellence classification"""
         try:
@@ -72,76 +378,239 @@ class AcademicProcessor:
             if not text_content:
                 return {'error': 'Could not extract text from document'}
             
-            # Classify document
-            document_type = self._classify_document_type(text_content, title)
-            academic_level = self._classify_academic_level(text_content, title)
-            excellence_tier = self._determine_excellence_tier(text_content)
+            plan = self._plan_document(text_content, title)
+            embeddings = self._generate_embeddings(plan['embedding_inputs'])
+            return self._complete_document(plan, embeddings, title, student_id)
+            
+        except Exception as e:
+            self.logger.error(f"Document processing failed: {str(e)}")
+            return {'error': str(e)}
+    
+    async def process_documents(self, jobs: List[Dict], max_concurrency: int = 20) -> List[Dict]:
+        """Process many documents concurrently; results are in job order
+        
+        Each job is a dict with ``file_path``, ``title`` and ``student_id``.
+        Run on the shared loop, e.g. ``app.run_async(processor.process_documents(jobs))``.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def process_one(job: Dict) -> Dict:
+            async with semaphore:
+                return await self._process_document_async(job['file_path'], job['title'], job['student_id'])
+        
+        return await asyncio.gather(*(process_one(job) for job in jobs))
+    
+    async def _process_document_async(self, file_path: str, title: str, student_id: str) -> Dict:
+        """process_document with blocking stages on threads and embeddings awaited"""
+        try:
+            loop = asyncio.get_running_loop()
+            text_content = await loop.run_in_executor(
+                self._extract_executor, self._extract_text_from_file, file_path
+            )
+            if not text_content:
+                return {'error': 'Could not extract text from document'}
             
-            # Create scholarly chunks
-            chunks = self._create_scholarly_chunks(text_content)
+            plan = await loop.run_in_executor(self._extract_executor, self._plan_document, text_content, title)
+            embeddings = await self._generate_embeddings_async(plan['embedding_inputs'])
+            return await asyncio.to_thread(self._complete_document, plan, embeddings, title, student_id)
             
-            # Generate embeddings
-            processed_chunks = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    # Standard embedding
-                    standard_embedding = self._generate_standard_embedding(chunk)
-                    
-                    # Excellence-optimized embedding
-                    excellence_embedding = self._generate_excellence_embedding(chunk, excellence_tier)
-                    
-                    # Analyze scholarly connections
-                    scholarly_connections = self._identify_scholarly_connections(chunk)
-                    
-                    # Calculate complexity score
-                    complexity_score = self._calculate_complexity_score(chunk)
-                    
-                    processed_chunk = {
-                        'title': title,
-                        'content': chunk,
-                        'document_type': document_type,
-                        'academic_level': academic_level,
-                        'excellence_tier': excellence_tier,
-                        'embedding': json.dumps(standard_embedding),
-                        'excellence_embedding': json.dumps(excellence_embedding),
-                        'scholarly_connections': json.dumps(scholarly_connections),
-                        'complexity_score': complexity_score,
-                        'chunk_index': i,
-                        'student_id': student_id,
-                        'citation_count': self._estimate_citation_potential(chunk),
-                        'impact_factor': self._calculate_impact_factor(chunk, excellence_tier)
-                    }
-                    
-                    processed_chunks.append(processed_chunk)
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to process chunk {i}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Document processing failed: {str(e)}")
+            return {'error': str(e)}
+    
+    def process_document_corpus_batch(self, jobs: List[Dict], poll_interval: float = 60.0) -> List[Dict]:
+        """Process a large corpus with embeddings from the OpenAI Batch API
+        
+        Batch jobs cost half as much and are not bound by the synchronous rate
+        limits, but can take up to 24 hours: this blocks until the job ends and
+        is meant for offline corpus loads, not request handlers. Jobs take the
+        same dicts as process_documents; results are in job order.
+        """
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        plans = {}
+        requests = {}
+        
+        for doc_index, job in enumerate(jobs):
+            try:
+                text_content = self._extract_text_from_file(job['file_path'])
+                if not text_content:
+                    results[doc_index] = {'error': 'Could not extract text from document'}
                     continue
+                
+                plan = self._plan_document(text_content, job['title'])
+                plans[doc_index] = plan
+                inputs = plan['embedding_inputs']
+                for start in range(0, len(inputs), EMBEDDING_BATCH_SIZE):
+                    requests[f"{doc_index}:{start}"] = inputs[start:start + EMBEDDING_BATCH_SIZE]
+                    
+            except Exception as e:
+                self.logger.error(f"Document processing failed: {str(e)}")
+                results[doc_index] = {'error': str(e)}
+        
+        embeddings = self._run_embedding_batch(requests, poll_interval)
+        
+        for doc_index, plan in plans.items():
+            job = jobs[doc_index]
+            inputs = plan['embedding_inputs']
+            doc_embeddings = []
+            for start in range(0, len(inputs), EMBEDDING_BATCH_SIZE):
+                doc_embeddings.extend(embeddings[f"{doc_index}:{start}"])
             
-            if not processed_chunks:
-                return {'error': 'No chunks could be processed'}
-            
-            # Store in database
-            stored_ids = self._store_document_chunks(processed_chunks)
+            try:
+                results[doc_index] = self._complete_document(plan, doc_embeddings, job['title'], job['student_id'])
+            except Exception as e:
+                self.logger.error(f"Document processing failed: {str(e)}")
+                results[doc_index] = {'error': str(e)}
+        
+        return results
+    
+    def _run_embedding_batch(self, requests: Dict[str, List[str]],
+                             poll_interval: float) -> Dict[str, List[List[float]]]:
+        """Embed each custom_id's inputs through one Batch API job
+        
+        Requests the job did not complete are embedded synchronously instead.
+        """
+        embeddings = {}
+        if not requests:
+            return embeddings
+        
+        try:
+            payload = "\n".join(json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/embeddings',
+                'body': {'model': EMBEDDING_MODEL, 'input': inputs,
+                         'dimensions': EMBEDDING_DIMENSIONS}
+            }) for custom_id, inputs in requests.items()).encode('utf-8')
             
-            # Update student's document statistics
-            self._update_student_document_stats(student_id)
+            input_file = self.client.files.create(file=('embeddings.jsonl', payload), purpose='batch')
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint='/v1/embeddings',
+                completion_window='24h'
+            )
             
-            return {
-                'success': True,
-                'document_title': title,
-                'chunks_processed': len(processed_chunks),
-                'document_type': document_type,
-                'academic_level': academic_level,
-                'excellence_tier': excellence_tier,
-                'average_complexity': sum(c['complexity_score'] for c in processed_chunks) / len(processed_chunks),
-                'stored_ids': stored_ids,
-                'processed_at': datetime.now().isoformat()
-            }
+            while batch.status in BATCH_PENDING_STATES:
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
             
+            if batch.status != 'completed' or not batch.output_file_id:
+                self.logger.error(f"Embedding batch {batch.id} ended as {batch.status}")
+            else:
+                output = self.client.files.content(batch.output_file_id).text
+                for line in output.splitlines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    response = result.get('response') or {}
+                    if response.get('status_code') != 200:
+                        continue
+                    data = sorted(response['body']['data'], key=lambda d: d['index'])
+                    embeddings[result['custom_id']] = [item['embedding'] for item in data]
+                    
         except Exception as e:
-            self.logger.error(f"Document processing failed: {str(e)}")
-            return {'error': str(e)}
+            self.logger.error(f"Embedding batch job failed: {str(e)}")
+        
+        # Anything the batch did not return goes through the synchronous endpoint
+        missing = [custom_id for custom_id in requests if custom_id not in embeddings]
+        if missing:
+            self.logger.warning(f"Embedding {len(missing)} batch requests synchronously")
+            for custom_id in missing:
+                embeddings[custom_id] = self._generate_embeddings(requests[custom_id])
+        
+        return embeddings
+    
+    def _plan_document(self, text_content: str, title: str) -> Dict:
+        """Classify and chunk a document, listing the texts it needs embedded"""
+        # One keyword scan of the whole document feeds every classifier
+        counts = self._scan(text_content.lower())
+        
+        # Classify document
+        document_type = self._classify_document_type(text_content, title, counts)
+        academic_level = self._classify_academic_level(text_content, title, counts)
+        excellence_tier = self._determine_excellence_tier(text_content, counts)
+        
+        # Create scholarly chunks
+        chunks = self._create_scholarly_chunks(text_content)
+        
+        # Standard then excellence-contextualized text for every chunk
+        prefix = self._tier_prefix.get(excellence_tier) or f"Academic excellence level: {excellence_tier}. "
+        
+        return {
+            'document_type': document_type,
+            'academic_level': academic_level,
+            'excellence_tier': excellence_tier,
+            'chunks': chunks,
+            'embedding_inputs': chunks + [prefix + chunk for chunk in chunks]
+        }
+    
+    def _complete_document(self, plan: Dict, embeddings: List[List[float]], title: str,
+                           student_id: str) -> Dict:
+        """Analyze chunks, store them with their embeddings and summarize the document"""
+        chunks = plan['chunks']
+        document_type = plan['document_type']
+        academic_level = plan['academic_level']
+        excellence_tier = plan['excellence_tier']
+        standard_embeddings = embeddings[:len(chunks)]
+        excellence_embeddings = embeddings[len(chunks):]
+        
+        processed_chunks = []
+        for i, chunk in enumerate(chunks):
+            try:
+                standard_embedding = standard_embeddings[i]
+                excellence_embedding = excellence_embeddings[i]
+                
+                # Connections, complexity, citation potential and impact in one pass
+                analysis = self._analyze_chunk(chunk, excellence_tier)
+                
+                # Compact int8 copy for in-process similarity scans
+                embedding_q, emb_scale, emb_zero = self.db.quantize_embedding(standard_embedding)
+                
+                processed_chunk = {
+                    'title': title,
+                    'content': chunk,
+                    'document_type': document_type,
+                    'academic_level': academic_level,
+                    'excellence_tier': excellence_tier,
+                    'embedding': self.db.encode_vector(standard_embedding),
+                    'excellence_embedding': self.db.encode_vector(excellence_embedding),
+                    'embedding_q': embedding_q,
+                    'emb_scale': emb_scale,
+                    'emb_zero': emb_zero,
+                    'scholarly_connections': json.dumps(analysis['scholarly_connections']),
+                    'complexity_score': analysis['complexity_score'],
+                    'chunk_index': i,
+                    'student_id': student_id,
+                    'citation_count': analysis['citation_count'],
+                    'impact_factor': analysis['impact_factor']
+                }
+                
+                processed_chunks.append(processed_chunk)
+                
+            except Exception as e:
+                self.logger.error(f"Failed to process chunk {i}: {str(e)}")
+                continue
+        
+        if not processed_chunks:
+            return {'error': 'No chunks could be processed'}
+        
+        # Store in database
+        stored_ids = self._store_document_chunks(processed_chunks)
+        
+        # Update student's document statistics
+        self._update_student_document_stats(student_id)
+        
+        return {
+            'success': True,
+            'document_title': title,
+            'chunks_processed': len(processed_chunks),
+            'document_type': document_type,
+            'academic_level': academic_level,
+            'excellence_tier': excellence_tier,
+            'average_complexity': sum(c['complexity_score'] for c in processed_chunks) / len(processed_chunks),
+            'stored_ids': stored_ids,
+            'processed_at': datetime.now().isoformat()
+        }
     
     def _extract_text_from_file(self, file_path: str) -> Optional[str]:
         """Extract text from various file formats"""
@@ -166,32 +635,55 @@ class AcademicProcessor:
             return None
     
     def _extract_from_pdf(self, file_path: str) -> Optional[str]:
-        """Extract text from PDF using PyMuPDF"""
+        """Extract text from PDF using PyMuPDF
+        
+        Long PDFs are split into one contiguous page range per worker process.
+        """
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            
-            for page_num in range(doc.page_count):
-                page = doc.load_page(page_num)
-                text += page.get_text()
+            with fitz.open(file_path) as doc:
+                page_count = doc.page_count
+                if page_count <= PDF_PARALLEL_MIN_PAGES or PDF_EXTRACT_WORKERS < 2:
+                    return "".join(page.get_text("text") for page in doc).strip()
             
-            doc.close()
-            return text.strip()
+            step = -(-page_count // PDF_EXTRACT_WORKERS)
+            starts = range(0, page_count, step)
+            parts = self._pdf_pool.map(
+                _extract_pdf_page_range,
+                [file_path] * len(starts), starts, [min(start + step, page_count) for start in starts]
+            )
+            return "".join(parts).strip()
             
         except Exception as e:
             self.logger.error(f"PDF extraction failed: {str(e)}")
             return None
     
     def _extract_from_docx(self, file_path: str) -> Optional[str]:
-        """Extract text from DOCX files"""
+        """Extract text from DOCX files by streaming word/document.xml
+        
+        Falls back to python-docx if the archive cannot be streamed.
+        """
         try:
-            doc = Document(file_path)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            parts = []
+            with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml:
+                for _, element in etree.iterparse(xml, tag=DOCX_TEXT_TAGS):
+                    tag = element.tag
+                    if tag == DOCX_TEXT_TAGS[0]:
+                        parts.append(element.text or '')
+                    elif tag == DOCX_TEXT_TAGS[1]:
+                        parts.append('\t')
+                    elif tag == DOCX_TEXT_TAGS[2]:
+                        parts.append('\n')
+                    else:
+                        parts.append('\n')
+                        element.clear()
+            return "".join(parts).strip()
             
-            return text.strip()
+        except Exception as e:
+            self.logger.warning(f"Streaming DOCX extraction failed, using python-docx: {str(e)}")
+        
+        try:
+            doc = Document(file_path)
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
             
         except Exception as e:
             self.logger.error(f"DOCX extraction failed: {str(e)}")
@@ -206,50 +698,44 @@ class AcademicProcessor:
             self.logger.error(f"TXT extraction failed: {str(e)}")
             return None
     
-    def _classify_document_type(self, content: str, title: str) -> str:
+    def _classify_document_type(self, content: str, title: str,
+                                counts: Optional[Counter] = None) -> str:
         """Classify the type of academic document"""
-        content_lower = content.lower()
-        title_lower = title.lower()
+        if counts is None:
+            counts = self._scan(content.lower())
+        title_counts = self._scan(title.lower())
         
-        # Research paper indicators
-        research_indicators = ['abstract', 'methodology', 'results', 'conclusion', 'references']
-        if sum(1 for indicator in research_indicators if indicator in content_lower) >= 3:
+        # Checked in priority order; the first matching bucket wins
+        if counts['doctype:research'] >= 3:
             return 'research_paper'
-        
-        # Thesis indicators
-        if any(word in title_lower for word in ['thesis', 'dissertation']):
+        if title_counts['title:thesis']:
             return 'thesis'
-        
-        # Journal article indicators
-        if 'journal' in title_lower or 'volume' in content_lower:
+        if title_counts['title:journal'] or counts['doctype:journal']:
             return 'journal_article'
-        
-        # Course material indicators
-        if any(word in content_lower for word in ['syllabus', 'lecture', 'homework', 'assignment']):
+        if counts['doctype:course']:
             return 'course_material'
-        
-        # Book indicators
-        if any(word in content_lower for word in ['chapter', 'isbn', 'publisher']):
+        if counts['doctype:book']:
             return 'book'
-        
-        # Presentation indicators
-        if any(word in title_lower for word in ['presentation', 'slides', 'ppt']):
+        if title_counts['title:presentation']:
             return 'presentation'
         
         return 'course_material'  # Default
     
-    def _classify_academic_level(self, content: str, title: str) -> str:
+    def _classify_academic_level(self, content: str, title: str,
+                                 counts: Optional[Counter] = None) -> str:
         """Classify the academic level of the document"""
-        content_lower = content.lower()
-        title_lower = title.lower()
+        if counts is None:
+            counts = self._scan(content.lower())
+        title_counts = self._scan(title.lower())
         
-        # Check for level indicators
-        for level, indicators in self.level_indicators.items():
-            if any(indicator in content_lower or indicator in title_lower for indicator in indicators):
+        # Check for level indicators in the content and the title
+        for level in self.level_indicators:
+            tag = f'level:{level}'
+            if counts[tag] or title_counts[tag]:
                 return level
         
         # Analyze complexity as fallback
-        complexity_score = self._calculate_complexity_score(content)
+        complexity_score = self._calculate_complexity_score(content, counts)
         
         if complexity_score >= 80:
             return 'doctoral'
@@ -258,27 +744,18 @@ class AcademicProcessor:
         else:
             return 'undergraduate'
     
-    def _determine_excellence_tier(self, content: str) -> str:
+    def _determine_excellence_tier(self, content: str, counts: Optional[Counter] = None) -> str:
         """Classify content by academic excellence tier"""
-        content_lower = content.lower()
+        if counts is None:
+            counts = self._scan(content.lower())
         
-        # Count keyword matches for each tier
-        tier_scores = {}
-        for tier, keywords in self.excellence_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in content_lower)
-            tier_scores[tier] = score
-        
-        # Additional sophistication factors
-        sophistication_indicators = [
-            'theoretical framework', 'empirical validation', 'meta-analysis',
-            'statistical significance', 'peer review', 'systematic review'
-        ]
-        sophistication_count = sum(1 for indicator in sophistication_indicators 
-                                 if indicator in content_lower)
+        # Keyword matches for each tier and additional sophistication factors
+        tier_scores = {tier: counts[f'tier:{tier}'] for tier in self.excellence_keywords}
+        sophistication_count = counts['sophistication']
         
         # Calculate complexity indicators
-        sentence_count = len(re.split(r'[.!?]+', content))
-        avg_sentence_length = len(content.split()) / max(sentence_count, 1)
+        sentence_count = _count_sentences(content)
+        avg_sentence_length = len(content.split()) / sentence_count
         
         # Determine tier based on multiple factors
         if tier_scores['elite'] >= 3 or sophistication_count >= 4:
@@ -293,22 +770,7 @@ class AcademicProcessor:
     def _create_scholarly_chunks(self, content: str, max_chunk_size: int = 2000) -> List[str]:
         """Create semantically meaningful chunks for academic content"""
         # Split by academic sections first
-        section_patterns = [
-            r'\n\s*Abstract\s*\n',
-            r'\n\s*Introduction\s*\n',
-            r'\n\s*Methodology\s*\n',
-            r'\n\s*Results\s*\n',
-            r'\n\s*Discussion\s*\n',
-            r'\n\s*Conclusion\s*\n',
-            r'\n\s*References\s*\n'
-        ]
-        
-        sections = [content]
-        for pattern in section_patterns:
-            new_sections = []
-            for section in sections:
-                new_sections.extend(re.split(pattern, section, flags=re.IGNORECASE))
-            sections = new_sections
+        sections = SECTION_HEADER_RE.split(content)
         
         # Further split large sections
         chunks = []
@@ -334,44 +796,125 @@ class AcademicProcessor:
         # Filter out very short chunks
         return [chunk for chunk in chunks if len(chunk.split()) > 10]
     
-    def _generate_standard_embedding(self, text: str) -> List[float]:
-        """Generate standard OpenAI embedding"""
-        try:
-            response = self.client.embeddings.create(
-                input=text,
-                model="text-embedding-ada-002"
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            self.logger.error(f"Standard embedding generation failed: {str(e)}")
-            # Return zero vector as fallback
-            return [0.0] * 1536
+    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts in input order, requesting only those not already cached
+        
+        Texts are sent EMBEDDING_BATCH_SIZE per request; the client retries rate
+        limits and transient errors with exponential backoff, and a batch that
+        still fails gets zero vectors, which are not cached.
+        """
+        embeddings, missing = self._cached_embeddings(texts)
+        if not missing:
+            return embeddings
+        
+        client = self.client.with_options(max_retries=EMBEDDING_MAX_RETRIES)
+        fresh = []
+        for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+            batch = [texts[i] for i in missing[start:start + EMBEDDING_BATCH_SIZE]]
+            try:
+                response = client.embeddings.create(
+                    input=batch, model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS
+                )
+                fresh.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+            except Exception as e:
+                self.logger.error(f"Embedding generation failed for {len(batch)} inputs: {str(e)}")
+                fresh.extend(None for _ in batch)
+        
+        return self._fill_embeddings(texts, embeddings, missing, fresh)
     
-    def _generate_excellence_embedding(self, text: str, excellence_tier: str) -> List[float]:
-        """Generate excellence-optimized embedding with academic context"""
-        try:
-            # Add academic context to the text
-            academic_context = f"Academic excellence level: {excellence_tier}. "
-            
-            # Add tier-specific context
-            tier_contexts = {
-                'elite': "This content represents groundbreaking research and seminal work. ",
-                'scholar': "This content demonstrates advanced scholarly analysis. ",
-                'advanced': "This content shows sophisticated academic understanding. ",
-                'basic': "This content covers fundamental academic concepts. "
-            }
-            
-            contextualized_text = academic_context + tier_contexts.get(excellence_tier, "") + text
+    async def _generate_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """Async _generate_embeddings; the batches of one call are requested concurrently"""
+        embeddings, missing = await asyncio.to_thread(self._cached_embeddings, texts)
+        if not missing:
+            return embeddings
+        
+        async def embed_batch(batch: List[str]) -> List[Optional[List[float]]]:
+            try:
+                response = await self.aclient.embeddings.create(
+                    input=batch, model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS
+                )
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            except Exception as e:
+                self.logger.error(f"Embedding generation failed for {len(batch)} inputs: {str(e)}")
+                return [None] * len(batch)
+        
+        batches = await asyncio.gather(*(
+            embed_batch([texts[i] for i in missing[start:start + EMBEDDING_BATCH_SIZE]])
+            for start in range(0, len(missing), EMBEDDING_BATCH_SIZE)
+        ))
+        fresh = [embedding for batch in batches for embedding in batch]
+        return await asyncio.to_thread(self._fill_embeddings, texts, embeddings, missing, fresh)
+    
+    @staticmethod
+    def _embedding_key(text: str) -> bytes:
+        return hashlib.sha256(f"{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}\0{text}".encode('utf-8')).digest()
+    
+    def _cached_embeddings(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[int]]:
+        """Embeddings found in memory or the embedding_cache table, plus indexes still missing"""
+        keys = [self._embedding_key(text) for text in texts]
+        with self._embedding_cache_lock:
+            embeddings = [self._embedding_cache.get(key) for key in keys]
+        
+        unseen = list({keys[i] for i, embedding in enumerate(embeddings) if embedding is None})
+        if unseen:
+            try:
+                rows = self.db.execute_query(
+                    EMBEDDING_CACHE_LOOKUP_QUERY, {'hashes': unseen}, expanding=('hashes',)
+                )
+                stored = {bytes(row['hash']): np.frombuffer(row['vec'], dtype=np.float16).astype(np.float32).tolist()
+                          for row in rows}
+            except Exception as e:
+                self.logger.warning(f"Embedding cache lookup failed: {str(e)}")
+                stored = {}
             
-            response = self.client.embeddings.create(
-                input=contextualized_text,
-                model="text-embedding-ada-002"
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            self.logger.error(f"Excellence embedding generation failed: {str(e)}")
-            # Return zero vector as fallback
-            return [0.0] * 1536
+            with self._embedding_cache_lock:
+                for key, embedding in stored.items():
+                    self._embedding_cache[key] = embedding
+            for i, embedding in enumerate(embeddings):
+                if embedding is None:
+                    embeddings[i] = stored.get(keys[i])
+        
+        return embeddings, [i for i, embedding in enumerate(embeddings) if embedding is None]
+    
+    def _fill_embeddings(self, texts: List[str], embeddings: List[Optional[List[float]]],
+                         missing: List[int], fresh: List[Optional[List[float]]]) -> List[List[float]]:
+        """Slot fresh embeddings into place, caching successes and zero-filling failures"""
+        rows = {}
+        for i, embedding in zip(missing, fresh):
+            if embedding is None:
+                embeddings[i] = [0.0] * EMBEDDING_DIMENSIONS
+                continue
+            embeddings[i] = embedding
+            rows[self._embedding_key(texts[i])] = embedding
+        
+        if rows:
+            with self._embedding_cache_lock:
+                self._embedding_cache.update(rows)
+            try:
+                self.db.execute_insert_many(EMBEDDING_CACHE_INSERT_QUERY, [
+                    {'hash': key, 'vec': np.asarray(embedding, dtype=np.float16).tobytes()}
+                    for key, embedding in rows.items()
+                ])
+            except Exception as e:
+                self.logger.warning(f"Embedding cache write failed: {str(e)}")
+        
+        return embeddings
+    
+    def _analyze_chunk(self, text: str, excellence_tier: str) -> Dict:
+        """Derive every per-chunk metric from one lowercasing, split and keyword scan"""
+        text_lower = text.lower()
+        words = text.split()
+        words_lower = text_lower.split()
+        counts = self._scan(text_lower)
+        token_stats = self._token_stats(words, words_lower)
+        complexity_score = self._calculate_complexity_score(text, counts, token_stats=token_stats)
+        
+        return {
+            'scholarly_connections': self._identify_scholarly_connections(text),
+            'complexity_score': complexity_score,
+            'citation_count': self._estimate_citation_potential(text, token_stats=token_stats),
+            'impact_factor': self._calculate_impact_factor(text, excellence_tier, counts, complexity_score)
+        }
     
     def _identify_scholarly_connections(self, text: str) -> Dict:
         """Identify scholarly connections and relationships in text"""
@@ -383,72 +926,65 @@ class AcademicProcessor:
         }
         
         # Extract citations (basic pattern matching)
-        citation_patterns = [
-            r'\([A-Z][a-zA-Z\s]+,\s+\d{4}\)',  # (Author, 2023)
-            r'\[[0-9,\s-]+\]',  # [1, 2, 3-5]
-            r'[A-Z][a-zA-Z\s]+\s+et\s+al\.'   # Author et al.
-        ]
-        
-        for pattern in citation_patterns:
-            matches = re.findall(pattern, text)
-            connections['citations'].extend(matches[:5])  # Limit to 5
+        for pattern in CITATION_RES:
+            connections['citations'].extend(pattern.findall(text)[:5])  # Limit to 5
         
         # Extract theories and frameworks
-        theory_keywords = [
-            'theory', 'framework', 'model', 'paradigm', 'approach'
-        ]
-        for keyword in theory_keywords:
-            pattern = rf'\b\w+\s+{keyword}\b'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            connections['theories'].extend(matches[:3])
+        for pattern in THEORY_RES:
+            connections['theories'].extend(pattern.findall(text)[:3])
         
         # Extract methodologies
-        method_keywords = [
-            'analysis', 'method', 'technique', 'approach', 'procedure'
-        ]
-        for keyword in method_keywords:
-            pattern = rf'\b\w+\s+{keyword}\b'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            connections['methodologies'].extend(matches[:3])
+        for pattern in METHOD_RES:
+            connections['methodologies'].extend(pattern.findall(text)[:3])
         
         # Extract key concepts (capitalized terms)
-        concept_pattern = r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b'
-        concepts = re.findall(concept_pattern, text)
+        concepts = CONCEPT_RE.findall(text)
         # Filter out common words and keep relevant concepts
         filtered_concepts = [c for c in concepts if len(c.split()) <= 3 and c not in ['The', 'This', 'That']]
         connections['key_concepts'] = filtered_concepts[:10]
         
         return connections
     
-    def _calculate_complexity_score(self, text: str) -> float:
-        """Calculate academic complexity score for text"""
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
+    def _token_stats(self, words: List[str], words_lower: List[str]) -> Tuple[int, int, int, int, int, int]:
+        """(word count, total word length, words over 8 chars, academic, quality
+        and research word counts) from the compiled token kernel"""
+        word_lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        word_classes = np.fromiter(map(self._word_classes.get, words_lower, repeat(0)),
+                                   dtype=np.int64, count=len(words_lower))
+        return (len(words),) + tuple(int(v) for v in _token_stats_kernel(word_lengths, word_classes))
+    
+    def _calculate_complexity_score(self, text: str, counts: Optional[Counter] = None,
+                                    words: Optional[List[str]] = None,
+                                    words_lower: Optional[List[str]] = None,
+                                    token_stats: Optional[Tuple] = None) -> float:
+        """Calculate academic complexity score for text
         
-        if not words or not sentences:
+        ``counts``, ``words``, ``words_lower`` and ``token_stats`` may be passed
+        in when the caller has already scanned and split the same text.
+        """
+        if token_stats is None:
+            if words is None:
+                words = text.split()
+            if words_lower is None:
+                words_lower = text.lower().split()
+            token_stats = self._token_stats(words, words_lower)
+        n_words, total_length, long_words, academic_count = token_stats[:4]
+        
+        if not n_words:
             return 0.0
         
         # Basic metrics
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        avg_sentence_length = len(words) / len(sentences)
-        
-        # Vocabulary sophistication (long words)
-        sophisticated_words = sum(1 for word in words if len(word) > 8)
-        sophistication_ratio = sophisticated_words / len(words)
+        avg_word_length = total_length / n_words
+        avg_sentence_length = n_words / _count_sentences(text)
         
-        # Academic vocabulary
-        academic_terms = [
-            'analysis', 'methodology', 'framework', 'hypothesis', 'empirical',
-            'theoretical', 'systematic', 'comprehensive', 'significant', 'correlation'
-        ]
-        academic_count = sum(1 for word in words 
-                           if word.lower() in academic_terms)
-        academic_ratio = academic_count / len(words)
+        # Vocabulary sophistication (long words) and academic vocabulary
+        sophistication_ratio = long_words / n_words
+        academic_ratio = academic_count / n_words
         
         # Citation indicators
-        citation_indicators = ['et al', 'ibid', 'op cit', 'cf.', 'viz.']
-        citation_count = sum(1 for indicator in citation_indicators 
-                           if indicator in text.lower())
+        if counts is None:
+            counts = self._scan(text.lower())
+        citation_count = counts['citation']
         
         # Calculate final score (0-100)
         complexity_score = (
@@ -461,33 +997,25 @@ class AcademicProcessor:
         
         return min(complexity_score, 100.0)
     
-    def _estimate_citation_potential(self, text: str) -> int:
+    def _estimate_citation_potential(self, text: str, words_lower: Optional[List[str]] = None,
+                                     token_stats: Optional[Tuple] = None) -> int:
         """Estimate potential citation count based on content quality"""
-        words = text.split()
+        if token_stats is None:
+            if words_lower is None:
+                words_lower = text.lower().split()
+            token_stats = self._token_stats(words_lower, words_lower)
         
-        # Quality indicators
-        quality_indicators = [
-            'novel', 'significant', 'important', 'crucial', 'essential',
-            'groundbreaking', 'innovative', 'comprehensive', 'systematic'
-        ]
-        
-        quality_score = sum(1 for word in words 
-                          if word.lower() in quality_indicators)
-        
-        # Research indicators
-        research_indicators = [
-            'study', 'research', 'investigation', 'experiment', 'analysis'
-        ]
-        
-        research_score = sum(1 for word in words 
-                           if word.lower() in research_indicators)
+        # Quality and research indicators
+        quality_score, research_score = token_stats[4:6]
         
         # Base citation potential
         base_citations = min(quality_score * 2 + research_score, 50)
         
         return base_citations
     
-    def _calculate_impact_factor(self, text: str, excellence_tier: str) -> float:
+    def _calculate_impact_factor(self, text: str, excellence_tier: str,
+                                 counts: Optional[Counter] = None,
+                                 complexity_score: Optional[float] = None) -> float:
         """Calculate potential impact factor based on tier and content"""
         # Base impact by tier
         tier_impacts = {
@@ -500,107 +1028,70 @@ class AcademicProcessor:
         base_impact = tier_impacts.get(excellence_tier, 1.0)
         
         # Adjust based on content characteristics
-        complexity_score = self._calculate_complexity_score(text)
+        if counts is None:
+            counts = self._scan(text.lower())
+        if complexity_score is None:
+            complexity_score = self._calculate_complexity_score(text, counts)
         complexity_factor = (complexity_score / 100) * 2
         
         # Innovation indicators
-        innovation_keywords = [
-            'novel', 'new', 'innovative', 'groundbreaking', 'first',
-            'unique', 'original', 'unprecedented'
-        ]
-        
-        innovation_count = sum(1 for keyword in innovation_keywords 
-                             if keyword in text.lower())
+        innovation_count = counts['innovation']
         innovation_factor = min(innovation_count * 0.3, 1.5)
         
         final_impact = base_impact + complexity_factor + innovation_factor
         return min(final_impact, 10.0)
     
     def _store_document_chunks(self, processed_chunks: List[Dict]) -> List[int]:
-        """Store processed chunks in database"""
-        stored_ids = []
-        
-        for chunk in processed_chunks:
-            try:
-                query = """
-                INSERT INTO academic_documents 
-                (title, content, document_type, academic_level, excellence_tier, 
-                 embedding, excellence_embedding, scholarly_connections, 
-                 complexity_score, chunk_index, student_id, citation_count, 
-                 impact_factor, processed_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                values = (
-                    chunk['title'], chunk['content'], chunk['document_type'],
-                    chunk['academic_level'], chunk['excellence_tier'],
-                    chunk['embedding'], chunk['excellence_embedding'],
-                    chunk['scholarly_connections'], chunk['complexity_score'],
-                    chunk['chunk_index'], chunk['student_id'],
-                    chunk['citation_count'], chunk['impact_factor'],
-                    datetime.now()
-                )
-                
-                result = self.db.execute_query(query, values)
-                if result:
-                    stored_ids.append(result.lastrowid if hasattr(result, 'lastrowid') else len(stored_ids))
-                
-            except Exception as e:
-                self.logger.error(f"Failed to store chunk: {str(e)}")
-                continue
+        """Store one document's processed chunks with a multi-row insert, returning their ids"""
+        processed_at = datetime.now()
+        ingest_batch = uuid.uuid4().hex
+        rows = [{**chunk, 'processed_at': processed_at, 'ingest_batch': ingest_batch}
+                for chunk in processed_chunks]
         
-        return stored_ids
+        try:
+            self.db.execute_insert_many(STORE_CHUNK_QUERY, rows)
+            
+            # PyMySQL may split a large batch into several statements, so the ids
+            # are read back rather than derived from lastrowid
+            id_rows = self.db.execute_query(STORED_CHUNK_IDS_QUERY, {'ingest_batch': ingest_batch})
+            return [row['id'] for row in id_rows]
+            
+        except Exception as e:
+            self.logger.error(f"Failed to store {len(rows)} chunks: {str(e)}")
+            return []
     
     def _update_student_document_stats(self, student_id: str):
         """Update student's document processing statistics"""
         try:
-            # Update document count and average complexity
-            stats_query = """
-            UPDATE scholar_profiles 
-            SET document_count = (
-                SELECT COUNT(DISTINCT title) 
-                FROM academic_documents 
-                WHERE student_id = %s
-            ),
-            avg_document_complexity = (
-                SELECT AVG(complexity_score) 
-                FROM academic_documents 
-                WHERE student_id = %s
-            ),
-            last_document_processed = %s
-            WHERE student_id = %s
-            """
-            
-            self.db.execute_query(stats_query, (student_id, student_id, datetime.now(), student_id))
+            # Document count and average complexity from one scan of the student's chunks
+            self.db.execute_update(DOCUMENT_STATS_UPDATE_QUERY, {
+                'student_id': student_id,
+                'processed_at': datetime.now()
+            })
             
         except Exception as e:
             self.logger.error(f"Failed to update student stats: {str(e)}")
     
+    def embed_query(self, text: str) -> Optional[List[float]]:
+        """Embedding of one search query, or None if it could not be generated"""
+        embedding = self._generate_embeddings([text])[0]
+        return embedding if any(embedding) else None
+    
     def search_similar_documents(self, query_text: str, student_id: str = None, 
                                 limit: int = 10) -> List[Dict]:
         """Search for similar documents using vector similarity"""
         try:
             # Generate embedding for query
-            query_embedding = self._generate_standard_embedding(query_text)
+            query_embedding = self._generate_embeddings([query_text])[0]
             
-            # Build search query
-            base_query = """
-            SELECT title, content, document_type, academic_level, excellence_tier,
-                   complexity_score, citation_count, impact_factor,
-                   VEC_COSINE_DISTANCE(embedding, %s) as similarity_score
-            FROM academic_documents
-            """
-            
-            params = [json.dumps(query_embedding)]
+            # Query vector sent at the column's float32 precision
+            params = {'query_vector': self.db.encode_vector(query_embedding), 'limit': limit}
             
             if student_id:
-                base_query += " WHERE student_id = %s"
-                params.append(student_id)
-            
-            base_query += " ORDER BY similarity_score DESC LIMIT %s"
-            params.append(limit)
-            
-            results = self.db.execute_query(base_query, params)
+                params['student_id'] = student_id
+                results = self.db.execute_query(SIMILAR_DOCUMENTS_FOR_STUDENT_QUERY, params)
+            else:
+                results = self.db.execute_query(SIMILAR_DOCUMENTS_ALL_QUERY, params)
             
             return [{
                 'title': row['title'],
@@ -0,0 +1,61 @@
+"""
+Prima Scholar Async Runner
+Runs I/O-bound coroutines on a persistent background event loop
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+import httpx
+
+class AsyncRunner:
+    """Background event loop shared by services for outbound network calls"""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20):
+        self.logger = logging.getLogger(__name__)
+
+        # Persistent loop on a daemon thread; request threads hand it coroutines
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever,
+            name='prima-async-loop',
+            daemon=True
+        )
+        self._thread.start()
+
+        # Shared pooled HTTP/2 client for external API calls
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+
+        self.logger.info("Async runner started")
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine without waiting; failures are logged"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _log_failure(self, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Background task failed: {str(future.exception())}")
+
+    def close(self):
+        """Close the HTTP client and stop the event loop"""
+        try:
+            self.run(self.http_client.aclose(), timeout=5)
+        except Exception as e:
+            self.logger.error(f"Error closing async HTTP client: {str(e)}")
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
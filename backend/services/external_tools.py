@@ -1,7 +1,43 @@
+import logging
+
 class ExternalToolsService:
-    def __init__(self, **kwargs):
+    def __init__(self, sendgrid_key=None, google_calendar_key=None,
+                 linkedin_key=None, slack_token=None, async_runner=None, **kwargs):
         self.logger = logging.getLogger(__name__)
-        
+
+        # Keys are stored only; SDK clients are imported on first use
+        self.sendgrid_key = sendgrid_key
+        self.google_calendar_key = google_calendar_key
+        self.linkedin_key = linkedin_key
+        self.slack_token = slack_token
+        self._sendgrid_client = None
+        self._slack_client = None
+
+        # Shared background loop and pooled async HTTP client for outbound calls
+        self.async_runner = async_runner
+
+    @property
+    def sendgrid_client(self):
+        """SendGrid client, created on first access if a key is configured"""
+        if self._sendgrid_client is None and self.sendgrid_key:
+            from sendgrid import SendGridAPIClient
+            self._sendgrid_client = SendGridAPIClient(self.sendgrid_key)
+        return self._sendgrid_client
+
+    @property
+    def slack_client(self):
+        """Slack client, created on first access if a token is configured"""
+        if self._slack_client is None and self.slack_token:
+            from slack_sdk import WebClient
+            self._slack_client = WebClient(token=self.slack_token)
+        return self._slack_client
+
+    def submit(self, coro):
+        """Run an outbound call on the background loop without blocking the request"""
+        if self.async_runner is None:
+            raise RuntimeError("No async runner configured for external tools")
+        return self.async_runner.submit(coro)
+
     def send_milestone_notification(self, student_id, milestone):
         self.logger.info(f"Milestone notification: {milestone}")
-        return True
\ No newline at end of file
+        return True
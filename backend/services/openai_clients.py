@@ -0,0 +1,38 @@
+"""
+Prima Scholar OpenAI Clients
+Process-wide OpenAI clients sharing one pooled HTTP/2 connection per API key
+"""
+
+import threading
+from typing import Dict
+
+import httpx
+import openai
+
+# Connection pool shared by every chat and embedding call in the process
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 50
+
+_CLIENTS: Dict[str, openai.OpenAI] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """Return the process-wide client for an API key, creating it on first use
+
+    DefaultHttpxClient keeps the SDK's timeouts and redirect handling; HTTP/2
+    multiplexes concurrent requests over the pooled connections.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = _CLIENTS[api_key] = openai.OpenAI(
+                api_key=api_key,
+                http_client=openai.DefaultHttpxClient(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                    )
+                )
+            )
+        return client
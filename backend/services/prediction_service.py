@@ -4,20 +4,182 @@ Handles caching and real-time prediction updates
 """
 
 import redis
-import json
+import redis.utils
+import orjson
+import zstandard
 import logging
-from typing import Dict, Optional
+import math
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# Entries per pipeline flush; very deep pipelines stall other clients. The
+# limit adapts between the floor and ceiling from observed flush latency.
+PIPELINE_MAX = 512
+PIPELINE_MIN = 16
+PIPELINE_CEILING = 2048
+PIPELINE_SLOW_NS = 5_000_000  # shrink by a quarter above this smoothed latency
+PIPELINE_FAST_NS = 500_000  # grow by a quarter below it
+PIPELINE_EWMA_ALPHA = 0.2
+
+# Background writer: queued writes flushed WRITE_BATCH_MAX at a time
+WRITE_QUEUE_MAX = 10_000
+WRITE_BATCH_MAX = 256
+
+def _prediction_key(student_id: str) -> str:
+    """Hash of a student's cached predictions, one field per distinction
+    
+    The student id is a cluster hash tag, so any per-student key shares its
+    slot while different students spread across shards.
+    """
+    return f"prediction:{{{student_id}}}"
+
+def _queue_hset(pipe, student_id: str, distinction: str, value: bytes, ttl: int):
+    """Queue a prediction write on a pipeline
+    
+    The key TTL covers the whole hash and is pushed back by every write, so each
+    field's own expiry lives in its envelope and readers check it (_live_value).
+    """
+    cache_key = _prediction_key(student_id)
+    pipe.hset(cache_key, distinction, value)
+    pipe.expire(cache_key, ttl)
+
+# Health checks within this many seconds reuse the last result
+HEALTH_CACHE_SECONDS = 1.0
+
+# XFetch: a read refreshes early with probability rising as expiry nears,
+# scaled by how long the prediction took to compute
+XFETCH_BETA = 1.0
+
+# Encoded envelopes longer than this are zstd-compressed; the first byte of a
+# stored value marks the format (b'Z' compressed, b'R' raw JSON)
+COMPRESS_MIN_BYTES = 512
+ZSTD_LEVEL = 1
+
+# zstd contexts must not be shared between threads
+_zstd_contexts = threading.local()
+
+def _zstd_compressor() -> zstandard.ZstdCompressor:
+    compressor = getattr(_zstd_contexts, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_contexts.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor
+
+def _zstd_decompressor() -> zstandard.ZstdDecompressor:
+    decompressor = getattr(_zstd_contexts, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _zstd_contexts.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+def _encode_prediction(prediction: Dict, ttl: int, delta: float = 0.0) -> bytes:
+    """Cache value for a prediction: a compact JSON envelope of the prediction,
+    its expiry (epoch seconds) and its recompute cost, compressed when large"""
+    encoded = orjson.dumps({'v': prediction, 'exp': time.time() + ttl, 'delta': delta},
+                           option=orjson.OPT_SERIALIZE_NUMPY)
+    if len(encoded) > COMPRESS_MIN_BYTES:
+        return b'Z' + _zstd_compressor().compress(encoded)
+    return b'R' + encoded
+
+def _decode_envelope(data: bytes) -> Dict:
+    """Envelope for a cached value; bare predictions from older writes never refresh early"""
+    marker = data[:1]
+    if marker == b'Z':
+        data = _zstd_decompressor().decompress(data[1:])
+    elif marker == b'R':
+        data = data[1:]
+    envelope = orjson.loads(data)
+    if 'v' not in envelope:
+        return {'v': envelope, 'exp': math.inf, 'delta': 0.0}
+    return envelope
+
+def _live_value(data: bytes) -> Optional[Dict]:
+    """Prediction in a cached value, or None once its own expiry has passed"""
+    envelope = _decode_envelope(data)
+    if time.time() >= envelope['exp']:
+        return None
+    return envelope['v']
+
+def _should_refresh(envelope: Dict, beta: float = XFETCH_BETA) -> bool:
+    """XFetch test: now - delta * beta * ln(U) >= expiry, U uniform in (0, 1]"""
+    return time.time() - envelope['delta'] * beta * math.log(1.0 - random.random()) >= envelope['exp']
+
+# In-process front cache in front of Redis for repeat reads within a burst
+LOCAL_CACHE_MAX = 10_000
+LOCAL_CACHE_TTL = 30  # seconds
+
+# Colocated Redis is reached over its unix socket when one is present
+REDIS_SOCKET_PATH = os.environ.get('REDIS_SOCKET_PATH', '/var/run/redis/redis.sock')
+_LOOPBACK_HOSTS = frozenset({'localhost', '127.0.0.1', '::1'})
+
+def _prefer_unix_socket(redis_url: str, socket_path: str) -> str:
+    """unix:// URL for a loopback redis:// URL when the local socket exists"""
+    parts = urlsplit(redis_url)
+    if parts.scheme != 'redis' or parts.hostname not in _LOOPBACK_HOSTS or not os.path.exists(socket_path):
+        return redis_url
+    
+    query = {'db': parts.path.lstrip('/') or '0'}
+    if parts.username:
+        query['username'] = parts.username
+    if parts.password:
+        query['password'] = parts.password
+    return f"unix://{socket_path}?{urlencode(query)}"
+
+def create_redis_pool(redis_url: str, max_connections: int = 32, timeout: float = 2,
+                      socket_path: str = REDIS_SOCKET_PATH, **kwargs) -> redis.ConnectionPool:
+    """Blocking connection pool, over the local unix socket when Redis is colocated
+    
+    TCP connections get keepalive probes after 60s idle; redis-py already sets
+    TCP_NODELAY on them. ``kwargs`` go to the pool's connections.
+    """
+    redis_url = _prefer_unix_socket(redis_url, socket_path)
+    if redis_url.startswith('unix://'):
+        kwargs.pop('socket_keepalive', None)
+    else:
+        kwargs.setdefault('socket_keepalive', True)
+        if kwargs['socket_keepalive'] and hasattr(socket, 'TCP_KEEPIDLE'):
+            kwargs.setdefault('socket_keepalive_options', {socket.TCP_KEEPIDLE: 60})
+    return redis.BlockingConnectionPool.from_url(
+        redis_url, max_connections=max_connections, timeout=timeout, **kwargs
+    )
+
+# Process-wide pools for services built from a URL rather than a shared pool
+_POOLS: Dict[str, redis.ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def _get_pool(redis_url: str) -> redis.ConnectionPool:
+    """One blocking connection pool per Redis URL, shared by every instance"""
+    pool = _POOLS.get(redis_url)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(redis_url)
+            if pool is None:
+                pool = create_redis_pool(redis_url)
+                _POOLS[redis_url] = pool
+    return pool
 
 class PredictionService:
-    def __init__(self, excellence_engine, db_manager, redis_url: Optional[str] = None):
+    def __init__(self, excellence_engine, db_manager, redis_url: Optional[str] = None,
+                 redis_pool: Optional[redis.ConnectionPool] = None):
         self.excellence_engine = excellence_engine
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
         
-        # Initialize Redis for caching
-        if redis_url:
+        # Initialize Redis for caching, reusing a shared connection pool if given
+        if redis_pool is not None:
+            self.redis_client = redis.Redis(connection_pool=redis_pool)
+            self.cache_enabled = True
+            self.logger.info("Redis cache enabled")
+        elif redis_url:
             try:
-                self.redis_client = redis.from_url(redis_url)
+                self.redis_client = redis.Redis(connection_pool=_get_pool(redis_url))
                 self.cache_enabled = True
                 self.logger.info("Redis cache enabled")
             except Exception as e:
@@ -25,46 +187,321 @@ class PredictionService:
                 self.cache_enabled = False
         else:
             self.cache_enabled = False
+        
+        # student_id -> {distinction: prediction}, read before Redis
+        self._local_cache = TTLCache(maxsize=LOCAL_CACHE_MAX, ttl=LOCAL_CACHE_TTL)
+        self._local_cache_lock = threading.Lock()
+        
+        # Pipeline flush latencies (ns) and the adaptive entries-per-flush limit
+        self._flush_latencies = deque(maxlen=1024)
+        self._flush_ewma_ns = 0.0
+        self._pipeline_max = PIPELINE_MAX
+        self._flush_stats_lock = threading.Lock()
+        self._last_ping = (float('-inf'), False)
+        
+        # Early (XFetch) refreshes in flight, one per (student_id, distinction)
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prediction-refresh')
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        # Single-key writes leave the request thread and are pipelined in the background
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_MAX)
+        self.dropped_writes = 0
+        if self.cache_enabled:
+            if not redis.utils.HIREDIS_AVAILABLE:
+                self.logger.warning("hiredis not installed; Redis replies use the pure-Python parser")
+            self._hget = self.redis_client.hget
+            threading.Thread(target=self._drain_writes, name='prediction-cache-writer',
+                             daemon=True).start()
+        else:
+            self._disable_cache()
+    
+    def _disable_cache(self):
+        """Shadow the cache methods with no-ops so callers skip the enabled check"""
+        self.get_prediction = lambda student_id, distinction, ttl=600: (
+            self.excellence_engine.predict_distinction_probability(student_id, distinction)
+        )
+        self.get_cached_prediction = lambda *args, **kwargs: None
+        self.get_cached_predictions_bulk = lambda *args, **kwargs: {}
+        self.get_cached_predictions_for_students = lambda *args, **kwargs: {}
+        self.get_all_cached = lambda *args, **kwargs: {}
+        self.cache_prediction = lambda *args, **kwargs: None
+        self.cache_predictions_bulk = lambda *args, **kwargs: None
+        self.invalidate_student = lambda *args, **kwargs: None
+        self.flush = lambda: None
+        self.test_cache = lambda: False
     
     def get_cached_prediction(self, student_id: str, distinction: str) -> Optional[Dict]:
         """Get cached prediction if available"""
-        if not self.cache_enabled:
-            return None
+        with self._local_cache_lock:
+            prediction = self._local_cache.get(student_id, {}).get(distinction)
+        if prediction is not None:
+            return prediction
             
         try:
-            cache_key = f"prediction:{student_id}:{distinction}"
-            cached_data = self.redis_client.get(cache_key)
+            cached_data = self._hget(_prediction_key(student_id), distinction)
             
-            if cached_data:
-                return json.loads(cached_data)
-            return None
+            prediction = _live_value(cached_data) if cached_data else None
+            if prediction is not None:
+                self._remember(((student_id, distinction, prediction),))
+            return prediction
             
         except Exception as e:
             self.logger.error(f"Cache retrieval failed: {e}")
             return None
     
-    def cache_prediction(self, student_id: str, distinction: str, prediction: Dict, ttl: int = 600):
-        """Cache prediction result"""
-        if not self.cache_enabled:
-            return
+    def get_prediction(self, student_id: str, distinction: str, ttl: int = 600) -> Dict:
+        """Prediction from the cache, computing it through the excellence engine on a miss
+        
+        As a cached entry nears expiry, reads increasingly often (XFetch) serve
+        it while one background refresh recomputes it, so concurrent readers
+        do not all recompute when it expires.
+        """
+        with self._local_cache_lock:
+            prediction = self._local_cache.get(student_id, {}).get(distinction)
+        if prediction is not None:
+            return prediction
+        
+        try:
+            cached_data = self._hget(_prediction_key(student_id), distinction)
+        except Exception as e:
+            self.logger.error(f"Cache retrieval failed: {e}")
+            cached_data = None
+        
+        envelope = _decode_envelope(cached_data) if cached_data else None
+        if envelope is not None and time.time() < envelope['exp']:
+            if _should_refresh(envelope):
+                self._schedule_refresh(student_id, distinction, ttl)
+            self._remember(((student_id, distinction, envelope['v']),))
+            return envelope['v']
+        
+        return self._compute_and_cache(student_id, distinction, ttl)
+    
+    def _compute_and_cache(self, student_id: str, distinction: str, ttl: int) -> Dict:
+        """Run the engine prediction and cache it with its compute time"""
+        start = time.perf_counter()
+        prediction = self.excellence_engine.predict_distinction_probability(student_id, distinction)
+        if 'error' not in prediction:
+            self.cache_prediction(student_id, distinction, prediction, ttl,
+                                  delta=time.perf_counter() - start)
+        return prediction
+    
+    def _schedule_refresh(self, student_id: str, distinction: str, ttl: int):
+        """Recompute an entry in the background unless a refresh is already running"""
+        key = (student_id, distinction)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self._compute_and_cache(student_id, distinction, ttl)
+            except Exception as e:
+                self.logger.error(f"Prediction refresh failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        self._refresh_executor.submit(refresh)
+    
+    def get_cached_predictions_bulk(self, student_id: str, distinctions: List[str]) -> Dict[str, Dict]:
+        """Cached predictions for several distinctions of one student in one HMGET"""
+        found = self.get_cached_predictions_for_students(
+            (student_id, distinction) for distinction in distinctions
+        )
+        return {distinction: prediction for (_, distinction), prediction in found.items()}
+    
+    def get_cached_predictions_for_students(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Cached predictions for many (student_id, distinction) pairs in one round-trip
+        
+        One HMGET per student is pipelined; pairs with no live cached entry
+        are left out of the result.
+        """
+        found = {}
+        remote: Dict[str, List[str]] = {}
+        with self._local_cache_lock:
+            for student_id, distinction in pairs:
+                prediction = self._local_cache.get(student_id, {}).get(distinction)
+                if prediction is not None:
+                    found[(student_id, distinction)] = prediction
+                else:
+                    remote.setdefault(student_id, []).append(distinction)
+        if not remote:
+            return found
+            
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for student_id, distinctions in remote.items():
+                    pipe.hmget(_prediction_key(student_id), distinctions)
+                replies = self._execute_pipeline(pipe)
+            
+            fetched = {}
+            for (student_id, distinctions), values in zip(remote.items(), replies):
+                for distinction, data in zip(distinctions, values):
+                    prediction = _live_value(data) if data else None
+                    if prediction is not None:
+                        fetched[(student_id, distinction)] = prediction
+            self._remember((sid, d, prediction) for (sid, d), prediction in fetched.items())
+            found.update(fetched)
+            return found
             
+        except Exception as e:
+            self.logger.error(f"Bulk cache retrieval failed: {e}")
+            return found
+    
+    def get_all_cached(self, student_id: str) -> Dict[str, Dict]:
+        """Every cached prediction for a student, by distinction, in one HGETALL"""
+        try:
+            cached = self.redis_client.hgetall(_prediction_key(student_id))
+            predictions = {}
+            for distinction, data in cached.items():
+                prediction = _live_value(data)
+                if prediction is not None:
+                    predictions[distinction.decode()] = prediction
+            self._remember((student_id, d, prediction) for d, prediction in predictions.items())
+            return predictions
+            
+        except Exception as e:
+            self.logger.error(f"Cache retrieval failed: {e}")
+            return {}
+    
+    def cache_prediction(self, student_id: str, distinction: str, prediction: Dict, ttl: int = 600,
+                         delta: float = 0.0):
+        """Queue a prediction for caching; dropped (and counted) if the writer is backed up
+        
+        ``delta`` is the seconds it took to compute, used for early refresh.
+        """
+        self._remember(((student_id, distinction, prediction),))
         try:
-            cache_key = f"prediction:{student_id}:{distinction}"
-            self.redis_client.setex(
-                cache_key, 
-                ttl, 
-                json.dumps(prediction)
+            self._write_queue.put_nowait(
+                (student_id, distinction, _encode_prediction(prediction, ttl, delta), ttl)
             )
+        except queue.Full:
+            self.dropped_writes += 1
         except Exception as e:
             self.logger.error(f"Cache storage failed: {e}")
     
-    def test_cache(self) -> bool:
-        """Test cache connection"""
-        if not self.cache_enabled:
-            return False
+    def _remember(self, items: Iterable[Tuple[str, str, Dict]]):
+        """Store (student_id, distinction, prediction) entries in the front cache"""
+        with self._local_cache_lock:
+            for student_id, distinction, prediction in items:
+                predictions = self._local_cache.get(student_id)
+                if predictions is None:
+                    predictions = self._local_cache[student_id] = {}
+                predictions[distinction] = prediction
+    
+    def flush(self):
+        """Block until every queued cache write has been sent"""
+        self._write_queue.join()
+    
+    def _execute_pipeline(self, pipe) -> List:
+        """Execute a pipeline, recording its latency and adapting the flush size"""
+        start = time.perf_counter_ns()
+        replies = pipe.execute()
+        elapsed = time.perf_counter_ns() - start
+        
+        # A completed round-trip answers the next health check without a PING
+        self._last_ping = (time.monotonic(), True)
+        
+        with self._flush_stats_lock:
+            self._flush_latencies.append(elapsed)
+            self._flush_ewma_ns += PIPELINE_EWMA_ALPHA * (elapsed - self._flush_ewma_ns)
+            if self._flush_ewma_ns > PIPELINE_SLOW_NS:
+                self._pipeline_max = max(PIPELINE_MIN, self._pipeline_max * 3 // 4)
+            elif self._flush_ewma_ns < PIPELINE_FAST_NS:
+                self._pipeline_max = min(PIPELINE_CEILING, self._pipeline_max * 5 // 4)
+        return replies
+    
+    def stats(self) -> Dict:
+        """Recent pipeline flush latency percentiles (ms) and the current flush size"""
+        with self._flush_stats_lock:
+            latencies = sorted(self._flush_latencies)
+            pipeline_max = self._pipeline_max
+        
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1e6
+        
+        return {
+            'flushes': len(latencies),
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'pipeline_max': pipeline_max,
+            'dropped_writes': self.dropped_writes
+        }
+    
+    def _drain_writes(self):
+        """Writer thread: pipeline queued writes and invalidations in batches, in queue order"""
+        while True:
+            batch = [self._write_queue.get()]
+            limit = min(WRITE_BATCH_MAX, self._pipeline_max)
+            while len(batch) < limit:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
             
+            try:
+                with self.redis_client.pipeline(transaction=False) as pipe:
+                    for student_id, distinction, value, ttl in batch:
+                        if distinction is None:
+                            pipe.delete(_prediction_key(student_id))
+                        else:
+                            _queue_hset(pipe, student_id, distinction, value, ttl)
+                    self._execute_pipeline(pipe)
+            except Exception as e:
+                self.logger.error(f"Cache storage failed for {len(batch)} predictions: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def cache_predictions_bulk(self, items: Iterable[Tuple[str, str, Dict]], ttl: int = 600):
+        """Cache many (student_id, distinction, prediction) results, one adaptive-size pipeline per round-trip"""
+        items = list(items)
+        self._remember(items)
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                queued = 0
+                for student_id, distinction, prediction in items:
+                    _queue_hset(pipe, student_id, distinction, _encode_prediction(prediction, ttl), ttl)
+                    queued += 1
+                    if queued >= self._pipeline_max:
+                        self._execute_pipeline(pipe)
+                        queued = 0
+                if queued:
+                    self._execute_pipeline(pipe)
+        except Exception as e:
+            self.logger.error(f"Bulk cache storage failed: {e}")
+    
+    def invalidate_student(self, student_id: str):
+        """Drop every cached prediction for a student with one DEL
+        
+        The DEL goes through the writer queue behind any writes already queued
+        for the student, so none of them can bring the predictions back; unlike
+        writes it is never dropped, and waits for room if the queue is full.
+        Only this process's front cache is cleared: other workers may serve
+        their local copies for up to LOCAL_CACHE_TTL seconds.
+        """
+        with self._local_cache_lock:
+            self._local_cache.pop(student_id, None)
+        
+        try:
+            self._write_queue.put((student_id, None, None, None))
+        except Exception as e:
+            self.logger.error(f"Cache invalidation failed: {e}")
+    
+    def test_cache(self) -> bool:
+        """Test cache connection, reusing a result (or a successful pipeline) from the last second"""
+        now = time.monotonic()
+        checked_at, healthy = self._last_ping
+        if now - checked_at < HEALTH_CACHE_SECONDS:
+            return healthy
+        
         try:
-            self.redis_client.ping()
-            return True
-        except:
-            return False
\ No newline at end of file
+            healthy = bool(self.redis_client.ping())
+        except redis.RedisError:
+            healthy = False
+        self._last_ping = (now, healthy)
+        return healthy
@@ -1,10 +1,16 @@
+import logging
+
+# Shared default recommendations; callers must treat them as read-only. Plain
+# dicts rather than MappingProxyType so they stay JSON-serializable.
+_DEFAULT_RESOURCES = (
+    {'title': 'Academic Excellence Guide', 'type': 'guide'},
+    {'title': 'Scholar Networks', 'type': 'network'}
+)
+
 class ResourceCurator:
     def __init__(self, db_manager, openai_api_key):
         self.db = db_manager
         self.logger = logging.getLogger(__name__)
     
     def curate_resources(self, student_profile):
-        return [
-            {'title': 'Academic Excellence Guide', 'type': 'guide'},
-            {'title': 'Scholar Networks', 'type': 'network'}
-        ]
\ No newline at end of file
+        return _DEFAULT_RESOURCES
@@ -3,22 +3,345 @@ Prima Scholar Mentorship Service
 Provides elite-level academic mentorship using AI
 """
 
-import openai
 import logging
-import json
-from typing import Dict, List, Optional
+import orjson
+import threading
+import time
+from cachetools import TTLCache
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import re
+import sys
+import regex
+
+from services.openai_clients import get_openai_client
+
+# Upper bound, in seconds, on the fused sophistication scan of one query
+SOPHISTICATION_SCAN_TIMEOUT = 0.05
+
+# Word tokens; keyword lookups are whole-word intersections with a text's token set
+TOKEN_RE = re.compile(r'\w+')
+
+# Technical terminology; the count is the number of distinct terms present
+TECHNICAL_TERMS = frozenset({
+    'methodology', 'epistemology', 'paradigm', 'framework',
+    'empirical', 'theoretical', 'analysis', 'synthesis'
+})
+
+# Session quality: base score scaled by the query's sophistication
+SESSION_QUALITY_BASE = 3.0
+SOPHISTICATION_MULTIPLIERS = {
+    'basic': 1.0,
+    'intermediate': 1.2,
+    'advanced': 1.5,
+    'scholar': 2.0
+}
+
+# Prediction increase per engagement at each sophistication level
+SOPHISTICATION_IMPACT = {
+    'basic': 0.5,
+    'intermediate': 1.0,
+    'advanced': 2.0,
+    'scholar': 3.5
+}
+
+# Student context queries, issued concurrently rather than back to back. Every
+# recent-session row also carries the engagement aggregates over those sessions
+RECENT_SESSIONS_QUERY = """
+SELECT recent.*,
+       AVG(session_quality_score) OVER () AS recent_avg_quality,
+       SUM(query_sophistication IN ('advanced', 'scholar')) OVER () AS recent_advanced_count
+FROM (
+    SELECT query, query_sophistication, session_quality_score, created_at
+    FROM mentorship_sessions
+    WHERE student_id = :student_id
+    ORDER BY created_at DESC
+    LIMIT 5
+) recent
+ORDER BY created_at DESC
+"""
+DOCUMENT_STATS_QUERY = """
+SELECT 
+    COUNT(*) as total_docs,
+    COUNT(CASE WHEN excellence_tier = 'elite' THEN 1 END) as elite_docs,
+    AVG(complexity_score) as avg_complexity,
+    GROUP_CONCAT(DISTINCT document_type) as doc_types
+FROM academic_documents
+WHERE student_id = :student_id
+"""
+
+# VALUES() in the update clause so PyMySQL can fold all rows into one INSERT
+UPSERT_PREDICTION_UPDATES_QUERY = """
+INSERT INTO prediction_updates 
+(student_id, distinction_type, previous_probability, updated_probability, 
+ probability_increase, updated_at)
+VALUES (:student_id, :distinction_type, :previous_probability, 
+        :updated_probability, :probability_increase, :updated_at)
+ON DUPLICATE KEY UPDATE
+previous_probability = updated_probability,
+updated_probability = VALUES(updated_probability),
+probability_increase = VALUES(probability_increase),
+updated_at = VALUES(updated_at)
+"""
+
+# Student documents nearest the query embedding, truncated server-side
+CONTEXT_VECTOR_QUERY = """
+SELECT title, SUBSTRING(content, 1, 1000) AS content, excellence_tier,
+       VEC_COSINE_DISTANCE(embedding, :query_vector) AS distance
+FROM academic_documents
+WHERE student_id = :student_id AND embedding IS NOT NULL
+ORDER BY distance ASC
+LIMIT :limit
+"""
+
+# Full-text fallback for when the query cannot be embedded, ranked by the
+# BM25 relevance of the ft_title and ft_content indexes
+CONTEXT_FULLTEXT_QUERY = """
+SELECT title, SUBSTRING(content, 1, 1000) AS content, excellence_tier,
+       fts_match_word(:query, title) + fts_match_word(:query, content) AS relevance
+FROM academic_documents
+WHERE student_id = :student_id
+AND (fts_match_word(:query, title) OR fts_match_word(:query, content))
+ORDER BY relevance DESC
+LIMIT :limit
+"""
+
+# Response fields stored in typed columns instead of the scholar_response document
+SESSION_COLUMN_FIELDS = frozenset({'frameworks', 'actions', 'response_time'})
+
+INSERT_SESSION_QUERY = """
+INSERT INTO mentorship_sessions 
+(student_id, query, query_sophistication, excellence_gap_analysis, 
+ scholar_response, thinking_frameworks, recommended_actions, response_time_ms,
+ session_quality_score, probability_updates, created_at)
+VALUES (:student_id, :query, :query_sophistication, :excellence_gap_analysis,
+        :scholar_response, :thinking_frameworks, :recommended_actions, :response_time_ms,
+        :session_quality_score, :probability_updates, :created_at)
+"""
+
+# response_preview is a stored generated column; rows written before the frameworks
+# column was filled still carry frameworks inside scholar_response
+SESSION_HISTORY_ALL_QUERY = """
+SELECT id AS session_id, query, query_sophistication, session_quality_score, created_at,
+       response_preview,
+       COALESCE(thinking_frameworks, JSON_EXTRACT(scholar_response, '$.frameworks')) AS frameworks_used
+FROM mentorship_sessions
+WHERE student_id = :student_id
+ORDER BY created_at DESC, id DESC
+"""
+SESSION_HISTORY_QUERY = SESSION_HISTORY_ALL_QUERY + "LIMIT :limit\n"
+
+# Keyset page after a (created_at, id) cursor; id breaks ties between sessions
+# stored in the same second, and idx_student_created (which carries the primary
+# key) serves the range without scanning earlier pages
+SESSION_HISTORY_PAGE_QUERY = """
+SELECT id AS session_id, query, query_sophistication, session_quality_score, created_at,
+       response_preview,
+       COALESCE(thinking_frameworks, JSON_EXTRACT(scholar_response, '$.frameworks')) AS frameworks_used
+FROM mentorship_sessions
+WHERE student_id = :student_id
+AND (created_at < :cursor_created_at
+     OR (created_at = :cursor_created_at AND id < :cursor_id))
+ORDER BY created_at DESC, id DESC
+LIMIT :limit
+"""
+
+# Hard cap on one history page
+SESSION_HISTORY_MAX_PAGE = 100
+
+# Rows per server-side cursor batch when streaming a full history
+SESSION_HISTORY_BATCH = 500
+
+# Dashboard analytics from the student_mentorship_stats rollup, a point lookup per
+# student; percentages are DOUBLE, as Python's round() returned
+SESSION_ANALYTICS_FIELDS = """
+    total_sessions,
+    ROUND(sum_quality / NULLIF(total_sessions, 0), 2) as average_quality,
+    max_quality as peak_quality,
+    CAST(ROUND(100 * scholar_queries / NULLIF(total_sessions, 0), 1) AS DOUBLE) as scholar_percentage,
+    CAST(ROUND(100 * advanced_queries / NULLIF(total_sessions, 0), 1) AS DOUBLE) as advanced_percentage,
+    CAST(ROUND(100 * high_quality_sessions / NULLIF(total_sessions, 0), 1) AS DOUBLE) as excellence_rate
+"""
+SESSION_ANALYTICS_QUERY = f"""
+SELECT {SESSION_ANALYTICS_FIELDS}
+FROM student_mentorship_stats
+WHERE student_id = :student_id
+"""
+SESSION_ANALYTICS_BULK_QUERY = f"""
+SELECT student_id, {SESSION_ANALYTICS_FIELDS}
+FROM student_mentorship_stats
+WHERE student_id IN :student_ids
+"""
+
+# History page and analytics in one round trip: every history row carries the
+# student's rollup, and a student with no stats row has no sessions either
+DASHBOARD_QUERY = f"""
+SELECT {SESSION_ANALYTICS_FIELDS}, h.*
+FROM student_mentorship_stats s
+LEFT JOIN ({SESSION_HISTORY_QUERY}) h ON 1 = 1
+WHERE s.student_id = :student_id
+ORDER BY h.created_at DESC, h.session_id DESC
+"""
+
+# Folds one session into the rollup; written in the session insert's transaction
+UPSERT_SESSION_STATS_QUERY = """
+INSERT INTO student_mentorship_stats
+(student_id, total_sessions, sum_quality, max_quality,
+ scholar_queries, advanced_queries, high_quality_sessions)
+VALUES (:student_id, 1, :quality, :quality, :scholar, :advanced, :high_quality)
+ON DUPLICATE KEY UPDATE
+total_sessions = total_sessions + 1,
+sum_quality = sum_quality + VALUES(sum_quality),
+max_quality = GREATEST(max_quality, VALUES(max_quality)),
+scholar_queries = scholar_queries + VALUES(scholar_queries),
+advanced_queries = advanced_queries + VALUES(advanced_queries),
+high_quality_sessions = high_quality_sessions + VALUES(high_quality_sessions)
+"""
+
+# Chat model for mentorship replies; it must support JSON mode (response_format)
+# and caches repeated prompt prefixes server-side
+MENTORSHIP_MODEL = "gpt-4o-mini"
+
+# Static mentor instructions, sent first so every request shares the same prefix;
+# per-student details follow in the user message
+MENTORSHIP_SYSTEM_PROMPT = """You are an elite academic mentor with expertise equivalent to Harvard, MIT, and Oxford professors. You're mentoring an ambitious student who seeks academic excellence and distinction.
+
+Your mission is to provide mentorship that elevates the student's thinking to scholar level while addressing their query. This is not basic tutoring - this is elite academic guidance.
+
+RESPONSE REQUIREMENTS:
+1. Address the query at the highest appropriate academic level
+2. Connect to 2-3 major theoretical frameworks or scholarly traditions
+3. Suggest advanced methodologies and analytical approaches
+4. Identify how mastering this concept elevates their academic profile
+5. Recommend specific scholarly actions and elite resources
+6. Pose 2-3 deeper questions that push thinking beyond the original query
+7. Explain how this response elevates their thinking beyond basic understanding
+
+RESPONSE FORMAT (JSON):
+{
+  "response": "Comprehensive scholar-level mentorship response (750-1000 words)",
+  "frameworks": ["Theoretical Framework 1", "Framework 2", "Framework 3"],
+  "methodologies": ["Advanced Method 1", "Method 2"],
+  "excellence_impact": "Specific explanation of how this elevates academic standing",
+  "actions": ["Specific Action 1", "Action 2", "Action 3"],
+  "deeper_questions": ["Deep Question 1", "Question 2", "Question 3"],
+  "resources": [
+    {"type": "journal", "title": "Specific Journal", "relevance": "Why this matters"},
+    {"type": "book", "title": "Essential Book", "author": "Author", "relevance": "Academic value"}
+  ],
+  "thinking_elevation": "How this response specifically elevates beyond basic level",
+  "interdisciplinary_connections": ["Connection to other fields"]
+}
+
+Maintain the tone of an inspiring, world-class academic mentor who recognizes the student's potential for greatness and refuses to accept anything less than excellence.
+"""
+
+# Per-student half of the mentorship prompt; values are substituted, never re-parsed
+MENTORSHIP_USER_TEMPLATE = """
+STUDENT EXCELLENCE PROFILE:
+- Current Excellence Score: {current_score}/100
+- Target Academic Distinction: {target_distinction}
+- Query Sophistication Level: {query_sophistication}
+- Academic Field: {academic_field}
+
+EXCELLENCE GAP ANALYSIS:
+{excellence_gap_analysis}
+
+ACADEMIC CONTEXT FROM STUDENT'S DOCUMENTS:
+{context}
+
+STUDENT QUERY: "{query}"
+"""
+
+def _session_quality_score(multiplier: float, response_length: int, framework_count: int,
+                           methodology_count: int, response_time: float) -> float:
+    """Session quality in [1, 5] from the response's extracted measurements"""
+    score = SESSION_QUALITY_BASE * multiplier
+    
+    # Length and depth bonus
+    if response_length > 500:
+        score += 0.3
+    if response_length > 800:
+        score += 0.2
+    
+    # Frameworks and methodologies bonus
+    score += min(0.4, framework_count * 0.1)
+    score += min(0.3, methodology_count * 0.1)
+    
+    # Response time penalty (if too slow)
+    if response_time > 3000:  # 3 seconds
+        score -= 0.2
+    
+    return min(5.0, max(1.0, score))
+
+@dataclass(slots=True, frozen=True)
+class SessionSummary:
+    """One mentorship session as listed in a student's history"""
+    session_id: int
+    query: str
+    sophistication: str
+    quality_score: float
+    created_at: Optional[str]
+    response_preview: str
+    frameworks_used: List[str]
+    
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def _session_summary(session) -> SessionSummary:
+    """SessionSummary from a SESSION_HISTORY_QUERY row
+    
+    The preview arrives truncated; only the small frameworks array is parsed.
+    Sophistication levels and framework names repeat across rows, so they are
+    interned to share one string each.
+    """
+    intern = sys.intern
+    created_at = session['created_at']
+    sophistication = session['query_sophistication']
+    preview = session['response_preview']
+    frameworks = session['frameworks_used']
+    return SessionSummary(
+        session['session_id'],
+        session['query'],
+        intern(sophistication) if sophistication else sophistication,
+        session['session_quality_score'],
+        created_at.isoformat(timespec='seconds') if created_at else None,
+        preview or '',
+        [intern(name) if isinstance(name, str) else name
+         for name in orjson.loads(frameworks)] if frameworks else []
+    )
 
 class ScholarMentorshipService:
     """Provides scholar-level academic mentorship and guidance"""
     
-    def __init__(self, openai_api_key: str, excellence_engine, db_manager):
-        self.client = openai.OpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, excellence_engine, db_manager,
+                 academic_processor=None):
+        self.client = get_openai_client(openai_api_key)
         self.excellence_engine = excellence_engine
         self.db = db_manager
+        
+        # Embeds queries for context search; without it context falls back to full-text
+        self.academic_processor = academic_processor
         self.logger = logging.getLogger(__name__)
         
+        # Runs a request's independent DB lookups in parallel
+        self._db_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='mentorship-db')
+        
+        # Writes the response does not depend on, kept apart so they never queue behind reads
+        self._write_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mentorship-write')
+        
+        # Student context and inferred field per student, reused across a session's queries
+        self._context_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._context_cache_lock = threading.Lock()
+        self._field_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._field_cache_lock = threading.Lock()
+        
+        # Dashboard analytics per student; dropped whenever the student stores a session
+        self._analytics_cache = TTLCache(maxsize=4096, ttl=45)
+        self._analytics_cache_lock = threading.Lock()
+        
         # Query sophistication patterns
         self.sophistication_patterns = {
             'scholar': [
@@ -32,8 +355,8 @@ class ScholarMentorshipService:
                 r'research methodology', r'empirical evidence'
             ],
             'intermediate': [
-                r'how does.*relate', r'what is the relationship',
-                r'explain the connection', r'compare.*with',
+                r'how does.*?relate', r'what is the relationship',
+                r'explain the connection', r'compare.*?with',
                 r'analyze the impact', r'discuss the implications'
             ],
             'basic': [
@@ -42,6 +365,8 @@ class ScholarMentorshipService:
             ]
         }
         
+        self._sophistication_scans = self._build_sophistication_scans()
+        
         # Academic disciplines for context
         self.academic_contexts = {
             'STEM': ['mathematics', 'physics', 'chemistry', 'biology', 'engineering', 'computer science'],
@@ -52,113 +377,212 @@ class ScholarMentorshipService:
             'Law': ['constitutional', 'criminal', 'civil', 'international', 'corporate']
         }
         
+        # Keywords for inferring a student's field from their documents
+        self.field_keywords = {
+            'STEM': ['algorithm', 'equation', 'analysis', 'data', 'research', 'method', 'theory'],
+            'Social Sciences': ['society', 'behavior', 'culture', 'psychology', 'social'],
+            'Humanities': ['literature', 'history', 'philosophy', 'art', 'culture'],
+            'Business': ['business', 'management', 'strategy', 'market', 'economics'],
+            'Medicine': ['medical', 'clinical', 'patient', 'health', 'disease'],
+            'Law': ['legal', 'court', 'law', 'regulation', 'justice']
+        }
+        self._field_keyword_sets = {
+            field: frozenset(keywords) for field, keywords in self.field_keywords.items()
+        }
+        
         self.logger.info("Scholar Mentorship Service initialized")
     
     def generate_scholar_response(self, student_id: str, query: str, 
                                 context_documents: Optional[List[str]] = None) -> Dict:
         """Generate elite academic mentorship response"""
         try:
-            # Get student profile and context
-            student_profile = self._get_student_context(student_id)
-            if not student_profile:
+            session = self._prepare_session(student_id, query, context_documents)
+            if session is None:
                 return {'error': 'Student profile not found'}
             
-            # Assess query sophistication
-            query_sophistication = self._assess_query_sophistication(query)
-            
-            # Get relevant document context
-            if not context_documents:
-                context_documents = self._search_relevant_context(student_id, query)
-            
-            # Analyze excellence gap
-            excellence_gap_analysis = self._analyze_excellence_gap(
-                query, student_profile, query_sophistication
-            )
-            
             # Generate scholar-level response
             mentorship_response = self._generate_mentorship_response(
-                query, student_profile, context_documents, 
-                query_sophistication, excellence_gap_analysis
+                query, session['student_profile'], session['context_documents'],
+                session['query_sophistication'], session['excellence_gap_analysis']
             )
             
-            # Calculate session quality score
-            session_quality = self._calculate_session_quality(
-                query, mentorship_response, query_sophistication
-            )
+            return self._complete_session(student_id, query, session, mentorship_response)
             
-            # Update predictions based on engagement
-            probability_updates = self._update_predictions_from_engagement(
-                student_id, query, mentorship_response, session_quality
+        except Exception as e:
+            self.logger.error(f"Mentorship response generation failed: {str(e)}")
+            return {'error': str(e)}
+    
+    def stream_scholar_response(self, student_id: str, query: str,
+                                context_documents: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Stream the mentor's reply as the model writes it, then the stored session
+        
+        Yields {'type': 'delta', 'content': ...} events, then one
+        {'type': 'session', ...} event carrying what generate_scholar_response
+        returns, or {'type': 'error', ...}. response_time is time to first token.
+        """
+        try:
+            session = self._prepare_session(student_id, query, context_documents)
+            if session is None:
+                yield {'type': 'error', 'error': 'Student profile not found'}
+                return
+            
+            prompt = self._build_mentorship_prompt(
+                query, session['student_profile'], session['context_documents'],
+                session['query_sophistication'], session['excellence_gap_analysis']
             )
             
-            # Store session in database
-            session_id = self._store_mentorship_session(
-                student_id, query, query_sophistication, excellence_gap_analysis,
-                mentorship_response, session_quality, probability_updates
+            start = time.perf_counter()
+            first_token_ms = None
+            parts = []
+            stream = self.client.chat.completions.create(
+                model=MENTORSHIP_MODEL,
+                messages=[
+                    {"role": "system", "content": MENTORSHIP_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=2000,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(delta)
+                yield {'type': 'delta', 'content': delta}
+            
+            mentorship_response = self._parse_mentorship_content("".join(parts), query)
+            mentorship_response['response_time'] = (
+                first_token_ms if first_token_ms is not None else (time.perf_counter() - start) * 1000
             )
             
-            return {
-                'session_id': session_id,
-                'query_sophistication': query_sophistication,
-                'excellence_gap_analysis': excellence_gap_analysis,
-                'scholar_response': mentorship_response['response'],
-                'theoretical_frameworks': mentorship_response['frameworks'],
-                'advanced_methodologies': mentorship_response['methodologies'],
-                'excellence_impact': mentorship_response['excellence_impact'],
-                'scholarly_actions': mentorship_response['actions'],
-                'deeper_questions': mentorship_response['deeper_questions'],
-                'resource_recommendations': mentorship_response['resources'],
-                'thinking_elevation': mentorship_response['thinking_elevation'],
-                'session_quality_score': session_quality,
-                'probability_updates': probability_updates,
-                'response_time': mentorship_response['response_time'],
-                'generated_at': datetime.now().isoformat()
-            }
+            yield {'type': 'session', **self._complete_session(student_id, query, session, mentorship_response)}
             
         except Exception as e:
-            self.logger.error(f"Mentorship response generation failed: {str(e)}")
-            return {'error': str(e)}
+            self.logger.error(f"Mentorship response streaming failed: {str(e)}")
+            yield {'type': 'error', 'error': str(e)}
+    
+    def _prepare_session(self, student_id: str, query: str,
+                         context_documents: Optional[List[str]]) -> Optional[Dict]:
+        """Student context, query sophistication, document context and excellence gap"""
+        # Relevant document context is searched while the student context loads
+        context_future = None
+        if not context_documents:
+            context_future = self._db_executor.submit(self._search_relevant_context, student_id, query)
+        
+        # Get student profile and context
+        student_profile = self._get_student_context(student_id)
+        if not student_profile:
+            return None
+        
+        # Assess query sophistication
+        query_sophistication = self._assess_query_sophistication(query)
+        
+        # Get relevant document context
+        if context_future is not None:
+            context_documents = context_future.result()
+        
+        # Analyze excellence gap
+        excellence_gap_analysis = self._analyze_excellence_gap(
+            query, student_profile, query_sophistication
+        )
+        
+        return {
+            'student_profile': student_profile,
+            'query_sophistication': query_sophistication,
+            'context_documents': context_documents,
+            'excellence_gap_analysis': excellence_gap_analysis
+        }
+    
+    def _complete_session(self, student_id: str, query: str, session: Dict,
+                          mentorship_response: Dict) -> Dict:
+        """Score, store and summarize a session once the mentor's reply is complete"""
+        query_sophistication = session['query_sophistication']
+        excellence_gap_analysis = session['excellence_gap_analysis']
+        
+        # Calculate session quality score
+        session_quality = self._calculate_session_quality(
+            query, mentorship_response, query_sophistication
+        )
+        
+        # Update predictions based on engagement
+        probability_updates = self._update_predictions_from_engagement(
+            student_id, query_sophistication, mentorship_response, session_quality
+        )
+        
+        # Store session in database
+        session_id = self._store_mentorship_session(
+            student_id, query, query_sophistication, excellence_gap_analysis,
+            mentorship_response, session_quality, probability_updates
+        )
+        
+        return {
+            'session_id': session_id,
+            'query_sophistication': query_sophistication,
+            'excellence_gap_analysis': excellence_gap_analysis,
+            'scholar_response': mentorship_response['response'],
+            'theoretical_frameworks': mentorship_response['frameworks'],
+            'advanced_methodologies': mentorship_response['methodologies'],
+            'excellence_impact': mentorship_response['excellence_impact'],
+            'scholarly_actions': mentorship_response['actions'],
+            'deeper_questions': mentorship_response['deeper_questions'],
+            'resource_recommendations': mentorship_response['resources'],
+            'thinking_elevation': mentorship_response['thinking_elevation'],
+            'session_quality_score': session_quality,
+            'probability_updates': probability_updates,
+            'response_time': mentorship_response['response_time'],
+            'generated_at': datetime.now().isoformat()
+        }
     
     def _get_student_context(self, student_id: str) -> Optional[Dict]:
+        """_load_student_context behind a 300s TTL cache"""
+        with self._context_cache_lock:
+            context = self._context_cache.get(student_id)
+        if context is not None:
+            return context
+        
+        context = self._load_student_context(student_id)
+        if context:
+            with self._context_cache_lock:
+                self._context_cache[student_id] = context
+        return context
+    
+    def invalidate_student(self, student_id: str) -> None:
+        """Drop cached context for a student after their sessions or documents change"""
+        with self._context_cache_lock:
+            self._context_cache.pop(student_id, None)
+        with self._field_cache_lock:
+            self._field_cache.pop(student_id, None)
+        with self._analytics_cache_lock:
+            self._analytics_cache.pop(student_id, None)
+    
+    def _load_student_context(self, student_id: str) -> Optional[Dict]:
         """Get comprehensive student context for mentorship"""
         try:
-            # Get basic profile
-            profile = self.db.get_student_profile(student_id)
+            # Profile, recent sessions, document statistics and field inference
+            # are independent lookups, so they run concurrently
+            params = {'student_id': student_id}
+            profile_future = self._db_executor.submit(self.db.get_student_profile, student_id)
+            sessions_future = self._db_executor.submit(self.db.execute_query, RECENT_SESSIONS_QUERY, params)
+            stats_future = self._db_executor.submit(self.db.execute_query, DOCUMENT_STATS_QUERY, params)
+            field_future = self._db_executor.submit(self._infer_academic_field, student_id)
+            
+            profile = profile_future.result()
             if not profile:
                 return None
             
-            # Get recent mentorship sessions
-            recent_sessions_query = """
-            SELECT query, query_sophistication, session_quality_score, created_at
-            FROM mentorship_sessions
-            WHERE student_id = :student_id
-            ORDER BY created_at DESC
-            LIMIT 5
-            """
-            
-            recent_sessions = self.db.execute_query(
-                recent_sessions_query, {'student_id': student_id}
-            )
-            
-            # Get document statistics
-            doc_stats_query = """
-            SELECT 
-                COUNT(*) as total_docs,
-                COUNT(CASE WHEN excellence_tier = 'elite' THEN 1 END) as elite_docs,
-                AVG(complexity_score) as avg_complexity,
-                GROUP_CONCAT(DISTINCT document_type) as doc_types
-            FROM academic_documents
-            WHERE student_id = :student_id
-            """
-            
-            doc_stats = self.db.execute_query(doc_stats_query, {'student_id': student_id})
+            recent_sessions = sessions_future.result()
+            doc_stats = stats_future.result()
             
             # Combine context
             context = dict(profile)
             context.update({
                 'recent_sessions': recent_sessions,
                 'document_stats': doc_stats[0] if doc_stats else {},
-                'academic_field': self._infer_academic_field(student_id),
+                'academic_field': field_future.result(),
                 'engagement_pattern': self._analyze_engagement_pattern(recent_sessions)
             })
             
@@ -168,15 +592,66 @@ class ScholarMentorshipService:
             self.logger.error(f"Failed to get student context: {str(e)}")
             return None
     
+    def _build_sophistication_scans(self) -> List[Tuple]:
+        """Fuse the sophistication patterns into a few regexes, one named group each
+        
+        Each alternative is a lookahead, so a scan advances one character at a
+        time and a match never hides a pattern inside it. Only one alternative
+        can match at a position, so patterns that may start at the same place
+        (the same leading character, e.g. 'what is' and 'what is the
+        relationship') go into different scans and every pattern is counted,
+        as separate searches would. Compiled with the regex module so scans can
+        be time-limited and run without the GIL.
+        """
+        scans = []
+        entries = [(level, pattern) for level, patterns in self.sophistication_patterns.items()
+                   for pattern in patterns]
+        for n, (level, pattern) in enumerate(entries):
+            lead = pattern[0] if pattern[:1].isalnum() else None
+            for leads, groups in scans:
+                if lead is not None and lead not in leads:
+                    break
+            else:
+                leads, groups = set(), {}
+                scans.append((leads, groups))
+            if lead is not None:
+                leads.add(lead)
+            groups[f'p{n}'] = (level, pattern)
+        
+        compiled = []
+        for _, groups in scans:
+            alternatives = '|'.join(f'(?=(?P<{name}>{pattern}))' for name, (_, pattern) in groups.items())
+            compiled.append((regex.compile(alternatives),
+                             {name: level for name, (level, _) in groups.items()}))
+        return compiled
+    
     def _assess_query_sophistication(self, query: str) -> str:
         """Assess the academic sophistication level of the query"""
+        if not query.strip():
+            return 'basic'
+        
         query_lower = query.lower()
         
-        # Count pattern matches for each sophistication level
-        sophistication_scores = {}
-        for level, patterns in self.sophistication_patterns.items():
-            score = sum(1 for pattern in patterns if re.search(pattern, query_lower))
-            sophistication_scores[level] = score
+        # Count distinct pattern matches for each sophistication level, sharing
+        # one time budget across the fused scans
+        sophistication_scores = dict.fromkeys(self.sophistication_patterns, 0)
+        deadline = time.monotonic() + SOPHISTICATION_SCAN_TIMEOUT
+        try:
+            for scan, levels in self._sophistication_scans:
+                matched = {m.lastgroup for m in scan.finditer(
+                    query_lower, concurrent=True, timeout=max(0.0, deadline - time.monotonic())
+                )}
+                for group in matched:
+                    sophistication_scores[levels[group]] += 1
+        except TimeoutError:
+            self.logger.warning(f"Sophistication scan timed out on a {len(query)}-character query")
+        
+        # The factors below add at most 3 to 'advanced' and never lower 'scholar',
+        # which wins ties; past this margin they cannot change the result
+        if sophistication_scores['scholar'] >= max(sophistication_scores['basic'],
+                                                   sophistication_scores['intermediate'],
+                                                   sophistication_scores['advanced'] + 3):
+            return 'scholar'
         
         # Additional factors
         
@@ -193,11 +668,7 @@ class ScholarMentorshipService:
             sophistication_scores['scholar'] = sophistication_scores.get('scholar', 0) + 1
         
         # Technical terminology
-        technical_terms = [
-            'methodology', 'epistemology', 'paradigm', 'framework',
-            'empirical', 'theoretical', 'analysis', 'synthesis'
-        ]
-        technical_count = sum(1 for term in technical_terms if term in query_lower)
+        technical_count = len(TECHNICAL_TERMS.intersection(TOKEN_RE.findall(query_lower)))
         
         if technical_count >= 3:
             sophistication_scores['scholar'] = sophistication_scores.get('scholar', 0) + 2
@@ -212,35 +683,30 @@ class ScholarMentorshipService:
     
     def _search_relevant_context(self, student_id: str, query: str, limit: int = 5) -> List[str]:
         """Search for relevant context from student's documents"""
+        query_embedding = None
+        if self.academic_processor:
+            try:
+                query_embedding = self.academic_processor.embed_query(query)
+            except Exception as e:
+                self.logger.error(f"Query embedding failed, using full-text search: {str(e)}")
+        
         try:
-            # Use the academic processor to search documents
-            # This would typically use the existing processor instance
-            # For now, we'll do a simple database search
-            
-            search_query = """
-            SELECT content, title, excellence_tier
-            FROM academic_documents
-            WHERE student_id = :student_id
-            AND (MATCH(content) AGAINST (:query IN NATURAL LANGUAGE MODE)
-                 OR MATCH(title) AGAINST (:query IN NATURAL LANGUAGE MODE))
-            ORDER BY excellence_tier DESC, complexity_score DESC
-            LIMIT :limit
-            """
-            
-            results = self.db.execute_query(search_query, {
-                'student_id': student_id,
-                'query': query,
-                'limit': limit
-            })
-            
-            # Extract content chunks
-            context_chunks = []
-            for result in results:
-                # Truncate content to manageable size
-                content = result['content'][:1000]
-                context_chunks.append(f"[{result['title']}]: {content}")
+            # Nearest documents by the embeddings stored at ingest
+            if query_embedding is not None:
+                results = self.db.execute_query(CONTEXT_VECTOR_QUERY, {
+                    'student_id': student_id,
+                    'query_vector': self.db.encode_vector(query_embedding),
+                    'limit': limit
+                })
+            else:
+                results = self.db.execute_query(CONTEXT_FULLTEXT_QUERY, {
+                    'student_id': student_id,
+                    'query': query,
+                    'limit': limit
+                })
             
-            return context_chunks
+            # Content arrives truncated to 1000 characters
+            return [f"[{result['title']}]: {result['content']}" for result in results]
             
         except Exception as e:
             self.logger.error(f"Context search failed: {str(e)}")
@@ -304,84 +770,29 @@ Key Areas for Elevation:
                                     excellence_gap_analysis: str) -> Dict:
         """Generate comprehensive scholar-level mentorship response"""
         try:
-            start_time = datetime.now()
+            start = time.perf_counter()
             
-            # Determine academic context
-            academic_field = student_profile.get('academic_field', 'interdisciplinary')
-            current_score = student_profile.get('excellence_score', 60)
-            target_distinction = student_profile.get('target_distinction', 'Dean_List')
-            
-            # Build sophisticated prompt
-            mentorship_prompt = f"""
-You are an elite academic mentor with expertise equivalent to Harvard, MIT, and Oxford professors. You're mentoring an ambitious student who seeks academic excellence and distinction.
-
-STUDENT EXCELLENCE PROFILE:
-- Current Excellence Score: {current_score}/100
-- Target Academic Distinction: {target_distinction}
-- Query Sophistication Level: {query_sophistication}
-- Academic Field: {academic_field}
-
-EXCELLENCE GAP ANALYSIS:
-{excellence_gap_analysis}
-
-ACADEMIC CONTEXT FROM STUDENT'S DOCUMENTS:
-{chr(10).join(context_documents) if context_documents else "No specific context available"}
-
-STUDENT QUERY: "{query}"
-
-Your mission is to provide mentorship that elevates the student's thinking to scholar level while addressing their query. This is not basic tutoring - this is elite academic guidance.
-
-RESPONSE REQUIREMENTS:
-1. Address the query at the highest appropriate academic level
-2. Connect to 2-3 major theoretical frameworks or scholarly traditions
-3. Suggest advanced methodologies and analytical approaches
-4. Identify how mastering this concept elevates their academic profile
-5. Recommend specific scholarly actions and elite resources
-6. Pose 2-3 deeper questions that push thinking beyond the original query
-7. Explain how this response elevates their thinking beyond basic understanding
-
-RESPONSE FORMAT (JSON):
-{{
-  "response": "Comprehensive scholar-level mentorship response (750-1000 words)",
-  "frameworks": ["Theoretical Framework 1", "Framework 2", "Framework 3"],
-  "methodologies": ["Advanced Method 1", "Method 2"],
-  "excellence_impact": "Specific explanation of how this elevates academic standing",
-  "actions": ["Specific Action 1", "Action 2", "Action 3"],
-  "deeper_questions": ["Deep Question 1", "Question 2", "Question 3"],
-  "resources": [
-    {{"type": "journal", "title": "Specific Journal", "relevance": "Why this matters"}},
-    {{"type": "book", "title": "Essential Book", "author": "Author", "relevance": "Academic value"}}
-  ],
-  "thinking_elevation": "How this response specifically elevates beyond basic level",
-  "interdisciplinary_connections": ["Connection to other fields"]
-}}
-
-Maintain the tone of an inspiring, world-class academic mentor who recognizes the student's potential for greatness and refuses to accept anything less than excellence.
-"""
+            mentorship_prompt = self._build_mentorship_prompt(
+                query, student_profile, context_documents,
+                query_sophistication, excellence_gap_analysis
+            )
             
             response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": mentorship_prompt}],
+                model=MENTORSHIP_MODEL,
+                messages=[
+                    {"role": "system", "content": MENTORSHIP_SYSTEM_PROMPT},
+                    {"role": "user", "content": mentorship_prompt}
+                ],
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
             # Parse response
-            response_content = response.choices[0].message.content
-            
-            # Try to extract JSON from response
-            try:
-                # Look for JSON block in response
-                json_start = response_content.find('{')
-                json_end = response_content.rfind('}') + 1
-                json_str = response_content[json_start:json_end]
-                parsed_response = json.loads(json_str)
-            except:
-                # Fallback if JSON parsing fails
-                parsed_response = self._create_fallback_response(response_content, query)
+            parsed_response = self._parse_mentorship_content(response.choices[0].message.content, query)
             
             # Calculate response time
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter() - start) * 1000
             parsed_response['response_time'] = response_time
             
             return parsed_response
@@ -390,6 +801,30 @@ Maintain the tone of an inspiring, world-class academic mentor who recognizes th
             self.logger.error(f"Mentorship response generation failed: {str(e)}")
             return self._create_fallback_response("", query, error=str(e))
     
+    def _build_mentorship_prompt(self, query: str, student_profile: Dict,
+                                 context_documents: List[str], query_sophistication: str,
+                                 excellence_gap_analysis: str) -> str:
+        """Per-student user message following MENTORSHIP_SYSTEM_PROMPT"""
+        return MENTORSHIP_USER_TEMPLATE.format_map({
+            'current_score': student_profile.get('excellence_score', 60),
+            'target_distinction': student_profile.get('target_distinction', 'Dean_List'),
+            'query_sophistication': query_sophistication,
+            'academic_field': student_profile.get('academic_field', 'interdisciplinary'),
+            'excellence_gap_analysis': excellence_gap_analysis,
+            'context': "\n".join(context_documents) if context_documents else "No specific context available",
+            'query': query
+        })
+    
+    def _parse_mentorship_content(self, response_content: str, query: str) -> Dict:
+        """Mentorship fields from the model's JSON-mode reply
+        
+        A reply cut off at max_tokens is not valid JSON; the fallback keeps its text.
+        """
+        try:
+            return orjson.loads(response_content)
+        except orjson.JSONDecodeError:
+            return self._create_fallback_response(response_content, query)
+    
     def _create_fallback_response(self, content: str, query: str, error: str = None) -> Dict:
         """Create fallback response when OpenAI fails"""
         return {
@@ -417,59 +852,25 @@ Maintain the tone of an inspiring, world-class academic mentor who recognizes th
                                  query_sophistication: str) -> float:
         """Calculate quality score for the mentorship session"""
         try:
-            base_score = 3.0
-            
-            # Query sophistication impact
-            sophistication_multipliers = {
-                'basic': 1.0,
-                'intermediate': 1.2,
-                'advanced': 1.5,
-                'scholar': 2.0
-            }
-            score = base_score * sophistication_multipliers.get(query_sophistication, 1.0)
-            
-            # Response quality factors
-            response_text = mentorship_response.get('response', '')
-            frameworks = mentorship_response.get('frameworks', [])
-            methodologies = mentorship_response.get('methodologies', [])
-            
-            # Length and depth bonus
-            if len(response_text) > 500:
-                score += 0.3
-            if len(response_text) > 800:
-                score += 0.2
-            
-            # Frameworks and methodologies bonus
-            score += min(0.4, len(frameworks) * 0.1)
-            score += min(0.3, len(methodologies) * 0.1)
-            
-            # Response time penalty (if too slow)
-            response_time = mentorship_response.get('response_time', 0)
-            if response_time > 3000:  # 3 seconds
-                score -= 0.2
-            
-            # Cap at 5.0
-            return min(5.0, max(1.0, score))
+            return _session_quality_score(
+                SOPHISTICATION_MULTIPLIERS.get(query_sophistication, 1.0),
+                len(mentorship_response.get('response', '')),
+                len(mentorship_response.get('frameworks', [])),
+                len(mentorship_response.get('methodologies', [])),
+                mentorship_response.get('response_time', 0)
+            )
             
         except Exception as e:
             self.logger.error(f"Quality calculation failed: {str(e)}")
             return 3.0
     
-    def _update_predictions_from_engagement(self, student_id: str, query: str,
+    def _update_predictions_from_engagement(self, student_id: str, query_sophistication: str,
                                           mentorship_response: Dict, 
                                           session_quality: float) -> Dict:
         """Update academic distinction predictions based on engagement quality"""
         try:
-            # Calculate engagement impact
-            sophistication_impact = {
-                'basic': 0.5,
-                'intermediate': 1.0,
-                'advanced': 2.0,
-                'scholar': 3.5
-            }
-            
-            query_sophistication = self._assess_query_sophistication(query)
-            base_impact = sophistication_impact.get(query_sophistication, 1.0)
+            # Calculate engagement impact from the session's already-assessed level
+            base_impact = SOPHISTICATION_IMPACT.get(query_sophistication, 1.0)
             
             # Quality multiplier
             quality_multiplier = session_quality / 4.0  # Normalize to ~1.0
@@ -491,8 +892,8 @@ Maintain the tone of an inspiring, world-class academic mentor who recognizes th
                     'increase': new_prob - current_prob
                 }
             
-            # Store updates in database
-            self._store_prediction_updates(student_id, updated_predictions)
+            # Store updates in the background; the response already carries them
+            self._write_executor.submit(self._store_prediction_updates, student_id, updated_predictions)
             
             return updated_predictions
             
@@ -503,121 +904,130 @@ Maintain the tone of an inspiring, world-class academic mentor who recognizes th
     def _store_mentorship_session(self, student_id: str, query: str, 
                                 query_sophistication: str, excellence_gap_analysis: str,
                                 mentorship_response: Dict, session_quality: float,
-                                probability_updates: Dict) -> str:
-        """Store mentorship session in database"""
+                                probability_updates: Dict) -> Optional[int]:
+        """Store mentorship session in database and return its row id"""
         try:
+            # Frameworks, actions and timing go to their own columns; the rest stays one document
+            response_document = {
+                key: value for key, value in mentorship_response.items()
+                if key not in SESSION_COLUMN_FIELDS
+            }
             session_data = {
                 'student_id': student_id,
                 'query': query,
                 'query_sophistication': query_sophistication,
                 'excellence_gap_analysis': excellence_gap_analysis,
-                'scholar_response': json.dumps(mentorship_response),
+                'scholar_response': orjson.dumps(response_document).decode(),
+                'thinking_frameworks': orjson.dumps(mentorship_response.get('frameworks', [])).decode(),
+                'recommended_actions': orjson.dumps(mentorship_response.get('actions', [])).decode(),
+                'response_time_ms': int(mentorship_response.get('response_time', 0)),
                 'session_quality_score': session_quality,
-                'probability_updates': json.dumps(probability_updates),
+                'probability_updates': orjson.dumps(probability_updates).decode(),
                 'created_at': datetime.now()
             }
             
-            insert_query = """
-            INSERT INTO mentorship_sessions 
-            (student_id, query, query_sophistication, excellence_gap_analysis, 
-             scholar_response, session_quality_score, probability_updates, created_at)
-            VALUES (:student_id, :query, :query_sophistication, :excellence_gap_analysis,
-                    :scholar_response, :session_quality_score, :probability_updates, :created_at)
-            """
+            # Quality as the DECIMAL(3,2) column stores it, so the rollup matches the rows
+            quality = round(session_quality, 2)
+            stats_data = {
+                'student_id': student_id,
+                'quality': quality,
+                'scholar': int(query_sophistication == 'scholar'),
+                'advanced': int(query_sophistication == 'advanced'),
+                'high_quality': int(quality > 4.0)
+            }
             
-            result = self.db.execute_query(insert_query, session_data)
+            # The AUTO_INCREMENT id comes back with the insert (cursor.lastrowid)
+            session_id, _ = self.db.execute_writes([
+                (INSERT_SESSION_QUERY, session_data),
+                (UPSERT_SESSION_STATS_QUERY, stats_data)
+            ])
             
-            # Generate session ID (in real implementation, this would be returned by DB)
-            session_id = f"session_{student_id}_{int(datetime.now().timestamp())}"
+            # Recent sessions are part of the cached context and analytics
+            with self._context_cache_lock:
+                self._context_cache.pop(student_id, None)
+            with self._analytics_cache_lock:
+                self._analytics_cache.pop(student_id, None)
+            
+            # So the engine's next prediction sees the new session
+            self.excellence_engine.invalidate_student(student_id)
             
             self.logger.info(f"Mentorship session stored: {session_id}")
             return session_id
             
         except Exception as e:
             self.logger.error(f"Session storage failed: {str(e)}")
-            return f"session_{student_id}_error"
+            return None
     
     def _store_prediction_updates(self, student_id: str, predictions: Dict):
         """Store prediction updates in database"""
         try:
-            for distinction, data in predictions.items():
-                update_data = {
+            updated_at = datetime.now()
+            update_rows = [
+                {
                     'student_id': student_id,
                     'distinction_type': distinction,
                     'previous_probability': data['previous'],
                     'updated_probability': data['updated'],
                     'probability_increase': data['increase'],
-                    'updated_at': datetime.now()
+                    'updated_at': updated_at
                 }
-                
-                upsert_query = """
-                INSERT INTO prediction_updates 
-                (student_id, distinction_type, previous_probability, updated_probability, 
-                 probability_increase, updated_at)
-                VALUES (:student_id, :distinction_type, :previous_probability, 
-                        :updated_probability, :probability_increase, :updated_at)
-                ON DUPLICATE KEY UPDATE
-                previous_probability = updated_probability,
-                updated_probability = VALUES(updated_probability),
-                probability_increase = VALUES(probability_increase),
-                updated_at = VALUES(updated_at)
-                """
-                
-                self.db.execute_query(upsert_query, update_data)
+                for distinction, data in predictions.items()
+            ]
+            
+            # One multi-row statement for every distinction of the session
+            self.db.execute_insert_many(UPSERT_PREDICTION_UPDATES_QUERY, update_rows)
                 
         except Exception as e:
             self.logger.error(f"Prediction update storage failed: {str(e)}")
     
     def _infer_academic_field(self, student_id: str) -> str:
-        """Infer academic field from student's documents"""
+        """Infer academic field from student's documents, cached for 300s"""
+        with self._field_cache_lock:
+            field = self._field_cache.get(student_id)
+        if field is not None:
+            return field
+        
         try:
-            field_query = """
-            SELECT content, title
-            FROM academic_documents
-            WHERE student_id = :student_id
-            LIMIT 10
-            """
-            
-            docs = self.db.execute_query(field_query, {'student_id': student_id})
-            
-            # Simple field inference based on keywords
-            field_keywords = {
-                'STEM': ['algorithm', 'equation', 'analysis', 'data', 'research', 'method', 'theory'],
-                'Social Sciences': ['society', 'behavior', 'culture', 'psychology', 'social'],
-                'Humanities': ['literature', 'history', 'philosophy', 'art', 'culture'],
-                'Business': ['business', 'management', 'strategy', 'market', 'economics'],
-                'Medicine': ['medical', 'clinical', 'patient', 'health', 'disease'],
-                'Law': ['legal', 'court', 'law', 'regulation', 'justice']
-            }
-            
-            field_scores = {field: 0 for field in field_keywords}
-            
-            for doc in docs:
-                text = (doc.get('content', '') + ' ' + doc.get('title', '')).lower()
-                for field, keywords in field_keywords.items():
-                    field_scores[field] += sum(1 for keyword in keywords if keyword in text)
-            
-            # Return field with highest score, default to STEM
-            return max(field_scores.items(), key=lambda x: x[1])[0] if any(field_scores.values()) else 'STEM'
-            
+            field = self._compute_academic_field(student_id)
         except Exception as e:
             self.logger.error(f"Field inference failed: {str(e)}")
             return 'interdisciplinary'
+        
+        with self._field_cache_lock:
+            self._field_cache[student_id] = field
+        return field
+    
+    def _compute_academic_field(self, student_id: str) -> str:
+        """Score fields by the keywords in up to 10 of the student's documents"""
+        field_query = """
+        SELECT content, title
+        FROM academic_documents
+        WHERE student_id = :student_id
+        LIMIT 10
+        """
+        
+        docs = self.db.execute_query(field_query, {'student_id': student_id})
+        
+        # Simple field inference: each distinct keyword in a document scores its fields
+        field_scores = {field: 0 for field in self.field_keywords}
+        
+        for doc in docs:
+            text = (doc.get('content', '') + ' ' + doc.get('title', '')).lower()
+            tokens = frozenset(TOKEN_RE.findall(text))
+            for field, keywords in self._field_keyword_sets.items():
+                field_scores[field] += len(tokens & keywords)
+        
+        # Return field with highest score, default to STEM
+        return max(field_scores.items(), key=lambda x: x[1])[0] if any(field_scores.values()) else 'STEM'
     
     def _analyze_engagement_pattern(self, recent_sessions: List[Dict]) -> str:
-        """Analyze student's engagement pattern"""
+        """Analyze student's engagement pattern from RECENT_SESSIONS_QUERY's aggregates"""
         try:
             if not recent_sessions:
                 return 'new_student'
             
-            avg_quality = sum(session.get('session_quality_score', 3.0) 
-                            for session in recent_sessions) / len(recent_sessions)
-            
-            sophistication_levels = [session.get('query_sophistication', 'basic') 
-                                   for session in recent_sessions]
-            
-            advanced_count = sum(1 for level in sophistication_levels 
-                               if level in ['advanced', 'scholar'])
+            avg_quality = recent_sessions[0]['recent_avg_quality']
+            advanced_count = recent_sessions[0]['recent_advanced_count']
             
             if avg_quality > 4.0 and advanced_count >= len(recent_sessions) * 0.6:
                 return 'high_achiever'
@@ -632,80 +1042,176 @@ Maintain the tone of an inspiring, world-class academic mentor who recognizes th
             self.logger.error(f"Engagement analysis failed: {str(e)}")
             return 'unknown'
     
-    def get_mentorship_history(self, student_id: str, limit: int = 10) -> List[Dict]:
-        """Get student's mentorship session history"""
+    def get_mentorship_history(self, student_id: str, limit: int = 10) -> List[SessionSummary]:
+        """Get student's mentorship session history
+        
+        orjson (and so the app's JSON provider) serializes the records directly.
+        """
         try:
-            history_query = """
-            SELECT session_id, query, query_sophistication, session_quality_score, 
-                   created_at, scholar_response
-            FROM mentorship_sessions
-            WHERE student_id = :student_id
-            ORDER BY created_at DESC
-            LIMIT :limit
-            """
-            
-            sessions = self.db.execute_query(history_query, {
+            sessions = self.db.execute_query(SESSION_HISTORY_QUERY, {
                 'student_id': student_id,
                 'limit': limit
             })
             
-            # Parse and format sessions
-            formatted_sessions = []
-            for session in sessions:
-                try:
-                    scholar_response = json.loads(session.get('scholar_response', '{}'))
-                except:
-                    scholar_response = {}
-                
-                formatted_sessions.append({
-                    'session_id': session.get('session_id'),
-                    'query': session.get('query'),
-                    'sophistication': session.get('query_sophistication'),
-                    'quality_score': session.get('session_quality_score'),
-                    'created_at': session.get('created_at').isoformat() if session.get('created_at') else None,
-                    'response_preview': scholar_response.get('response', '')[:200] + '...' if scholar_response.get('response') else '',
-                    'frameworks_used': scholar_response.get('frameworks', [])
-                })
-            
-            return formatted_sessions
+            return [_session_summary(session) for session in sessions]
             
         except Exception as e:
             self.logger.error(f"History retrieval failed: {str(e)}")
             return []
     
+    def get_mentorship_history_json(self, student_id: str, limit: int = 10) -> bytes:
+        """get_mentorship_history as a JSON array, ready for a Response body
+        
+        orjson walks the slotted records in C, so endpoints skip the provider's
+        second serialization pass.
+        """
+        return orjson.dumps(self.get_mentorship_history(student_id, limit))
+    
+    def get_mentorship_history_page(self, student_id: str, cursor: Optional[Tuple[datetime, int]] = None,
+                                    limit: int = 50) -> Tuple[List[SessionSummary], Optional[Tuple[datetime, int]]]:
+        """One page of history, newest first, and the cursor for the next page
+        
+        The cursor is the (created_at, session_id) of the last session returned;
+        it is None once a page comes back short.
+        """
+        limit = max(1, min(limit, SESSION_HISTORY_MAX_PAGE))
+        try:
+            if cursor is None:
+                rows = self.db.execute_query(SESSION_HISTORY_QUERY, {
+                    'student_id': student_id,
+                    'limit': limit
+                })
+            else:
+                rows = self.db.execute_query(SESSION_HISTORY_PAGE_QUERY, {
+                    'student_id': student_id,
+                    'cursor_created_at': cursor[0],
+                    'cursor_id': cursor[1],
+                    'limit': limit
+                })
+        except Exception as e:
+            self.logger.error(f"History page retrieval failed: {str(e)}")
+            return [], None
+        
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = (last['created_at'], last['session_id'])
+        return [_session_summary(row) for row in rows], next_cursor
+    
+    def iter_session_history(self, student_id: str,
+                             batch: int = SESSION_HISTORY_BATCH) -> Iterator[SessionSummary]:
+        """Stream a student's full session history, newest first
+        
+        Rows come from a server-side cursor, so only one batch is held in memory;
+        a failure part-way is logged and ends the stream.
+        """
+        try:
+            for rows in self.db.execute_query_stream(SESSION_HISTORY_ALL_QUERY,
+                                                     {'student_id': student_id}, batch=batch):
+                for row in rows:
+                    yield _session_summary(row)
+        except Exception as e:
+            self.logger.error(f"History streaming failed: {str(e)}")
+    
     def get_session_analytics(self, student_id: str) -> Dict:
-        """Get analytics for student's mentorship sessions"""
+        """Get analytics for student's mentorship sessions, cached for 45s"""
+        with self._analytics_cache_lock:
+            analytics = self._analytics_cache.get(student_id)
+        if analytics is not None:
+            return analytics
+        
         try:
-            analytics_query = """
-            SELECT 
-                COUNT(*) as total_sessions,
-                AVG(session_quality_score) as avg_quality,
-                MAX(session_quality_score) as max_quality,
-                COUNT(CASE WHEN query_sophistication = 'scholar' THEN 1 END) as scholar_queries,
-                COUNT(CASE WHEN query_sophistication = 'advanced' THEN 1 END) as advanced_queries,
-                COUNT(CASE WHEN session_quality_score > 4.0 THEN 1 END) as high_quality_sessions
-            FROM mentorship_sessions
-            WHERE student_id = :student_id
-            """
-            
-            result = self.db.execute_query(analytics_query, {'student_id': student_id})
-            
-            if result:
-                analytics = result[0]
-                total = analytics.get('total_sessions', 0)
-                
-                return {
-                    'total_sessions': total,
-                    'average_quality': round(analytics.get('avg_quality', 0), 2),
-                    'peak_quality': analytics.get('max_quality', 0),
-                    'scholar_percentage': round((analytics.get('scholar_queries', 0) / max(total, 1)) * 100, 1),
-                    'advanced_percentage': round((analytics.get('advanced_queries', 0) / max(total, 1)) * 100, 1),
-                    'excellence_rate': round((analytics.get('high_quality_sessions', 0) / max(total, 1)) * 100, 1)
-                }
-            
-            return {'total_sessions': 0, 'average_quality': 0, 'peak_quality': 0, 
-                   'scholar_percentage': 0, 'advanced_percentage': 0, 'excellence_rate': 0}
-            
+            analytics = self._load_session_analytics(student_id)
         except Exception as e:
             self.logger.error(f"Analytics retrieval failed: {str(e)}")
-            return {}
\ No newline at end of file
+            return {}
+        
+        with self._analytics_cache_lock:
+            self._analytics_cache[student_id] = analytics
+        return analytics
+    
+    def get_session_analytics_bulk(self, student_ids: List[str]) -> Dict[str, Dict]:
+        """Analytics for many students, querying only the uncached ones in one round-trip
+        
+        Students without sessions get zeroed analytics; on failure the
+        students still missing are left out of the result.
+        """
+        found = {}
+        missing = []
+        with self._analytics_cache_lock:
+            for student_id in dict.fromkeys(student_ids):
+                analytics = self._analytics_cache.get(student_id)
+                if analytics is not None:
+                    found[student_id] = analytics
+                else:
+                    missing.append(student_id)
+        if not missing:
+            return found
+        
+        try:
+            rows = self.db.execute_query(
+                SESSION_ANALYTICS_BULK_QUERY, {'student_ids': missing}, expanding=('student_ids',)
+            )
+        except Exception as e:
+            self.logger.error(f"Bulk analytics retrieval failed: {str(e)}")
+            return found
+        
+        by_student = {row['student_id']: row for row in rows}
+        fetched = {student_id: self._format_session_analytics(by_student.get(student_id))
+                   for student_id in missing}
+        with self._analytics_cache_lock:
+            self._analytics_cache.update(fetched)
+        found.update(fetched)
+        return found
+    
+    def get_dashboard(self, student_id: str, limit: int = 10) -> Dict:
+        """Recent history and analytics for the mentorship dashboard
+        
+        Cached analytics leave only the history to fetch; otherwise both come
+        back from a single DASHBOARD_QUERY.
+        """
+        with self._analytics_cache_lock:
+            analytics = self._analytics_cache.get(student_id)
+        if analytics is not None:
+            return {
+                'history': self.get_mentorship_history(student_id, limit),
+                'analytics': analytics
+            }
+        
+        try:
+            rows = self.db.execute_query(DASHBOARD_QUERY, {
+                'student_id': student_id,
+                'limit': limit
+            })
+        except Exception as e:
+            self.logger.error(f"Dashboard retrieval failed: {str(e)}")
+            return {'history': [], 'analytics': {}}
+        
+        analytics = self._format_session_analytics(rows[0] if rows else None)
+        with self._analytics_cache_lock:
+            self._analytics_cache[student_id] = analytics
+        return {
+            'history': [_session_summary(row) for row in rows if row['session_id'] is not None],
+            'analytics': analytics
+        }
+    
+    def _load_session_analytics(self, student_id: str) -> Dict:
+        """Aggregate the student's sessions into dashboard percentages"""
+        result = self.db.execute_query(SESSION_ANALYTICS_QUERY, {'student_id': student_id})
+        return self._format_session_analytics(result[0] if result else None)
+    
+    @staticmethod
+    def _format_session_analytics(analytics: Optional[Dict]) -> Dict:
+        """Dashboard analytics from one SESSION_ANALYTICS_FIELDS row"""
+        if analytics and analytics['total_sessions']:
+            return {
+                'total_sessions': analytics['total_sessions'],
+                'average_quality': analytics['average_quality'],
+                'peak_quality': analytics['peak_quality'],
+                'scholar_percentage': analytics['scholar_percentage'],
+                'advanced_percentage': analytics['advanced_percentage'],
+                'excellence_rate': analytics['excellence_rate']
+            }
+        
+        return {'total_sessions': 0, 'average_quality': 0, 'peak_quality': 0, 
+               'scholar_percentage': 0, 'advanced_percentage': 0, 'excellence_rate': 0}
\ No newline at end of file